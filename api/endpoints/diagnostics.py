@@ -0,0 +1,84 @@
+from fastapi import APIRouter, HTTPException
+from data.database import DataDB
+from core.instances import trader_manager, order_tracker, kline_archive_writer
+from operations.sizing import sizing_service
+from core.notification_worker import notification_worker
+
+router = APIRouter()
+db = DataDB()
+
+
+@router.get("/connections", summary="Métricas de conexões com o MongoDB")
+def get_connection_stats():
+    try:
+        return db.connection_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/query-plans", summary="Auditoria dos planos das consultas frequentes")
+def get_query_plans():
+    try:
+        plans = db.explain_hot_queries()
+        return {
+            "collscans": [plan for plan in plans if plan["collscan"]],
+            "plans": plans,
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/write-behind", summary="Métricas da fila de gravação dos snapshots de candle")
+def get_write_behind_stats():
+    try:
+        return trader_manager.snapshot_writer.stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/kline-archive", summary="Métricas da fila de gravação do arquivo colunar de klines")
+def get_kline_archive_stats():
+    try:
+        return kline_archive_writer.stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/notifications", summary="Métricas da fila de notificações do Telegram")
+def get_notification_stats():
+    try:
+        return notification_worker.stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/order-tracker", summary="Estado do user-data stream de ordens de TP/SL")
+def get_order_tracker_stats():
+    try:
+        return order_tracker.stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/sizing", summary="Filtros de negociação, preços e saldos em cache para o dimensionamento")
+def get_sizing_stats():
+    try:
+        return sizing_service.stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/executions", summary="Execuções de sinais agendadas e latência fechamento do candle -> ack da ordem")
+def get_execution_stats():
+    try:
+        return trader_manager.signal_manager.execution_scheduler.stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/candle-barrier", summary="Rodadas de sinais abertas e contadores da barreira por candle")
+def get_candle_barrier_stats():
+    try:
+        return trader_manager.signal_manager.candle_barrier.stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from core.metrics import metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics", summary="Histogramas de latência do pipeline no formato texto do Prometheus")
+def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
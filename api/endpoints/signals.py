@@ -5,7 +5,7 @@ from core.signal_manager import SignalManager
 from datetime import datetime
 
 router = APIRouter()
-signal_manager = SignalManager(total_tasks=10)  # Atualize o total_tasks conforme necessário
+signal_manager = SignalManager()
 
 class RegisterSignalRequest(BaseModel):
     trade_id: str = Field(..., description="ID único do trade relacionado ao sinal.")
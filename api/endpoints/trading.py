@@ -1,5 +1,11 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+from datetime import datetime, timedelta
+from pytz import UTC
+from typing import List
+from fastapi import APIRouter, HTTPException, Query
 from core.instances import trader_manager
+from backtest.engine import load_archived_candles
+from backtest.optimizer import GridOptimizer
 
 router = APIRouter()
 
@@ -94,6 +100,37 @@ async def add_priority():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/priority/optimize")
+async def optimize_priority(
+    symbols: List[str] = Query(...),
+    interval: str = "1m",
+    days: int = 30,
+    ema_s: int = 20,
+    metric: str = "pnl",
+    breakeven_profit_threshold: float = 0.0,
+    top_n: int = 100,
+):
+    """
+    Endpoint para recalcular a tabela de prioridades a partir de backtests
+    dos candles arquivados dos símbolos informados.
+    """
+    try:
+        start = datetime.now(UTC) - timedelta(days=days)
+        candles = {symbol: load_archived_candles(symbol, interval, start=start) for symbol in symbols}
+        candles = {symbol: df for symbol, df in candles.items() if len(df)}
+        if not candles:
+            raise HTTPException(status_code=404, detail="Nenhum candle arquivado para os símbolos informados.")
+
+        optimizer = GridOptimizer(ema_s=ema_s, metric=metric, breakeven_profit_threshold=breakeven_profit_threshold)
+        priority_data = await asyncio.to_thread(optimizer.optimize, candles, top_n)
+        trader_manager.signal_manager.invalidate_priority_index()
+        return {"status": "success", "priority_criteria": priority_data}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/priority/table")
 async def get_priority_table():
     """Endpoint para obter a tabela de prioridades."""
@@ -8,6 +8,8 @@ from api.endpoints.pair_trading import router as pair_trading_router
 from api.endpoints.config_pair_assets import router as config_pair_assets_router
 from api.endpoints.config_pair_system import router as config_pair_system_router
 from api.endpoints.signals_pair import router as signals_pair_router
+from api.endpoints.diagnostics import router as diagnostics_router
+from api.endpoints.metrics import router as metrics_router
 
 app = APIRouter()
 
@@ -21,3 +23,5 @@ app.include_router(pair_trading_router, prefix="/pair-trading", tags=["Pair Trad
 app.include_router(config_pair_assets_router, prefix="/pair", tags=["Pair Assets Configs"])
 app.include_router(config_pair_system_router, prefix="/pair", tags=["Pair System Configs"])
 app.include_router(signals_pair_router, prefix="/pair", tags=["Signals Pair"])
+app.include_router(diagnostics_router, prefix="/diagnostics", tags=["Diagnostics"])
+app.include_router(metrics_router, tags=["Metrics"])
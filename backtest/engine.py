@@ -0,0 +1,210 @@
+import numpy as np
+import pandas as pd
+from core.strategies import get_strategy
+from technicals.indicators import EMAShort, PAV_multi, calculate_ema
+from technicals.streaming import EMAPERStream
+
+# Fração da posição encerrada ao atingir o Break Even (TradeExecutor.close_partial_position(..., 50))
+PARTIAL_FRACTION = 0.5
+
+
+def compute_base_indicators(candles: pd.DataFrame, ema_s, ema_percent_period=10):
+    """
+    Parte da pilha de indicadores que depende apenas do fechamento e de `ema_s`
+    (EMA_short, PAV, EMA_percent_s e Average_EMA_percent), compartilhada por todas
+    as combinações de emaper_s/emaper_l.
+    :param candles: DataFrame com ao menos Close (e Time, se disponível).
+    :return: DataFrame sem as linhas de aquecimento da EMA curta.
+    """
+    df = EMAShort(candles[["Close"] + (["Time"] if "Time" in candles else [])].copy(), ema_s)
+    df.reset_index(drop=True, inplace=True)
+
+    pav = PAV_multi(df["EMA_short"].values, EMAPERStream.WINDOWS)
+    ema_percent = []
+    for window in EMAPERStream.WINDOWS:
+        df[f"Percent_Change_{window}"] = pav[window]
+        df[f"EMA_percent_s_{window}"] = calculate_ema(pav[window], ema_percent_period)
+        ema_percent.append(df[f"EMA_percent_s_{window}"].values)
+
+    df["Average_EMA_percent"] = np.mean(ema_percent, axis=0)
+    return df
+
+
+def add_cross_indicators(df: pd.DataFrame, emaper_s, emaper_l):
+    """Adiciona as EMAs curta e longa de Average_EMA_percent."""
+    df["Average_EMA_percent_ema_short"] = calculate_ema(df["Average_EMA_percent"].values, emaper_s)
+    df["Average_EMA_percent_ema_long"] = calculate_ema(df["Average_EMA_percent"].values, emaper_l)
+    return df
+
+
+def compute_indicators(candles: pd.DataFrame, ema_s, emaper_s, emaper_l, ema_percent_period=10):
+    """
+    Calcula em lote a mesma pilha de indicadores do LongShortTrader
+    (EMA_short, PAV, EMA_percent_s, Average_EMA_percent e suas EMAs curta/longa).
+    :param candles: DataFrame com ao menos Close (e Time, se disponível).
+    :return: DataFrame sem as linhas de aquecimento da EMA curta.
+    """
+    return add_cross_indicators(compute_base_indicators(candles, ema_s, ema_percent_period), emaper_s, emaper_l)
+
+
+def _first_true(condition, closes, start, chunk=256):
+    """
+    Primeiro índice j >= start em que condition(closes[j:...]) é verdadeira, ou len(closes).
+    Busca em blocos crescentes para não varrer todo o histórico a cada trade.
+    """
+    n = len(closes)
+    while start < n:
+        end = min(n, start + chunk)
+        hits = condition(closes[start:end])
+        if hits.any():
+            return start + int(np.argmax(hits))
+        start = end
+        chunk *= 2
+    return n
+
+
+def simulate_trade(closes, entry_index, position_side, sl_percent, breakeven_threshold):
+    """
+    Simula a saída de um trade com as regras do TradeExecutor, avaliadas nos fechamentos
+    a partir do candle seguinte ao da entrada:
+      - Break Even: lucro >= breakeven_threshold encerra 50% e move o SL para a entrada;
+      - TP/SL: TP verificado antes do SL, já com o SL ajustado no mesmo candle do Break Even.
+    :return: Dicionário com os índices e preços de saída, motivo e retorno.
+    """
+    entry_price = closes[entry_index]
+    long = position_side == "LONG"
+    direction = 1 if long else -1
+    take_profit = round(entry_price + direction * entry_price * sl_percent, 3)
+    stop_loss = round(entry_price - direction * entry_price * sl_percent, 3)
+    breakeven_price = entry_price * (1 + direction * breakeven_threshold)
+
+    if long:
+        tp_hit = lambda c: c >= take_profit
+        sl_hit = lambda c: c <= stop_loss
+        be_hit = lambda c: c >= breakeven_price
+        be_sl_hit = lambda c: c <= entry_price
+    else:
+        tp_hit = lambda c: c <= take_profit
+        sl_hit = lambda c: c >= stop_loss
+        be_hit = lambda c: c <= breakeven_price
+        be_sl_hit = lambda c: c >= entry_price
+
+    n = len(closes)
+    start = entry_index + 1
+    be_index = _first_true(be_hit, closes, start)
+    exit_index = _first_true(lambda c: tp_hit(c) | sl_hit(c), closes, start)
+
+    partial_index = None
+    if exit_index >= be_index and be_index < n:
+        # Parcial no Break Even; a posição restante passa a ter o SL na entrada
+        partial_index = be_index
+        exit_index = _first_true(lambda c: tp_hit(c) | be_sl_hit(c), closes, be_index)
+
+    is_open = exit_index >= n
+    exit_index = min(exit_index, n - 1)
+    exit_price = closes[exit_index]
+    if is_open:
+        reason = "OPEN"
+    elif tp_hit(exit_price):
+        reason = "TP"
+    else:
+        reason = "SL"
+
+    remaining = 1.0
+    pnl = 0.0
+    if partial_index is not None:
+        pnl += PARTIAL_FRACTION * direction * (closes[partial_index] - entry_price) / entry_price
+        remaining -= PARTIAL_FRACTION
+    pnl += remaining * direction * (exit_price - entry_price) / entry_price
+
+    return {
+        "entry_index": entry_index,
+        "entry_price": entry_price,
+        "position_side": position_side,
+        "take_profit": take_profit,
+        "stop_loss": stop_loss,
+        "partial_index": partial_index,
+        "exit_index": exit_index,
+        "exit_price": exit_price,
+        "close_type": reason,
+        "pnl": pnl,
+    }
+
+
+class BacktestEngine:
+    def __init__(self, strategy_type=1, breakeven_profit_threshold=0.0, fee=0.0):
+        """
+        Backtest de um conjunto de parâmetros do LongShortTrader sobre candles históricos.
+        :param strategy_type: Estratégia de get_strategy.
+        :param breakeven_profit_threshold: Mesmo parâmetro do config_system (fração de lucro).
+        :param fee: Custo por lado, como fração do preço (cobrado na entrada e na saída).
+        """
+        self.strategy = get_strategy(strategy_type)
+        self.breakeven_profit_threshold = breakeven_profit_threshold
+        self.fee = fee
+
+    def run(self, candles: pd.DataFrame, ema_s, emaper_s, emaper_l, emaper_force, sl_percent):
+        """
+        Executa o backtest.
+        :param candles: DataFrame de candles fechados (ex: KlineArchive.to_dataframe).
+        :return: Dicionário com as métricas e o DataFrame de trades.
+        """
+        df = compute_indicators(candles, ema_s, emaper_s, emaper_l)
+        df = self.strategy.detect_signals(df, emaper_force)
+        return self.evaluate(df, sl_percent)
+
+    def evaluate(self, df: pd.DataFrame, sl_percent):
+        """
+        Simula os trades a partir de um DataFrame já com Close e as colunas de sinal.
+        Cada sinal abre uma posição independente, como no SignalManager.
+        """
+        closes = df["Close"].to_numpy(dtype=float)
+        sl_percent = abs(float(sl_percent))
+        up = np.flatnonzero(df["SIGNAL_UP_FIRST"].to_numpy() != 0)
+        down = np.flatnonzero(df["SIGNAL_DOWN_FIRST"].to_numpy() != 0)
+        entries = sorted([(i, "LONG") for i in up] + [(i, "SHORT") for i in down])
+
+        trades = pd.DataFrame([
+            simulate_trade(closes, i, side, sl_percent, self.breakeven_profit_threshold)
+            for i, side in entries
+        ])
+        if len(trades):
+            trades["pnl"] -= 2 * self.fee
+            if "Time" in df:
+                times = df["Time"].to_numpy()
+                trades["entry_time"] = times[trades["entry_index"].to_numpy()]
+                trades["exit_time"] = times[trades["exit_index"].to_numpy()]
+        return {"trades": trades, **self.metrics(trades)}
+
+    @staticmethod
+    def metrics(trades: pd.DataFrame):
+        """PnL acumulado, drawdown máximo e taxa de acerto (retornos em fração do valor da posição)."""
+        if not len(trades):
+            return {"total_trades": 0, "pnl": 0.0, "max_drawdown": 0.0, "win_rate": 0.0,
+                    "tp": 0, "sl": 0, "open": 0}
+
+        # Curva de capital na ordem de encerramento dos trades
+        pnl = trades.sort_values(["exit_index", "entry_index"])["pnl"].to_numpy()
+        equity = np.cumsum(pnl)
+        peak = np.maximum.accumulate(np.concatenate([[0.0], equity]))[1:]
+        close_types = trades["close_type"].value_counts()
+        return {
+            "total_trades": int(len(trades)),
+            "pnl": float(equity[-1]),
+            "max_drawdown": float((peak - equity).max()),
+            "win_rate": float((trades["pnl"] > 0).mean()),
+            "tp": int(close_types.get("TP", 0)),
+            "sl": int(close_types.get("SL", 0)),
+            "open": int(close_types.get("OPEN", 0)),
+        }
+
+
+def load_archived_candles(symbol, interval, start=None, end=None, archive=None):
+    """
+    Lê do arquivo colunar os candles usados no backtest.
+    :param archive: KlineArchive (padrão: o diretório configurado em KLINE_ARCHIVE_DIR).
+    """
+    if archive is None:
+        from data.kline_archive import KlineArchive
+        archive = KlineArchive()
+    return archive.to_dataframe(symbol, interval, start, end)
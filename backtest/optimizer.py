@@ -0,0 +1,155 @@
+import itertools
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from backtest.engine import BacktestEngine, compute_base_indicators, add_cross_indicators
+from data.database import DataDB
+from core.process_pool import spawn_process_pool
+
+# Grade padrão: os valores usados na tabela de prioridades original
+DEFAULT_GRID = {
+    "emaper_s": [5, 10, 20, 50],
+    "emaper_l": [50, 100],
+    "emaper_force": [2, 3, 4, 5],
+    "sl_percent": [-0.01, -0.02, -0.03, -0.04],
+}
+
+# Métricas em que um valor menor é melhor
+LOWER_IS_BETTER = {"max_drawdown"}
+
+
+def _evaluate_cross(task):
+    """
+    Executado nos processos do pool: avalia todas as combinações de emaper_force/sl_percent
+    para um par (emaper_s, emaper_l) de um símbolo, lendo Close e Average_EMA_percent
+    da memória compartilhada.
+    """
+    (shm_name, length, symbol, emaper_s, emaper_l, forces, sl_percents,
+     strategy_type, breakeven_profit_threshold, fee) = task
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        arrays = np.ndarray((2, length), dtype=np.float64, buffer=shm.buf)
+        df = pd.DataFrame({"Close": arrays[0].copy(), "Average_EMA_percent": arrays[1].copy()})
+    finally:
+        shm.close()
+
+    df = add_cross_indicators(df, emaper_s, emaper_l)
+    engine = BacktestEngine(strategy_type, breakeven_profit_threshold, fee)
+    results = []
+    for emaper_force in forces:
+        signals = engine.strategy.detect_signals(df.copy(), emaper_force)
+        for sl_percent in sl_percents:
+            metrics = engine.evaluate(signals, sl_percent)
+            metrics.pop("trades")
+            results.append({
+                "symbol": symbol,
+                "emaper_s": emaper_s,
+                "emaper_l": emaper_l,
+                "emaper_force": emaper_force,
+                "sl_percent": sl_percent,
+                **metrics,
+            })
+    return results
+
+
+class GridOptimizer:
+    def __init__(self, grid=None, ema_s=20, metric="pnl", strategy_type=1,
+                 breakeven_profit_threshold=0.0, fee=0.0, max_workers=None):
+        """
+        Varre uma grade de parâmetros do LongShortTrader em um pool de processos.
+        Os indicadores que dependem só de `ema_s` são calculados uma vez por símbolo
+        e compartilhados com os processos via memória compartilhada.
+        :param grid: Dicionário com listas de emaper_s, emaper_l, emaper_force e sl_percent.
+        :param metric: Métrica de ordenação (pnl, win_rate, max_drawdown...).
+        :param max_workers: Número de processos (padrão: número de CPUs).
+        """
+        self.grid = {**DEFAULT_GRID, **(grid or {})}
+        self.ema_s = ema_s
+        self.metric = metric
+        self.strategy_type = strategy_type
+        self.breakeven_profit_threshold = breakeven_profit_threshold
+        self.fee = fee
+        self.max_workers = max_workers
+        self.db = None
+
+    def run(self, candles_by_symbol):
+        """
+        Executa o backtest de toda a grade para cada símbolo.
+        :param candles_by_symbol: Dicionário {símbolo: DataFrame de candles}.
+        :return: DataFrame com uma linha por símbolo e combinação de parâmetros.
+        """
+        blocks = []
+        tasks = []
+        try:
+            for symbol, candles in candles_by_symbol.items():
+                base = compute_base_indicators(candles, self.ema_s)
+                shm = shared_memory.SharedMemory(create=True, size=max(1, 2 * len(base) * 8))
+                blocks.append(shm)
+                arrays = np.ndarray((2, len(base)), dtype=np.float64, buffer=shm.buf)
+                arrays[0] = base["Close"].values
+                arrays[1] = base["Average_EMA_percent"].values
+
+                for emaper_s, emaper_l in itertools.product(self.grid["emaper_s"], self.grid["emaper_l"]):
+                    if emaper_s >= emaper_l:
+                        continue
+                    tasks.append((
+                        shm.name, len(base), symbol, emaper_s, emaper_l,
+                        self.grid["emaper_force"], self.grid["sl_percent"],
+                        self.strategy_type, self.breakeven_profit_threshold, self.fee,
+                    ))
+
+            with spawn_process_pool(self.max_workers) as pool:
+                results = [row for rows in pool.map(_evaluate_cross, tasks) for row in rows]
+        finally:
+            for shm in blocks:
+                shm.close()
+                shm.unlink()
+
+        return pd.DataFrame(results)
+
+    def rank(self, results):
+        """
+        Ordena as combinações pela média da métrica entre os símbolos.
+        :return: DataFrame ordenado, com as colunas score e rank.
+        """
+        params = ["emaper_s", "emaper_l", "emaper_force", "sl_percent"]
+        ranking = results.groupby(params, as_index=False).agg(
+            score=(self.metric, "mean"),
+            total_trades=("total_trades", "sum"),
+            symbols=("symbol", "nunique"),
+        )
+        ranking = ranking.sort_values("score", ascending=self.metric in LOWER_IS_BETTER, kind="stable")
+        ranking = ranking.reset_index(drop=True)
+        ranking["rank"] = ranking.index + 1
+        return ranking
+
+    def save_priority_criteria(self, ranking, top_n=100):
+        """
+        Substitui a coleção `priority_criteria` pelas `top_n` melhores combinações,
+        na ordem usada por SignalManager.select_top_signals.
+        """
+        if self.db is None:
+            self.db = DataDB()
+        priority_data = [
+            {
+                "emaper_s": int(row.emaper_s),
+                "emaper_l": int(row.emaper_l),
+                "emaper_force": float(row.emaper_force),
+                "sl_percent": float(row.sl_percent),
+                "metric": self.metric,
+                "score": float(row.score),
+                "rank": int(row.rank),
+            }
+            for row in ranking.head(top_n).itertuples()
+        ]
+        self.db.delete_many("priority_criteria")
+        if priority_data:
+            self.db.add_many("priority_criteria", priority_data)
+        print(f"Tabela de prioridades atualizada com {len(priority_data)} combinações ({self.metric}).")
+        return priority_data
+
+    def optimize(self, candles_by_symbol, top_n=100):
+        """Executa a grade, ordena e grava o resultado em `priority_criteria`."""
+        ranking = self.rank(self.run(candles_by_symbol))
+        return self.save_priority_criteria(ranking, top_n)
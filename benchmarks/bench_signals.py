@@ -0,0 +1,63 @@
+"""
+Micro-benchmark da detecção de cruzamentos de Strategy1.
+
+Compara o laço original, a versão vetorizada (detect_signals) e a avaliação
+somente do último candle (detect_last_signal) com 500, 10k e 1M candles.
+
+Uso: python -m benchmarks.bench_signals
+"""
+import timeit
+import numpy as np
+import pandas as pd
+from core.strategies import Strategy1
+
+SIZES = (500, 10_000, 1_000_000)
+EMAPER_FORCE = 0.5
+
+
+def loop_signals(df, emaper_force):
+    # Implementação original, linha a linha
+    short = df["Average_EMA_percent_ema_short"].values
+    long = df["Average_EMA_percent_ema_long"].values
+    signal_up = np.zeros(len(df), dtype=int)
+    signal_down = np.zeros(len(df), dtype=int)
+    for i in range(1, len(df)):
+        if short[i - 1] < long[i - 1] and short[i] > long[i] and short[i] < -emaper_force:
+            signal_up[i] = 1
+        elif short[i - 1] > long[i - 1] and short[i] < long[i] and short[i] > emaper_force:
+            signal_down[i] = 1
+    df["SIGNAL_UP"] = signal_up
+    df["SIGNAL_UP_FIRST"] = signal_up
+    df["SIGNAL_DOWN"] = signal_down
+    df["SIGNAL_DOWN_FIRST"] = signal_down
+    return df
+
+
+def make_data(n, seed=0):
+    rng = np.random.default_rng(seed)
+    short = np.cumsum(rng.normal(0, 1, n))
+    long = pd.Series(short).ewm(span=20).mean().to_numpy()
+    return pd.DataFrame({"Average_EMA_percent_ema_short": short, "Average_EMA_percent_ema_long": long})
+
+
+def best_of(func, number, repeat=5):
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def main():
+    strategy = Strategy1()
+    print(f"{'candles':>10} {'laço (ms)':>12} {'vetorizado (ms)':>16} {'último candle (µs)':>20} {'ganho':>8}")
+    for n in SIZES:
+        df = make_data(n)
+        rows = df.iloc[-2:].to_dict("records")
+        number = max(1, 10_000 // n)
+
+        loop = best_of(lambda: loop_signals(df.copy(), EMAPER_FORCE), number, repeat=3 if n > 10_000 else 5)
+        vectorized = best_of(lambda: strategy.detect_signals(df.copy(), EMAPER_FORCE), number)
+        last = best_of(lambda: strategy.detect_last_signal(rows[0], rows[1], EMAPER_FORCE), 10_000)
+
+        print(f"{n:>10} {loop * 1e3:>12.3f} {vectorized * 1e3:>16.3f} {last * 1e6:>20.3f} {loop / vectorized:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
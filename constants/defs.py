@@ -38,5 +38,42 @@ LABEL_MAP = {
 THROTTLE_TIME = 0.3
 
 MONGO_CONN = "mongodb://localhost:27017/"
+# Pool de conexões do MongoClient compartilhado pelo processo
+MONGO_MAX_POOL_SIZE = int(os.environ.get("MONGO_MAX_POOL_SIZE", 50))
+MONGO_MIN_POOL_SIZE = int(os.environ.get("MONGO_MIN_POOL_SIZE", 0))
 
 TFS = {"M1": 1, "M5": 300, "H15": 900, "H1": 3600}
+
+# Capacidade dos buffers de candles em memória (20 dias de candles de 1m cabem com folga)
+CANDLE_BUFFER_CAPACITY = 30000
+
+# Avalia BE/parcial/TP/SL a cada atualização de kline (intra-candle), e não só no fechamento
+INTRABAR_EXITS = os.environ.get("INTRABAR_EXITS", "false").lower() == "true"
+
+# Cache em disco (Feather) do histórico de klines e concorrência da carga inicial
+KLINE_CACHE_DIR = os.environ.get("KLINE_CACHE_DIR", "cache/klines")
+HISTORICAL_MAX_CONCURRENCY = int(os.environ.get("HISTORICAL_MAX_CONCURRENCY", 4))
+
+# Arquivo colunar (particionado por símbolo/intervalo/dia) dos candles fechados recebidos no stream
+KLINE_ARCHIVE_DIR = os.environ.get("KLINE_ARCHIVE_DIR", "cache/archive")
+KLINE_ARCHIVE_MAX_QUEUED = int(os.environ.get("KLINE_ARCHIVE_MAX_QUEUED", 100000))
+
+# Fila write-behind dos snapshots de candle (coleção time-series única)
+SNAPSHOT_BATCH_SIZE = int(os.environ.get("SNAPSHOT_BATCH_SIZE", 500))
+SNAPSHOT_FLUSH_INTERVAL = float(os.environ.get("SNAPSHOT_FLUSH_INTERVAL", 2.0))
+SNAPSHOT_MAX_QUEUED = int(os.environ.get("SNAPSHOT_MAX_QUEUED", 20000))
+
+# Notificações do Telegram: janela de agrupamento (s), chamadas por segundo, fila e processos de renderização
+NOTIFY_BATCH_WINDOW = float(os.environ.get("NOTIFY_BATCH_WINDOW", 1.0))
+NOTIFY_RATE_LIMIT = float(os.environ.get("NOTIFY_RATE_LIMIT", 1.0))
+NOTIFY_MAX_QUEUED = int(os.environ.get("NOTIFY_MAX_QUEUED", 1000))
+NOTIFY_RENDER_WORKERS = int(os.environ.get("NOTIFY_RENDER_WORKERS", 1))
+
+# Intervalo (s) da reconciliação via REST das ordens de TP/SL acompanhadas pelo user-data stream
+ORDER_RECONCILE_INTERVAL = float(os.environ.get("ORDER_RECONCILE_INTERVAL", 300))
+
+# Execuções simultâneas de sinais (símbolos diferentes) no mesmo candle, limitadas pelo peso da API
+EXECUTION_MAX_CONCURRENCY = int(os.environ.get("EXECUTION_MAX_CONCURRENCY", 5))
+
+# Espera máxima (s) de uma rodada de sinais após a primeira estratégia concluída no candle
+SIGNAL_BARRIER_DEADLINE = float(os.environ.get("SIGNAL_BARRIER_DEADLINE", 3.0))
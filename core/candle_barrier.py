@@ -0,0 +1,143 @@
+import asyncio
+import time
+from constants.defs import SIGNAL_BARRIER_DEADLINE
+from core.metrics import SIGNAL_BARRIER_WAIT
+
+
+class CandleRound:
+    def __init__(self, expected):
+        """Rodada de um candle: traders esperados, traders que já concluíram e horário de abertura da rodada."""
+        self.expected = set(expected)
+        self.arrived = set()
+        self.started = time.monotonic()
+        self.timer = None
+
+
+class CandleBarrier:
+    def __init__(self, on_round, deadline=SIGNAL_BARRIER_DEADLINE):
+        """
+        Barreira por candle: cada rodada é identificada por (intervalo, open time) e espera os traders
+        ativos daquele intervalo. A rodada é liberada quando todos concluem a estratégia ou, no máximo,
+        `deadline` segundos após a primeira conclusão, com os traders que chegaram até então.
+        :param on_round: Função chamada como on_round(interval, open_time, arrived, missing).
+        :param deadline: Espera máxima (segundos) de uma rodada após a primeira conclusão.
+        """
+        self.on_round = on_round
+        self.deadline = deadline
+        self.participants = {}  # trade_id -> intervalo
+        self.rounds = {}  # (intervalo, open time) -> CandleRound
+        self.last_closed = {}  # intervalo -> open time da última rodada liberada
+
+        # Métricas
+        self.completed_rounds = 0
+        self.partial_rounds = 0
+        self.late_arrivals = 0
+        self.max_wait = 0.0
+
+    def add_participant(self, trade_id, interval):
+        """Registra um trader ativo como participante das rodadas do seu intervalo."""
+        self.participants[trade_id] = interval
+
+    def remove_participant(self, trade_id):
+        """Remove um trader; rodadas abertas deixam de esperá-lo e são liberadas se ficarem completas."""
+        interval = self.participants.pop(trade_id, None)
+        for key, candle_round in list(self.rounds.items()):
+            if key[0] == interval and trade_id in candle_round.expected:
+                candle_round.expected.discard(trade_id)
+                candle_round.arrived.discard(trade_id)
+                if candle_round.expected <= candle_round.arrived:
+                    self._release(key)
+
+    def arrive(self, trade_id, interval, open_time):
+        """
+        Registra que um trader concluiu a estratégia do candle.
+        Conclusões de rodadas já liberadas (após o deadline) são processadas isoladamente.
+        """
+        self.expire()
+        key = (interval, open_time)
+
+        candle_round = self.rounds.get(key)
+        if candle_round is None:
+            last_closed = self.last_closed.get(interval)
+            if last_closed is not None and open_time <= last_closed:
+                self.late_arrivals += 1
+                print(f"Trader {trade_id} concluiu o candle {open_time} ({interval}) após o deadline")
+                self._dispatch(interval, open_time, {trade_id}, set())
+                return
+
+            expected = {tid for tid, participant_interval in self.participants.items() if participant_interval == interval}
+            candle_round = self.rounds[key] = CandleRound(expected | {trade_id})
+            try:
+                candle_round.timer = asyncio.get_running_loop().call_later(self.deadline, self._expire_round, key)
+            except RuntimeError:
+                # Sem loop em execução: o deadline é verificado a cada nova conclusão
+                pass
+
+        candle_round.arrived.add(trade_id)
+        if candle_round.expected <= candle_round.arrived:
+            self._release(key)
+
+    def expire(self):
+        """Libera as rodadas cujo deadline já passou."""
+        now = time.monotonic()
+        for key, candle_round in list(self.rounds.items()):
+            if now - candle_round.started >= self.deadline:
+                self._release(key)
+
+    def clear(self):
+        """Descarta participantes e rodadas abertas (sem processá-las)."""
+        for candle_round in self.rounds.values():
+            if candle_round.timer is not None:
+                candle_round.timer.cancel()
+        self.rounds.clear()
+        self.participants.clear()
+        self.last_closed.clear()
+
+    def stats(self):
+        """Rodadas abertas e contadores de rodadas completas, parciais e conclusões atrasadas."""
+        return {
+            "participants": len(self.participants),
+            "open_rounds": [
+                {
+                    "interval": interval,
+                    "open_time": str(open_time),
+                    "arrived": len(candle_round.arrived),
+                    "expected": len(candle_round.expected),
+                }
+                for (interval, open_time), candle_round in self.rounds.items()
+            ],
+            "completed_rounds": self.completed_rounds,
+            "partial_rounds": self.partial_rounds,
+            "late_arrivals": self.late_arrivals,
+            "max_wait": self.max_wait,
+        }
+
+    def _expire_round(self, key):
+        if key in self.rounds:
+            self._release(key)
+
+    def _release(self, key):
+        candle_round = self.rounds.pop(key)
+        if candle_round.timer is not None:
+            candle_round.timer.cancel()
+
+        interval, open_time = key
+        if self.last_closed.get(interval) is None or open_time > self.last_closed[interval]:
+            self.last_closed[interval] = open_time
+
+        missing = candle_round.expected - candle_round.arrived
+        if missing:
+            self.partial_rounds += 1
+            print(f"Rodada {open_time} ({interval}) liberada sem {len(missing)} trader(s): {sorted(missing)}")
+        else:
+            self.completed_rounds += 1
+        wait = time.monotonic() - candle_round.started
+        self.max_wait = max(self.max_wait, wait)
+        SIGNAL_BARRIER_WAIT.observe(wait, interval=interval, outcome="partial" if missing else "complete")
+        self._dispatch(interval, open_time, set(candle_round.arrived), missing)
+
+    def _dispatch(self, interval, open_time, arrived, missing):
+        try:
+            self.on_round(interval, open_time, arrived, missing)
+        except Exception as e:
+            print(f"Erro ao processar a rodada {open_time} ({interval}): {e}")
@@ -1,6 +1,9 @@
 from data.database import DataDB
 
 class ConfigSystemManager:
+    # Cópia em memória de `config_system`, compartilhada pelo processo e invalidada a cada escrita
+    _cache = None
+
     def __init__(self):
         """
         Gerenciador do collection `config_system`.
@@ -27,6 +30,7 @@ class ConfigSystemManager:
                 "use_top_signals": use_top_signals
             }
             self.db.update_one("config_system", {}, config, upsert=True)
+            ConfigSystemManager.invalidate_cache()
             print("Configurações gerais atualizadas:", config)
         except Exception as e:
             print(f"Erro ao atualizar configurações gerais: {e}")
@@ -37,9 +41,12 @@ class ConfigSystemManager:
         :return: Configurações gerais ou None se não existir.
         """
         try:
+            if ConfigSystemManager._cache is not None:
+                return ConfigSystemManager._cache
             config = self.db.query_single("config_system")
             if not config:
                 raise ValueError("Nenhuma configuração geral encontrada.")
+            ConfigSystemManager._cache = config
             return config
         except Exception as e:
             print(f"Erro ao obter configurações gerais: {e}")
@@ -51,6 +58,12 @@ class ConfigSystemManager:
         """
         try:
             self.db.delete_many("config_system", {})
+            ConfigSystemManager.invalidate_cache()
             print("Configurações gerais removidas.")
         except Exception as e:
             print(f"Erro ao remover configurações gerais: {e}")
+
+    @classmethod
+    def invalidate_cache(cls):
+        """Descarta a cópia em memória; a próxima leitura vai ao banco."""
+        cls._cache = None
@@ -0,0 +1,92 @@
+import asyncio
+import time
+from collections import defaultdict, deque
+import numpy as np
+from constants.defs import EXECUTION_MAX_CONCURRENCY
+from core.metrics import CANDLE_TO_ORDER
+
+
+class ExecutionScheduler:
+    def __init__(self, max_concurrency=EXECUTION_MAX_CONCURRENCY, latency_window=1000):
+        """
+        Agenda a execução dos sinais de um candle: símbolos diferentes são executados em paralelo
+        e sinais de um mesmo símbolo em sequência (na ordem de envio), com no máximo
+        `max_concurrency` execuções simultâneas para respeitar o limite de peso da API.
+        :param max_concurrency: Execuções simultâneas permitidas.
+        :param latency_window: Quantidade de latências recentes mantidas para as estatísticas.
+        """
+        self.max_concurrency = max_concurrency
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.symbol_locks = defaultdict(asyncio.Lock)
+        self.pending = set()
+        self.latencies = deque(maxlen=latency_window)  # ms entre o fechamento do candle e o ack da ordem
+
+        # Métricas
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.running = 0
+
+    def submit(self, symbol, execute, candle_close=None):
+        """
+        Agenda uma execução no loop corrente.
+        :param symbol: Ativo da operação (chave de serialização).
+        :param execute: Função sem argumentos que retorna a corrotina da execução (ex: execute_trade).
+        :param candle_close: Horário (ms) de fechamento do candle do sinal, para a latência.
+        :return: Task da execução.
+        """
+        self.submitted += 1
+        task = asyncio.get_running_loop().create_task(self._execute(symbol, execute, candle_close))
+        self.pending.add(task)
+        task.add_done_callback(self.pending.discard)
+        return task
+
+    async def drain(self):
+        """Aguarda as execuções pendentes."""
+        if self.pending:
+            await asyncio.gather(*list(self.pending), return_exceptions=True)
+
+    def stats(self):
+        """Contadores e percentis da latência fechamento do candle -> ack da ordem."""
+        latencies = np.array(self.latencies)
+        return {
+            "max_concurrency": self.max_concurrency,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "running": self.running,
+            "pending": len(self.pending),
+            "latency_ms": {
+                "count": int(len(latencies)),
+                "p50": float(np.percentile(latencies, 50)) if len(latencies) else None,
+                "p95": float(np.percentile(latencies, 95)) if len(latencies) else None,
+                "max": float(latencies.max()) if len(latencies) else None,
+            },
+        }
+
+    async def _execute(self, symbol, execute, candle_close):
+        # O lock do símbolo é adquirido antes do semáforo para não ocupar vagas enquanto espera
+        async with self.symbol_locks[symbol]:
+            async with self.semaphore:
+                self.running += 1
+                try:
+                    order = await execute()
+                except Exception as e:
+                    self.failed += 1
+                    print(f"Erro na execução agendada para {symbol}: {e}")
+                    return None
+                finally:
+                    self.running -= 1
+
+        if not order:
+            self.failed += 1
+            return order
+        self.completed += 1
+        if candle_close is not None:
+            # updateTime é o horário do ack na Binance, no mesmo relógio do fechamento do candle
+            ack = order.get("updateTime") or time.time() * 1000
+            latency = float(ack) - candle_close
+            self.latencies.append(latency)
+            CANDLE_TO_ORDER.observe(latency / 1000, symbol=symbol)
+            print(f"Ordem {order.get('orderId')} de {symbol} confirmada {latency:.0f} ms após o fechamento do candle")
+        return order
@@ -0,0 +1,92 @@
+import numpy as np
+from data.candle_buffer import RingBuffer
+from technicals.streaming import EMAPERStream
+from constants.defs import CANDLE_BUFFER_CAPACITY
+
+
+class SharedIndicators:
+    def __init__(self, ema_s, capacity=CANDLE_BUFFER_CAPACITY):
+        """
+        Pilha de indicadores compartilhada por todos os traders com o mesmo símbolo, intervalo e ema_s.
+        Mantém o histórico de cada coluna em buffers circulares.
+        """
+        self.stream = EMAPERStream(ema_s)
+        self.capacity = capacity
+        self.columns = {}
+        self.time = RingBuffer(capacity, dtype="datetime64[ns]")
+        self.last_time = None
+
+    def advance(self, candles):
+        """
+        Processa os candles do buffer ainda não vistos.
+        :param candles: CandleBuffer do símbolo/intervalo.
+        """
+        times = candles.view("Time")
+        closes = candles.view("Close")
+        start = 0
+        if self.last_time is not None:
+            start = int(np.searchsorted(times, self.last_time, side="right"))
+
+        for time, close in zip(times[start:], closes[start:]):
+            row = self.stream.update(float(close))
+            if row is None:
+                continue
+            if not self.columns:
+                self.columns = {column: RingBuffer(self.capacity) for column in row}
+            for column, value in row.items():
+                self.columns[column].append(value)
+            self.time.append(time)
+        if len(times):
+            self.last_time = times[-1]
+
+    def snapshot(self):
+        """Retorna views somente-leitura de todas as colunas calculadas."""
+        data = {column: buffer.view() for column, buffer in self.columns.items()}
+        data["Time"] = self.time.view()
+        return data
+
+
+class IndicatorCache:
+    def __init__(self):
+        """
+        Memoização por candle dos indicadores compartilhados entre traders.
+        A chave é (símbolo, intervalo, ema_s) e o cálculo ocorre uma única vez por timestamp de candle.
+        """
+        self.entries = {}
+        self.snapshots = {}
+
+    def get(self, symbol, interval, ema_s, candles, timestamp):
+        """
+        Retorna os indicadores compartilhados para o candle informado.
+        :param symbol: Ativo (ex: 'BTCUSDT').
+        :param interval: Intervalo do candle (ex: '1m').
+        :param ema_s: Período da EMA curta.
+        :param candles: CandleBuffer do símbolo/intervalo.
+        :param timestamp: Horário de abertura do candle que disparou o cálculo.
+        :return: Dicionário {coluna: array somente-leitura}, incluindo 'Time'.
+        """
+        key = (symbol, interval, ema_s)
+        cached = self.snapshots.get(key)
+        if cached is not None and cached[0] == timestamp:
+            return cached[1]
+
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self.entries[key] = SharedIndicators(ema_s)
+        entry.advance(candles)
+
+        snapshot = entry.snapshot()
+        self.snapshots[key] = (timestamp, snapshot)
+        return snapshot
+
+    def discard(self, symbol, interval):
+        """Remove os indicadores de um símbolo/intervalo (todos os ema_s)."""
+        for key in [key for key in self.entries if key[:2] == (symbol, interval)]:
+            del self.entries[key]
+        for key in [key for key in self.snapshots if key[:2] == (symbol, interval)]:
+            del self.snapshots[key]
+
+    def clear(self):
+        """Remove todos os indicadores em cache."""
+        self.entries.clear()
+        self.snapshots.clear()
@@ -1,7 +1,25 @@
 from core.manager import TraderManager
 from core.pair_trader_manager import PairTraderManager
+from data.collector import KlineStreamIngestor
+from data.kline_archive import KlineArchive, KlineArchiveWriter
+from data.aligned_matrix import AlignedMatrixStore
+from operations.order_tracker import OrderTracker
+from operations.sizing import sizing_service
+
+# Gravação do arquivo colunar em thread própria, fora do loop do stream
+kline_archive_writer = KlineArchiveWriter(KlineArchive())
+
+# Combined stream único compartilhado pelos gerenciadores; candles fechados vão para o arquivo colunar
+# e para as matrizes alinhadas por horário usadas pelos pair traders, e o último preço para o dimensionamento
+stream_ingestor = KlineStreamIngestor(archive=kline_archive_writer, aligned=AlignedMatrixStore(), prices=sizing_service)
 
 # Instância única de TraderManager
-trader_manager = TraderManager()
+trader_manager = TraderManager(stream_ingestor)
+
+pair_trader_manager = PairTraderManager(stream_ingestor)
 
-pair_trader_manager = PairTraderManager()
+# Fechamentos por TP/SL via user-data stream de futuros, para os dois executores
+order_tracker = OrderTracker(
+    [trader_manager.trade_executor, pair_trader_manager.pair_trade_executor], sizing=sizing_service
+)
+pair_trader_manager.order_tracker = order_tracker
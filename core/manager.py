@@ -1,40 +1,50 @@
 import asyncio
 import hashlib
-from data.collector import stream_data
+from data.collector import KlineStreamIngestor, is_stale_candle
 from models.trader import LongShortTrader
 from data.database import DataDB
 from binance import BinanceSocketManager, AsyncClient
 from datetime import datetime
 from core.strategies import get_strategy
 from core.signal_manager import SignalManager
-from datetime import datetime, timedelta
-from pytz import UTC
-from binance.client import Client
 from operations.trade_executor import TradeExecutor
+from operations.async_trade_executor import AsyncTradeExecutor
+from data.candle_buffer import CandleBuffer
+from data.historical import HistoricalKlineLoader
+from data.write_behind import WriteBehindQueue
+from core.indicator_cache import IndicatorCache
+from core.metrics import instrument_binance_client
 import pandas as pd
 from constants.defs import (
     BINANCE_KEY,
     BINANCE_TESTNET_KEY,
     BINANCE_SECRET,
     BINANCE_TESTNET_SECRET,
+    INTRABAR_EXITS,
 )
 
 class TraderManager:
-    def __init__(self):
+    def __init__(self, stream_ingestor=None):
         self.active_trader_instances = {}
         self.background_tasks = []
         self.client = None
         self.bm = None
         self.db = DataDB()
-        self.signal_manager = SignalManager(total_tasks=0)
+        self.signal_manager = SignalManager()
         self.trade_executor = TradeExecutor()
-        self.candle_data = {}
-        self.active_streams = set()
+        self.candle_data = {}  # CandleBuffer por (símbolo, intervalo)
+        self.indicator_cache = IndicatorCache()
+        self.active_streams = set()  # (símbolo, intervalo) assinados no ingestor
+        self.stream_ingestor = stream_ingestor or KlineStreamIngestor()
+        self.historical_loader = HistoricalKlineLoader()
+        self.snapshot_writer = WriteBehindQueue("candle_snapshots")  # Snapshots de candle de todos os traders
         
     async def init_binance_client(self):
-        """Inicializa o cliente Binance e o Socket Manager."""
-        self.client = await AsyncClient.create()
+        """Inicializa o cliente Binance, o Socket Manager e o executor assíncrono de ordens."""
+        self.client = instrument_binance_client(await AsyncClient.create(api_key=BINANCE_KEY, api_secret=BINANCE_SECRET))
         self.bm = BinanceSocketManager(self.client)
+        self.historical_loader.client = self.client
+        self.signal_manager.async_trade_executor = AsyncTradeExecutor(self.client, self.trade_executor)
 
     async def close_binance_client(self):
         """Fecha o cliente Binance e cancela as tarefas em segundo plano."""
@@ -45,15 +55,16 @@ class TraderManager:
         except Exception as e:
             print(f"Erro ao atualizar active_traders no banco de dados: {e}")
 
-        # Cancela todas as instâncias de traders ativos em memória
-        for trade_id, trader in self.active_trader_instances.items():
+        # Cancela as assinaturas de streams e as instâncias de traders ativos em memória
+        for symbol, interval in list(self.active_streams):
             try:
-                # Remove o símbolo de streams ativos, se aplicável
-                if trader.symbol in self.active_streams:
-                    self.active_streams.remove(trader.symbol)
+                self.stream_ingestor.unsubscribe(symbol, interval, self.process_stream_message)
             except Exception as e:
-                print(f"Erro ao cancelar stream para trade_id {trade_id}: {e}")
+                print(f"Erro ao cancelar stream para {symbol}: {e}")
+        self.active_streams.clear()
         self.active_trader_instances.clear()  # Limpa todas as instâncias locais
+        self.signal_manager.trade_params.clear()
+        self.signal_manager.candle_barrier.clear()
 
         # Cancela todas as tarefas em segundo plano
         for task in self.background_tasks:
@@ -63,6 +74,9 @@ class TraderManager:
             except asyncio.CancelledError:
                 pass
 
+        # Grava os snapshots de candle ainda enfileirados
+        await asyncio.to_thread(self.snapshot_writer.stop)
+
         # Fecha a conexão com o cliente Binance
         if self.client:
             try:
@@ -129,8 +143,10 @@ class TraderManager:
         )
 
         # Obter dados históricos
-        if symbol not in self.candle_data:
-            self.candle_data[symbol] = self.get_historical_data(symbol, bar_length)
+        if (symbol, bar_length) not in self.candle_data:
+            self.candle_data[(symbol, bar_length)] = CandleBuffer.from_dataframe(
+                await self.get_historical_data(symbol, bar_length)
+            )
 
         # Configura a estratégia e reinicia a instância do trader
         strategy = get_strategy(strategy_type)
@@ -148,7 +164,7 @@ class TraderManager:
             self
         )
         self.active_trader_instances[trade_id] = trader
-        self.signal_manager.total_tasks += 1
+        self.signal_manager.register_trader(trade_id, {**existing_trade, "active": True})
         
         # Configura stream e dados históricos
         await self._initialize_data_stream(symbol, trade_id)
@@ -158,8 +174,10 @@ class TraderManager:
     async def _setup_new_trader(self, symbol, bar_length, strategy_type, trade_id, params):
         """Configura um novo trader e inicia o stream de dados."""
         # Obter dados históricos
-        if symbol not in self.candle_data:
-            self.candle_data[symbol] = self.get_historical_data(symbol, bar_length)
+        if (symbol, bar_length) not in self.candle_data:
+            self.candle_data[(symbol, bar_length)] = CandleBuffer.from_dataframe(
+                await self.get_historical_data(symbol, bar_length)
+            )
 
         # Configurar estratégia e instância do trader
         strategy = get_strategy(strategy_type)
@@ -177,64 +195,52 @@ class TraderManager:
             self
         )
         self.active_trader_instances[trade_id] = trader
-        self.signal_manager.total_tasks += 1
 
         # Salvar informações no banco de dados
-        self.db.add_one(
-            "active_traders",
-            {
-                "trade_id": trade_id,
-                **params,
-                "active": True,
-                "start_time": datetime.now(),
-            }
-        )
+        trade_params = {
+            "trade_id": trade_id,
+            **params,
+            "active": True,
+            "start_time": datetime.now(),
+        }
+        self.db.add_one("active_traders", dict(trade_params))
+        self.signal_manager.register_trader(trade_id, trade_params)
 
         # Configurar stream
         await self._initialize_data_stream(symbol, trade_id)
 
     async def _initialize_data_stream(self, symbol, trade_id):
-        """Inicia o stream de dados para um símbolo específico."""
-        if self.bm is None:
-            raise RuntimeError("BinanceSocketManager (bm) não foi inicializado.")
-
-        if symbol not in self.active_streams:
-            self.active_streams.add(symbol)
-            task = asyncio.create_task(stream_data(symbol, trade_id, self.bm, self))
-            self.background_tasks.append(task)
+        """Assina o stream de klines do símbolo/intervalo do trader no ingestor compartilhado."""
+        interval = self.active_trader_instances[trade_id].bar_length
+        if (symbol, interval) not in self.active_streams:
+            self.active_streams.add((symbol, interval))
+            self.stream_ingestor.subscribe(symbol, interval, self.process_stream_message)
+
+    def _release_data_stream(self, symbol, interval):
+        """
+        Cancela a assinatura do stream quando nenhum trader ativo o utiliza.
+        O buffer e os indicadores do símbolo/intervalo também são descartados: sem o stream eles
+        ficariam com uma lacuna, e o próximo trader recarrega o histórico ao assinar novamente.
+        """
+        in_use = any(
+            trader.symbol == symbol and trader.bar_length == interval
+            for trader in self.active_trader_instances.values()
+        )
+        if not in_use and (symbol, interval) in self.active_streams:
+            self.active_streams.discard((symbol, interval))
+            self.stream_ingestor.unsubscribe(symbol, interval, self.process_stream_message)
+            self.candle_data.pop((symbol, interval), None)
+            self.indicator_cache.discard(symbol, interval)
     
-    def get_historical_data(self, symbol, interval):
+    async def get_historical_data(self, symbol, interval):
         """Obtem dados históricos de candle para um símbolo específico."""
-        print(f"Adicionando dados historicos para {symbol}......")
-        now = datetime.now(UTC)
-        past = str(now - timedelta(days=8)) # 8 dias para ficar algo proximo de 10000 candles
-
-        client = Client(api_key=BINANCE_KEY, api_secret=BINANCE_SECRET, tld="com")
-        bars = client.get_historical_klines(symbol=symbol, interval=interval, start_str=past, end_str=None)
-
-        df = pd.DataFrame(bars)
-        df["Date"] = pd.to_datetime(df.iloc[:, 0], unit="ms")
-        df.columns = [
-            "Open Time", "Open", "High", "Low", "Close", "Volume",
-            "Close Time", "Quote Asset Volume", "Number of Trades",
-            "Taker Buy Base Asset Volume", "Taker Buy Quote Asset Volume", "Ignore", "Date",
-        ]
-        df = df[["Date", "Open", "High", "Low", "Close", "Volume"]].copy()
-        
-        df["Time"] = df["Date"].copy()
-        
-        df.set_index("Date", inplace=True)
-        for column in df.columns:
-            if column != "Time":
-                df[column] = pd.to_numeric(df[column], errors="coerce")
-        df["Complete"] = [True for _ in range(len(df) - 1)] + [False]
-        
-        print(f"Dados historicos para {symbol} adicionados!")
-        return df
+        # 8 dias para ficar algo proximo de 10000 candles
+        return await self.historical_loader.load(symbol, interval, days=8)
     
     def process_stream_message(self, symbol, msg):
         """Processa a mensagem de stream e verifica se o candle está completo."""
         start_time = pd.to_datetime(msg["k"]["t"], unit="ms")
+        interval = msg["k"]["i"]
         first = float(msg["k"]["o"])
         high = float(msg["k"]["h"])
         low = float(msg["k"]["l"])
@@ -252,24 +258,38 @@ class TraderManager:
             complete
         ]
 
-        # Atualiza o DataFrame centralizado apenas quando o candle está completo
+        # Atualiza o buffer centralizado apenas quando o candle está completo
         if complete:
-            self.update_candle_data(symbol, candle_data, start_time)
-
-    def update_candle_data(self, symbol, candle_data, start_time):
+            if msg.get("backfill") and is_stale_candle(interval, msg["k"]["t"]):
+                self.update_candle_history(symbol, interval, candle_data, start_time)
+            else:
+                self.update_candle_data(symbol, interval, candle_data, start_time)
+        elif INTRABAR_EXITS:
+            self.monitor_trades_intrabar(symbol, close)
+
+    def update_candle_data(self, symbol, interval, candle_data, start_time):
         """Atualiza os dados de candle centralizados e notifica traders ativos."""
-        # Adiciona o novo candle ao DataFrame centralizado
-        df = self.candle_data[symbol]
-        df.loc[start_time] = candle_data
-        self.candle_data[symbol] = df
-        
-        self.monitor_trades_for_partial_close(symbol, self.candle_data[symbol].iloc[-1])
+        # Adiciona o novo candle ao buffer centralizado (O(1), sem realocar o histórico)
+        candles = self.candle_data[(symbol, interval)]
+        candles.append(*candle_data)
+
+        self.monitor_trades_for_partial_close(symbol, candles.last())
         
         # Notifica todas as instâncias de LongShortTrader para o símbolo quando um candle estiver completo
         for trade_id, trader in self.active_trader_instances.items():
-            if trader.symbol == symbol:
+            if trader.symbol == symbol and trader.bar_length == interval:
                 trader.define_strategy(start_time)
 
+    def update_candle_history(self, symbol, interval, candle_data, start_time):
+        """
+        Adiciona um candle antigo (recuperado pelo backfill) ao buffer e aos indicadores dos traders,
+        sem monitorar trades abertos nem avaliar sinais: o preço desse candle não é o preço atual.
+        """
+        self.candle_data[(symbol, interval)].append(*candle_data)
+        for trader in self.active_trader_instances.values():
+            if trader.symbol == symbol and trader.bar_length == interval:
+                trader.update_history(start_time)
+
     def monitor_trades_for_partial_close(self, symbol, candle_data):
         """
         Monitora opened_trades ativos para o símbolo fornecido e verifica
@@ -278,27 +298,40 @@ class TraderManager:
         :param candle_data: Dados do candle atual.
         """
         try:
-            # Recupera todos os opened_trades ativos
-            all_active_trades = self.trade_executor.get_opened_trades(activate=True)
+            # Recupera os opened_trades ativos do símbolo (livro de posições em memória)
+            symbol_active_trades = self.trade_executor.get_opened_trades(activate=True, symbol=symbol)
             current_price = candle_data["Close"]
             
-            if not all_active_trades:
+            if not symbol_active_trades:
                 return
             
-            for opened_trade in all_active_trades:
-                # Filtra os opened_trades ativos do símbolo específico
-                if opened_trade["symbol"] == symbol:
-                    # Se o trade ainda não teve parcial ativada, verifica Break Even
-                    if not opened_trade["break_even"]:
-                        print(f"Verificando Break Even e parcial para trade aberto {opened_trade['_id']} - {symbol}")
-                        self.trade_executor.check_break_even_and_partial(opened_trade, current_price)
-
-                    # Monitora TP e SL para todos os trades ativos
-                    print(f"Monitorando TP/SL para trade aberto {opened_trade['_id']} - {symbol}")
-                    self.trade_executor.monitor_tp_sl_for_remaining_position(opened_trade, current_price)
+            for opened_trade in symbol_active_trades:
+                # Se o trade ainda não teve parcial ativada, verifica Break Even
+                if not opened_trade["break_even"]:
+                    print(f"Verificando Break Even e parcial para trade aberto {opened_trade['_id']} - {symbol}")
+                    self.trade_executor.check_break_even_and_partial(opened_trade, current_price)
+
+                # Monitora TP e SL para todos os trades ativos
+                print(f"Monitorando TP/SL para trade aberto {opened_trade['_id']} - {symbol}")
+                self.trade_executor.monitor_tp_sl_for_remaining_position(opened_trade, current_price)
         except Exception as e:
             print(f"Erro ao monitorar opened_trades para fechamento parcial: {e}")
 
+    def monitor_trades_intrabar(self, symbol, current_price):
+        """
+        Avalia as regras de saída a cada atualização de kline, tocando apenas
+        os trades cujos níveis de TP, SL ou Break Even foram cruzados.
+        :param symbol: Ativo monitorado (ex: 'BTCUSDT').
+        :param current_price: Último preço do kline em formação.
+        """
+        try:
+            for opened_trade in self.trade_executor.get_triggered_trades(symbol, current_price):
+                if not opened_trade["break_even"]:
+                    self.trade_executor.check_break_even_and_partial(opened_trade, current_price)
+                self.trade_executor.monitor_tp_sl_for_remaining_position(opened_trade, current_price)
+        except Exception as e:
+            print(f"Erro ao monitorar opened_trades intra-candle: {e}")
+
     async def stop_trading(self, trade_id):
         """Encerra a sessão de trading para um símbolo específico."""
         # Verifica se o trade_id existe em active_trader_instances
@@ -307,6 +340,8 @@ class TraderManager:
         if trader:
             # Remove a instância do dicionário ativo
             self.active_trader_instances.pop(trade_id)
+            self.signal_manager.unregister_trader(trade_id)
+            self._release_data_stream(trader.symbol, trader.bar_length)
 
         # Verifica o banco de dados
         existing_trade = self.db.query_single("active_traders", trade_id=trade_id, active=True)
@@ -0,0 +1,150 @@
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from urllib.parse import urlsplit
+from pymongo import monitoring
+
+# Limites (segundos) padrão dos buckets: de 1 ms a 30 s
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Histogram:
+    def __init__(self, name, description, labels=(), buckets=DEFAULT_BUCKETS):
+        """
+        Histograma com buckets cumulativos no formato do Prometheus.
+        :param name: Nome da métrica (ex: 'binance_rest_seconds').
+        :param description: Texto do HELP.
+        :param labels: Nomes dos labels; os valores são informados em observe().
+        :param buckets: Limites superiores dos buckets, em ordem crescente.
+        """
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self.series = {}  # valores dos labels -> [contagem por bucket, soma, total]
+        self.lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        """Registra uma observação (em segundos)."""
+        key = tuple(str(labels.get(label, "")) for label in self.labels)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Mede a duração do bloco."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self):
+        """Linhas do histograma no formato texto do Prometheus."""
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            series = {key: (list(counts), total, count) for key, (counts, total, count) in self.series.items()}
+        for key, (counts, total, count) in sorted(series.items()):
+            labels = [f'{label}="{_escape(value)}"' for label, value in zip(self.labels, key)]
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                bucket_labels = ",".join(labels + [f'le="{bound}"'])
+                lines.append(f"{self.name}_bucket{{{bucket_labels}}} {cumulative}")
+            bucket_labels = ",".join(labels + ['le="+Inf"'])
+            lines.append(f"{self.name}_bucket{{{bucket_labels}}} {count}")
+            suffix = "{" + ",".join(labels) + "}" if labels else ""
+            lines.append(f"{self.name}_sum{suffix} {total}")
+            lines.append(f"{self.name}_count{suffix} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        """Registro dos histogramas expostos em /metrics."""
+        self.histograms = {}
+
+    def histogram(self, name, description, labels=(), buckets=DEFAULT_BUCKETS):
+        """Retorna o histograma `name`, criando-o na primeira chamada."""
+        if name not in self.histograms:
+            self.histograms[name] = Histogram(name, description, labels, buckets)
+        return self.histograms[name]
+
+    def render(self):
+        """Todas as métricas no formato texto do Prometheus."""
+        lines = []
+        for histogram in self.histograms.values():
+            lines.extend(histogram.render())
+        return "\n".join(lines) + "\n"
+
+
+# Instância única do processo
+metrics = MetricsRegistry()
+
+# Estágios do pipeline candle -> sinal -> ordem
+KLINE_RECEIVE_LAG = metrics.histogram(
+    "kline_receive_lag_seconds", "Atraso entre o fechamento do kline e o recebimento no websocket", ("interval",)
+)
+TRADER_STRATEGY_TIME = metrics.histogram(
+    "trader_strategy_seconds", "Cálculo de indicadores e da estratégia por trader a cada candle", ("trade_id",)
+)
+SIGNAL_BARRIER_WAIT = metrics.histogram(
+    "signal_barrier_wait_seconds", "Espera da rodada de sinais na barreira por candle", ("interval", "outcome")
+)
+MONGO_COMMAND_TIME = metrics.histogram("mongo_command_seconds", "Duração dos comandos do MongoDB", ("command",))
+BINANCE_REST_TIME = metrics.histogram(
+    "binance_rest_seconds", "Round-trip das chamadas REST da Binance", ("method", "path")
+)
+CANDLE_TO_ORDER = metrics.histogram(
+    "candle_to_order_seconds", "Latência entre o fechamento do candle e o ack da ordem", ("symbol",)
+)
+
+
+class MongoCommandTimer(monitoring.CommandListener):
+    """Listener do pymongo que registra a duração de cada comando em MONGO_COMMAND_TIME."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_COMMAND_TIME.observe(event.duration_micros / 1_000_000, command=event.command_name)
+
+    def failed(self, event):
+        MONGO_COMMAND_TIME.observe(event.duration_micros / 1_000_000, command=event.command_name)
+
+
+def instrument_binance_client(client):
+    """
+    Mede o round-trip das chamadas REST de um Client/AsyncClient da python-binance,
+    envolvendo o _request da própria instância.
+    :return: O mesmo cliente.
+    """
+    request = client._request
+
+    if inspect.iscoroutinefunction(request):
+        @wraps(request)
+        async def timed_request(method, uri, *args, **kwargs):
+            with BINANCE_REST_TIME.time(method=method.upper(), path=urlsplit(uri).path):
+                return await request(method, uri, *args, **kwargs)
+    else:
+        @wraps(request)
+        def timed_request(method, uri, *args, **kwargs):
+            with BINANCE_REST_TIME.time(method=method.upper(), path=urlsplit(uri).path):
+                return request(method, uri, *args, **kwargs)
+
+    client._request = timed_request
+    return client
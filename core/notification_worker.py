@@ -0,0 +1,242 @@
+import asyncio
+import io
+import time
+from telegram import InputMediaPhoto
+from telegram.error import RetryAfter
+from core.telegram_bot import bot
+from core.process_pool import spawn_process_pool
+from constants.defs import (
+    CHAT_TELEGRAM_ID,
+    NOTIFY_BATCH_WINDOW,
+    NOTIFY_MAX_QUEUED,
+    NOTIFY_RATE_LIMIT,
+    NOTIFY_RENDER_WORKERS,
+)
+
+# Limites da API do Telegram
+MAX_MESSAGE_LENGTH = 4096
+MAX_MEDIA_GROUP = 10
+
+
+def render_candle_chart(candles):
+    """
+    Gera o gráfico de candlestick em PNG na memória.
+    Executado nos processos do pool de renderização.
+    :param candles: DataFrame indexado por Time com Open, High, Low, Close.
+    :return: Bytes do PNG.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import mplfinance as mpf
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    try:
+        mpf.plot(candles, type="candle", ax=ax)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png")
+        return buffer.getvalue()
+    finally:
+        plt.close(fig)
+
+
+class NotificationWorker:
+    def __init__(self, chat_id=CHAT_TELEGRAM_ID, telegram_bot=bot, batch_window=NOTIFY_BATCH_WINDOW,
+                 rate_limit=NOTIFY_RATE_LIMIT, max_queued=NOTIFY_MAX_QUEUED, render_workers=NOTIFY_RENDER_WORKERS):
+        """
+        Envia as notificações de sinais ao Telegram fora do caminho de trading.
+        As notificações são enfileiradas sem bloquear; uma task agrupa as que chegam dentro
+        de `batch_window` segundos, mantém apenas a última por chave (trader), renderiza
+        os gráficos em um pool de processos e envia tudo por uma única sessão do bot.
+        :param batch_window: Janela de agrupamento de rajadas, em segundos.
+        :param rate_limit: Máximo de chamadas à API do Telegram por segundo.
+        :param max_queued: Limite da fila; acima dele novas notificações são descartadas e contadas.
+        :param render_workers: Processos de renderização dos gráficos.
+        """
+        self.chat_id = chat_id
+        self.bot = telegram_bot
+        self.batch_window = batch_window
+        self.min_interval = 1 / rate_limit if rate_limit else 0.0
+        self.max_queued = max_queued
+        self.render_workers = render_workers
+        self.queue = None
+        self.loop = None
+        self.task = None
+        self.pool = None
+        self.last_request = 0.0
+
+        # Métricas
+        self.enqueued = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.sent = 0
+        self.failed = 0
+        self.batches = 0
+
+    async def start(self):
+        """Inicia a task de envio, que abre a sessão do bot (idempotente)."""
+        if self.task is not None and not self.task.done():
+            return
+        self._start(asyncio.get_running_loop())
+
+    async def stop(self):
+        """Envia o que restou na fila, encerra a task, o pool de renderização e a sessão do bot."""
+        if self.task is None:
+            return
+        await self.queue.put(None)
+        try:
+            await self.task
+        except Exception as e:
+            print(f"Erro ao encerrar o envio de notificações: {e}")
+        self.task = None
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+        try:
+            await self.bot.shutdown()
+        except Exception as e:
+            print(f"Erro ao encerrar o bot do Telegram: {e}")
+
+    def notify(self, key, text, candles=None):
+        """
+        Enfileira uma notificação sem bloquear. Pode ser chamada de qualquer thread.
+        :param key: Identificador do trader; notificações da mesma chave em uma rajada são agrupadas.
+        :param text: Texto da mensagem.
+        :param candles: DataFrame opcional para o gráfico de candlestick.
+        :return: False se a notificação foi descartada.
+        """
+        if self.task is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self.dropped += 1
+                return False
+            self._start(loop)
+
+        item = (key, text, candles)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            return self._put(item)
+        self.loop.call_soon_threadsafe(self._put, item)
+        return True
+
+    def stats(self):
+        """Métricas da fila de notificações."""
+        return {
+            "queue_depth": self.queue.qsize() if self.queue is not None else 0,
+            "queue_capacity": self.max_queued,
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "sent": self.sent,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
+
+    def _start(self, loop):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=self.max_queued)
+        self.task = loop.create_task(self._run())
+
+    def _put(self, item):
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        self.enqueued += 1
+        return True
+
+    async def _run(self):
+        try:
+            await self.bot.initialize()
+        except Exception as e:
+            print(f"Erro ao inicializar o bot do Telegram: {e}")
+
+        stopping = False
+        while not stopping:
+            item = await self.queue.get()
+            if item is None:
+                break
+
+            # Agrupa a rajada: a última notificação de cada chave prevalece
+            batch = {item[0]: item}
+            deadline = time.monotonic() + self.batch_window
+            while True:
+                timeout = deadline - time.monotonic()
+                try:
+                    item = self.queue.get_nowait() if timeout <= 0 else await asyncio.wait_for(self.queue.get(), timeout)
+                except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                if item[0] in batch:
+                    self.coalesced += 1
+                    del batch[item[0]]
+                batch[item[0]] = item
+
+            try:
+                await self._send_batch(list(batch.values()))
+            except Exception as e:
+                self.failed += len(batch)
+                print(f"Erro ao enviar notificações: {e}")
+
+    async def _send_batch(self, batch):
+        self.batches += 1
+        charts = await asyncio.gather(*(self._render(candles) for _, _, candles in batch))
+
+        # Textos concatenados no menor número de mensagens possível
+        message = ""
+        for _, text, _ in batch:
+            if message and len(message) + len(text) + 1 > MAX_MESSAGE_LENGTH:
+                await self._call(self.bot.send_message, chat_id=self.chat_id, text=message)
+                message = ""
+            message = f"{message}\n{text}" if message else text[:MAX_MESSAGE_LENGTH]
+        if message:
+            await self._call(self.bot.send_message, chat_id=self.chat_id, text=message)
+
+        # Gráficos enviados em álbuns, cada um com a chave do trader na legenda
+        photos = [(key, chart) for (key, _, _), chart in zip(batch, charts) if chart is not None]
+        for start in range(0, len(photos), MAX_MEDIA_GROUP):
+            group = photos[start:start + MAX_MEDIA_GROUP]
+            if len(group) == 1:
+                key, chart = group[0]
+                await self._call(self.bot.send_photo, chat_id=self.chat_id, photo=chart, caption=str(key))
+            else:
+                media = [InputMediaPhoto(chart, caption=str(key)) for key, chart in group]
+                await self._call(self.bot.send_media_group, chat_id=self.chat_id, media=media)
+        self.sent += len(batch)
+
+    async def _render(self, candles):
+        if candles is None or not len(candles):
+            return None
+        if self.pool is None:
+            self.pool = spawn_process_pool(self.render_workers)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.pool, render_candle_chart, candles)
+        except Exception as e:
+            print(f"Erro ao gerar gráfico da notificação: {e}")
+            return None
+
+    async def _call(self, method, **kwargs):
+        # Espaça as chamadas à API e respeita o retry_after do Telegram
+        for _ in range(3):
+            wait = self.last_request + self.min_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self.last_request = time.monotonic()
+            try:
+                return await method(**kwargs)
+            except RetryAfter as e:
+                retry_after = e.retry_after.total_seconds() if hasattr(e.retry_after, "total_seconds") else e.retry_after
+                print(f"Limite do Telegram atingido, aguardando {retry_after}s")
+                await asyncio.sleep(retry_after)
+        raise RuntimeError("Limite do Telegram excedido após 3 tentativas.")
+
+
+# Instância única compartilhada pelos traders e pair traders
+notification_worker = NotificationWorker()
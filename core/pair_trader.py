@@ -1,6 +1,9 @@
-from core.pair_trading_strategy import detect_signals_strategy_1
+import pandas as pd
+from core.pair_trading_strategy import detect_last_signal_strategy_1
 from data.database import DataDB
 from core.signal_pair_manager import SignalPairManager
+from technicals.streaming import PairSpreadStream
+from constants.defs import CANDLE_BUFFER_CAPACITY
 class PairTrader:
     def __init__(self, pair_trader_id, target_asset, cluster_assets, entry_threshold, 
                  exit_threshold, window, interval,
@@ -15,10 +18,15 @@ class PairTrader:
         self.pair_trade_executor = pair_trade_executor
         self.db = DataDB()
         self.signal_pair_manager = SignalPairManager()
+        self.spread = None  # PairSpreadStream, semeado com o histórico no primeiro candle sincronizado
+        self.last_time = None
+        self.last_row = None
+        self.candles = None  # CandleBuffer do ativo alvo (gráfico das notificações), definido pelo manager
         
     def prepare_data(self, dfs, df_target):
         """
-        Sincroniza e processa dados históricos para o par.
+        Sincroniza e processa dados históricos para o par (cálculo em lote com merge de todo o histórico,
+        referência do cálculo incremental de seed/update sobre a matriz alinhada).
         """
         # Aqui usaremos os métodos de sincronização e cálculo da estratégia de pair-trading
         from core.pair_trading_strategy import synchronize_dataframes, apply_regression, calculate_zscore
@@ -30,28 +38,79 @@ class PairTrader:
 
         return df
 
-    def define_strategy(self, dfs, df_target):
+    def seed(self, matrix):
         """
-        Define a estratégia a ser executada após a sincronização dos dados.
+        Alimenta o cálculo incremental com as linhas completas da matriz alinhada.
+        :return: Linha do último horário em comum (ou None sem histórico em comum).
         """
-        # Sincronizar e calcular dados atualizados
-        self.df = self.prepare_data(dfs, df_target)
-        
+        times, closes = matrix.aligned(self.symbols())
+        # Mesma janela de regressão do caminho em lote, limitado pela capacidade dos buffers
+        self.spread = PairSpreadStream(len(self.cluster_assets), self.window, CANDLE_BUFFER_CAPACITY)
+        if not len(times):
+            return None
+
+        # Momentos da regressão e da janela do Z-Score em lote; só a última linha é calculada
+        row = self.spread.seed(closes[:, -1], closes[:, :-1])
+        self.last_time = int(times[-1])
+        return self._row(self.last_time, closes[-1, -1], row)
+
+    def update(self, matrix, open_time):
+        """
+        Atualiza regressão e Z-Score com a linha do horário, em O(1).
+        :return: Linha do candle ou None se a linha não estiver completa ou já tiver sido processada.
+        """
+        if self.last_time is not None and open_time <= self.last_time:
+            return None
+        closes = matrix.row(self.symbols(), open_time)
+        if closes is None:
+            return None
+
+        self.last_time = open_time
+        return self._row(open_time, closes[-1], self.spread.update(closes[-1], closes[:-1]))
+
+    def update_history(self, matrix, open_time):
+        """
+        Avança regressão e Z-Score com uma linha antiga (recuperada pelo backfill), sem avaliar sinais.
+        """
+        if self.spread is None:
+            self.seed(matrix)
+        else:
+            self.update(matrix, open_time)
+
+    def symbols(self):
+        """Colunas da matriz alinhada usadas pelo par: ativos do cluster e, por último, o alvo."""
+        return self.cluster_assets + [self.target_asset]
+
+    def _row(self, open_time, close, spread):
+        return {"Time": pd.Timestamp(open_time, unit="ms"), "Close": float(close), **spread}
+
+    def define_strategy(self, matrix, open_time=None):
+        """
+        Define a estratégia a ser executada quando todos os ativos fecham o mesmo candle.
+        :param matrix: AlignedCandleMatrix do intervalo do par.
+        :param open_time: Horário de abertura (ms) da linha que completou.
+        """
+        if self.spread is None:
+            row = self.seed(matrix)
+        else:
+            row = self.update(matrix, open_time)
+        if row is None:
+            return
+
         for opened_pair_trade in self.pair_trade_executor.get_opened_trades(activate=True):
             if self.pair_trader_id == opened_pair_trade['pair_trader_id']:
-                self.pair_trade_executor.check_zscore_change(opened_pair_trade, self.df['Z-Score'].values[-1])
-        
+                self.pair_trade_executor.check_zscore_change(opened_pair_trade, row['Z-Score'])
+
         # Processar sinais e executar ações baseadas neles
-        if not self.df.empty:
-            
-            self.df = detect_signals_strategy_1(self.df, self.entry_threshold, self.exit_threshold)
-            self.process_signals()
+        row.update(detect_last_signal_strategy_1(row["Z-Score"], self.entry_threshold, self.exit_threshold))
+        self.last_row = row
+        self.process_signals()
 
     def process_signals(self):
         """
         Processa sinais gerados pela estratégia e realiza ações (ex.: registrar ou executar).
         """
-        last_signal = self.df.iloc[-1]
+        last_signal = self.last_row
         print(self.target_asset, str(last_signal["Time"]), last_signal['Close'], last_signal["Z-Score"])
         if last_signal["SIGNAL_UP_PAIR1"] or last_signal["SIGNAL_DOWN_PAIR1"]:
             
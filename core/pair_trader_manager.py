@@ -1,15 +1,17 @@
-from binance.client import Client
 from binance import BinanceSocketManager, AsyncClient
-from datetime import datetime, timedelta
-from pytz import UTC
+from datetime import datetime
 import pandas as pd
 import asyncio
 import hashlib
-from data.collector import stream_data_pair
+from data.collector import KlineStreamIngestor, is_stale_candle
 from data.database import DataDB
 from core.pair_trader import PairTrader
 from operations.pair_trade_executor import PairTradeExecutor
 from core.config_pair_system_manager import ConfigPairSystemManager
+from data.candle_buffer import CandleBuffer
+from data.historical import HistoricalKlineLoader
+from data.aligned_matrix import AlignedMatrixStore
+from core.metrics import instrument_binance_client
 
 from constants.defs import (
     BINANCE_KEY,
@@ -19,21 +21,28 @@ from constants.defs import (
 )
 
 class PairTraderManager:
-    def __init__(self):
+    def __init__(self, stream_ingestor=None):
         self.active_pair_traders = {}
         self.background_tasks = []
         self.client = None
         self.bm = None
         self.db = DataDB()
-        self.candle_data = {}  # Armazena os candles históricos para cada ativo
-        self.candle_sync = {}  # Controle de sincronização de candles
-        self.active_streams = set()
+        self.candle_data = {}  # CandleBuffer por (símbolo, intervalo) com os candles históricos
+        self.active_streams = set()  # (símbolo, intervalo) assinados no ingestor
+        self.stream_ingestor = stream_ingestor or KlineStreamIngestor()
+        # Fechamentos alinhados por horário, preenchidos pelo ingestor
+        if self.stream_ingestor.aligned is None:
+            self.stream_ingestor.aligned = AlignedMatrixStore()
+        self.aligned_candles = self.stream_ingestor.aligned
+        self.historical_loader = HistoricalKlineLoader()
         self.pair_trade_executor = PairTradeExecutor()
+        self.order_tracker = None  # OrderTracker do user-data stream (definido em core.instances)
         
     async def init_binance_client(self):
         """Inicializa o cliente Binance e o Socket Manager."""
-        self.client = await AsyncClient.create()
+        self.client = instrument_binance_client(await AsyncClient.create())
         self.bm = BinanceSocketManager(self.client)
+        self.historical_loader.client = self.client
 
     async def close_binance_client(self):
         """Fecha o cliente Binance e cancela as tarefas em segundo plano."""
@@ -44,17 +53,16 @@ class PairTraderManager:
         except Exception as e:
             print(f"Erro ao atualizar active_pair_traders no banco de dados: {e}")
         
-        # Cancela todas as instâncias de traders ativos em memória
-        for pair_trader_id, trader in self.active_pair_traders.items():
+        # Cancela as assinaturas de streams e as instâncias de traders ativos em memória
+        for symbol, interval in list(self.active_streams):
             try:
-                # Remove o símbolo de streams ativos, se aplicável
-                if trader.target_asset in self.active_streams:
-                    self.active_streams.remove(trader.target_asset)
+                self.stream_ingestor.unsubscribe(symbol, interval, self.process_stream_message_pair)
             except Exception as e:
-                print(f"Erro ao cancelar stream para trade_id {pair_trader_id}: {e}")
+                print(f"Erro ao cancelar stream para {symbol}: {e}")
+        self.active_streams.clear()
         self.active_pair_traders.clear()  # Limpa todas as instâncias locais
         self.candle_data.clear()
-        self.candle_sync.clear()
+        self.aligned_candles.clear()
 
         # Cancela todas as tarefas em segundo plano
         for task in self.background_tasks:
@@ -74,34 +82,13 @@ class PairTraderManager:
 
 
 
-    def get_historical_data(self, symbol, interval):
-        """Obtem dados históricos de candle para um símbolo específico."""
-        print(f"Adicionando dados historicos para {symbol}......")
-        now = datetime.now(UTC)
-        past = str(now - timedelta(days=20)) # 20 dias para ficar algo proximo de 10000 candles
-
-        client = Client(api_key=BINANCE_KEY, api_secret=BINANCE_SECRET, tld="com")
-        bars = client.get_historical_klines(symbol=symbol, interval=interval, start_str=past, end_str=None)
-
-        df = pd.DataFrame(bars)
-        df["Date"] = pd.to_datetime(df.iloc[:, 0], unit="ms")
-        df.columns = [
-            "Open Time", "Open", "High", "Low", "Close", "Volume",
-            "Close Time", "Quote Asset Volume", "Number of Trades",
-            "Taker Buy Base Asset Volume", "Taker Buy Quote Asset Volume", "Ignore", "Date",
-        ]
-        df = df[["Date", "Open", "High", "Low", "Close", "Volume"]].copy()
-        
-        df["Time"] = df["Date"].copy()
-        
-        df.set_index("Date", inplace=True)
-        for column in df.columns:
-            if column != "Time":
-                df[column] = pd.to_numeric(df[column], errors="coerce")
-        df["Complete"] = [True for _ in range(len(df) - 1)] + [False]
-        
-        print(f"Dados historicos para {symbol} adicionados!")
-        return df
+    async def get_historical_data(self, symbols, interval):
+        """
+        Obtem dados históricos de candle para vários símbolos em paralelo.
+        :return: Dicionário {símbolo: DataFrame}.
+        """
+        # 20 dias para ficar algo proximo de 10000 candles
+        return await self.historical_loader.load_many(symbols, interval, days=20)
     
 
     def _generate_trade_id(self, **params):
@@ -157,10 +144,8 @@ class PairTraderManager:
 
         symbols = [existing_trade['target_symbol']] + existing_trade['cluster_symbols']
         
-        for symbol in symbols:
-            # Obter dados históricos
-            if symbol not in self.candle_data:
-                self.candle_data[symbol] = self.get_historical_data(symbol, '1m')
+        # Obter dados históricos de todos os símbolos em paralelo
+        await self._load_candle_data(symbols, '1m')
 
         pair_trader = PairTrader(existing_trade['pair_trader_id'], 
                                  existing_trade['target_symbol'], 
@@ -171,6 +156,7 @@ class PairTraderManager:
                                  interval='1m',
                                  pair_trade_executor=self.pair_trade_executor)
         self.active_pair_traders[existing_trade['pair_trader_id']] = pair_trader
+        self._subscribe_aligned_candles(pair_trader)
         
         # Configurar stream
         for symbol in symbols:
@@ -185,15 +171,14 @@ class PairTraderManager:
 
         symbols = [target_symbol] + cluster_symbols
         
-        for symbol in symbols:
-            # Obter dados históricos
-            if symbol not in self.candle_data:
-                self.candle_data[symbol] = self.get_historical_data(symbol, '1m')
+        # Obter dados históricos de todos os símbolos em paralelo
+        await self._load_candle_data(symbols, '1m')
             
         pair_trader = PairTrader(pair_trader_id, target_symbol, cluster_symbols, 
                                  entry_threshold, exit_threshold, window, interval='1m',
                                  pair_trade_executor=self.pair_trade_executor)
         self.active_pair_traders[pair_trader_id] = pair_trader
+        self._subscribe_aligned_candles(pair_trader)
 
         # Salvar informações no banco de dados
         self.db.add_one(
@@ -211,19 +196,42 @@ class PairTraderManager:
             await self._initialize_data_stream(symbol, pair_trader_id)
             
             
-    async def _initialize_data_stream(self, symbol, trade_id):
-        """Inicia o stream de dados para um símbolo específico."""
-        if self.bm is None:
-            raise RuntimeError("BinanceSocketManager (bm) não foi inicializado.")
+    async def _load_candle_data(self, symbols, interval):
+        """Carrega, em paralelo, o histórico dos símbolos que ainda não têm buffer."""
+        missing = [symbol for symbol in symbols if (symbol, interval) not in self.candle_data]
+        if not missing:
+            return
+        historical = await self.get_historical_data(missing, interval)
+        matrix = self.aligned_candles.matrix(interval)
+        for symbol, df in historical.items():
+            self.candle_data[(symbol, interval)] = CandleBuffer.from_dataframe(df)
 
-        if symbol not in self.active_streams:
-            self.active_streams.add(symbol)
-            task = asyncio.create_task(stream_data_pair(symbol, trade_id, self.bm, self))
-            self.background_tasks.append(task)
+            # Somente candles fechados entram na matriz alinhada
+            closed = df[df["Complete"]] if "Complete" in df else df
+            open_times = pd.to_datetime(closed["Time"]).values.astype("datetime64[ms]").astype("int64")
+            matrix.load(symbol, open_times, closed["Close"].values)
+
+    def _subscribe_aligned_candles(self, trader):
+        """Executa a estratégia do PairTrader sempre que todos os seus ativos fecharem o mesmo candle."""
+        trader.candles = self.candle_data[(trader.target_asset, trader.interval)]
+        matrix = self.aligned_candles.matrix(trader.interval)
+        matrix.subscribe(
+            trader.pair_trader_id,
+            trader.cluster_assets + [trader.target_asset],
+            lambda open_time: self._notify_pair_trader(trader, open_time),
+        )
+
+    async def _initialize_data_stream(self, symbol, trade_id):
+        """Assina o stream de klines do símbolo no ingestor compartilhado."""
+        interval = self.active_pair_traders[trade_id].interval
+        if (symbol, interval) not in self.active_streams:
+            self.active_streams.add((symbol, interval))
+            self.stream_ingestor.subscribe(symbol, interval, self.process_stream_message_pair)
             
     def process_stream_message_pair(self, symbol, msg):
         """Processa a mensagem de stream e verifica se o candle está completo."""
         start_time = pd.to_datetime(msg["k"]["t"], unit="ms")
+        interval = msg["k"]["i"]
         first = float(msg["k"]["o"])
         high = float(msg["k"]["h"])
         low = float(msg["k"]["l"])
@@ -243,17 +251,22 @@ class PairTraderManager:
 
         # Atualiza o DataFrame centralizado apenas quando o candle está completo
         if complete:
-            self.update_candle_data(symbol, candle_data, start_time)
+            if msg.get("backfill") and is_stale_candle(interval, msg["k"]["t"]):
+                # Candle antigo do backfill: só entra no buffer, sem checar stops a um preço passado
+                if (symbol, interval) in self.candle_data:
+                    self.candle_data[(symbol, interval)].append(*candle_data)
+            else:
+                self.update_candle_data(symbol, interval, candle_data, start_time)
 
-    def update_candle_data(self, symbol, candle_data, start_time):
-        """Atualiza os dados de candle centralizados e notifica traders ativos."""
-        # Adiciona o novo candle ao DataFrame centralizado
-        if symbol in self.candle_data:
-            df = self.candle_data[symbol]
-            df.loc[start_time] = candle_data
-            self.candle_data[symbol] = df
+    def update_candle_data(self, symbol, interval, candle_data, start_time):
+        """
+        Atualiza os dados de candle centralizados e verifica os stops dos pair trades abertos.
+        A estratégia de cada PairTrader é disparada pela matriz alinhada quando a linha do horário completa.
+        """
+        # Adiciona o novo candle ao buffer centralizado (O(1), sem realocar o histórico)
+        if (symbol, interval) in self.candle_data:
+            self.candle_data[(symbol, interval)].append(*candle_data)
         
-        # Notifica todas as instâncias de PairTrader para o símbolo quando um candle estiver completo
         for pair_trader_id, trader in self.active_pair_traders.items():
             
             # Filtrar trades apenas para o símbolo atualizado
@@ -267,34 +280,22 @@ class PairTraderManager:
                     current_price = float(candle_data[3])  # Preço de fechamento
                     print(f"Check tralings do ativo {symbol} e preço atual em {current_price}.")
 
-                    # Verifica e fecha ordens de SL, se necessário
-                    self.pair_trade_executor.check_sl_orders(symbol)
+                    # Fills de SL chegam pelo user-data stream; consulta via REST só sem o stream
+                    if self.order_tracker is None or not self.order_tracker.connected:
+                        self.pair_trade_executor.check_sl_orders(symbol)
                     self.pair_trade_executor.check_trailing_stop_target(symbol, current_price)
                     self.pair_trade_executor.check_trailing_stop_loss(symbol, current_price)
-                    
-            # Se o ativo faz parte do par, marque como atualizado
-            if symbol in [trader.target_asset] + trader.cluster_assets:
-                if pair_trader_id not in self.candle_sync:
-                    self.candle_sync[pair_trader_id] = {}
-                self.candle_sync[pair_trader_id][symbol] = start_time
 
-                # Verifica se todos os ativos necessários já têm o mesmo timestamp
-                required_assets = [trader.target_asset] + trader.cluster_assets
-                timestamps = [
-                    self.candle_sync[pair_trader_id].get(asset) for asset in required_assets
-                ]
-                if len(set(timestamps)) == 1 and timestamps[0] == start_time:
-                    # Todos os ativos têm o mesmo timestamp
-                    self._notify_pair_trader(trader, symbol)
-                    
-    def _notify_pair_trader(self, trader, symbol):
+    def _notify_pair_trader(self, trader, open_time):
         """
-        Notifica o PairTrader que um novo candle foi recebido para um dos ativos monitorados.
+        Notifica o PairTrader que todos os ativos monitorados fecharam o candle de `open_time` (ms).
         """
         try:
-            # Atualiza os dados necessários para o PairTrader e executa a estratégia
-            dfs = [self.candle_data[asset] for asset in trader.cluster_assets]
-            df_target = self.candle_data[trader.target_asset]
-            trader.define_strategy(dfs, df_target)
+            matrix = self.aligned_candles.matrix(trader.interval)
+            if is_stale_candle(trader.interval, open_time):
+                # Linha completada pelo backfill: atualiza regressão e Z-Score sem gerar sinais
+                trader.update_history(matrix, open_time)
+            else:
+                trader.define_strategy(matrix, open_time)
         except Exception as e:
             print(f"Erro ao notificar PairTrader {trader.pair_trader_id}: {e}")
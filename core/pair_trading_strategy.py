@@ -68,4 +68,21 @@ def detect_signals_strategy_1(df, entry_threshold, exit_threshold):
     df["SIGNAL_UP_PAIR2"] = signal_up_pair2
     df["SIGNAL_DOWN_PAIR2"] = signal_down_pair2
 
-    return df
\ No newline at end of file
+    return df
+
+
+def detect_last_signal_strategy_1(z_score, entry_threshold, exit_threshold):
+    """
+    Mesmas regras de detect_signals_strategy_1 aplicadas a um único Z-Score (o do candle atual).
+    :return: Dicionário com SIGNAL_UP_PAIR1, SIGNAL_DOWN_PAIR1, SIGNAL_UP_PAIR2 e SIGNAL_DOWN_PAIR2.
+    """
+    signals = {"SIGNAL_UP_PAIR1": 0, "SIGNAL_DOWN_PAIR1": 0, "SIGNAL_UP_PAIR2": 0, "SIGNAL_DOWN_PAIR2": 0}
+    if z_score > entry_threshold:
+        # Z > entry_threshold: Short Pair1, Long Pair2
+        signals["SIGNAL_DOWN_PAIR1"] = 1
+        signals["SIGNAL_UP_PAIR2"] = 1
+    elif z_score < -entry_threshold:
+        # Z < -entry_threshold: Long Pair1, Short Pair2
+        signals["SIGNAL_UP_PAIR1"] = 1
+        signals["SIGNAL_DOWN_PAIR2"] = 1
+    return signals
@@ -0,0 +1,12 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+
+def spawn_process_pool(max_workers=None):
+    """
+    Cria um ProcessPoolExecutor com o contexto "spawn".
+    O processo da API tem threads (stream, write-behind) e fork não é seguro nesse caso.
+    :param max_workers: Número de processos; None usa o padrão do ProcessPoolExecutor.
+    :return: ProcessPoolExecutor.
+    """
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
@@ -1,38 +1,58 @@
+import asyncio
 from collections import defaultdict
 from typing import Dict
 import pandas as pd
 from data.database import DataDB
 from operations.trade_executor import TradeExecutor
+from core.execution_scheduler import ExecutionScheduler
+from core.candle_barrier import CandleBarrier
+from data.aligned_matrix import interval_to_ms
 
 class SignalManager:
-    def __init__(self, total_tasks):
+    def __init__(self):
         # Armazena sinais como um dicionário onde as chaves são os símbolos e o valor é uma lista de sinais
         self.signals = defaultdict(list)
-        self.last_processed_timestamp = None
-        self.total_tasks = total_tasks
-        self.completed_tasks_count = 0
+        # Rodadas de sinais por (intervalo, open time), com deadline para traders atrasados
+        self.candle_barrier = CandleBarrier(self.process_round)
         self.db = DataDB()
         self.trade_executor = TradeExecutor()
+        self.async_trade_executor = None  # Definido pelo TraderManager quando o AsyncClient está pronto
+        self.execution_scheduler = ExecutionScheduler()  # Paralelo entre símbolos, sequencial por símbolo
+        self.trade_params = {}  # trade_id -> parâmetros dos traders ativos (registrados pelo TraderManager)
+        self.priority_index = None  # (emaper_s, emaper_l, emaper_force, sl_percent) -> posição na tabela
+
+    def register_trader(self, trade_id: str, trade_params: dict):
+        """Registra em memória os parâmetros de um trader ativo e o inclui nas rodadas do seu intervalo."""
+        self.trade_params[trade_id] = trade_params
+        self.candle_barrier.add_participant(trade_id, trade_params.get("bar_length"))
+
+    def unregister_trader(self, trade_id: str):
+        """Remove os parâmetros e os sinais pendentes de um trader encerrado."""
+        self.trade_params.pop(trade_id, None)
+        self.signals.pop(trade_id, None)
+        self.candle_barrier.remove_participant(trade_id)
 
     def register_signal(self, trade_id: str, signal: Dict):
         """Registra um sinal para um símbolo específico."""
         self.signals[trade_id].append(signal)
 
-    def register_task_completion(self, timestamp):
-        """Registra a conclusão de uma task e processa sinais quando todas as tasks completaram."""
-        self.completed_tasks_count += 1
-        if self.completed_tasks_count == self.total_tasks and (
-            self.last_processed_timestamp is None
-            or self.last_processed_timestamp != timestamp
-        ):
-            self.last_processed_timestamp = timestamp
-            self.completed_tasks_count = 0
-            self.process_signals()
+    def register_task_completion(self, trade_id: str, interval: str, timestamp):
+        """
+        Registra que o trader concluiu a estratégia do candle `timestamp` (open time).
+        Os sinais são processados quando todos os traders do intervalo concluem o candle
+        ou quando o deadline da rodada expira.
+        """
+        self.candle_barrier.arrive(trade_id, interval, timestamp)
+
+    def process_round(self, interval, timestamp, trade_ids, missing):
+        """Processa os sinais dos traders que concluíram a rodada (intervalo, timestamp)."""
+        self.process_signals(self.get_signals(trade_ids))
 
     def add_priority_in_db(self):
         """
         Adiciona a tabela de prioridades ao banco de dados.
         A coleção será chamada de 'priority_criteria'.
+        Tabela inicial fixa; GridOptimizer (POST /priority/optimize) a regenera a partir de backtests.
         """
         priority_data = [
             {"emaper_s": 50, "emaper_l": 100, "emaper_force": 5, "sl_percent": -0.03},
@@ -53,23 +73,69 @@ class SignalManager:
             {"emaper_s": 5, "emaper_l": 50, "emaper_force": 2, "sl_percent": -0.03},
             {"emaper_s": 5, "emaper_l": 100, "emaper_force": 2, "sl_percent": -0.04},
         ]
+        for rank, row in enumerate(priority_data, start=1):
+            row["rank"] = rank
 
         self.db.delete_many("priority_criteria")  # Limpa a coleção antes de adicionar os novos dados
         self.db.add_many("priority_criteria", priority_data)
+        self.invalidate_priority_index()
         print("Tabela de prioridades adicionada ao banco de dados.")
 
 
     def get_trade_params(self, trade_id: str) -> dict:
-        """Recupera os parâmetros de trade do banco de dados com base no trade_id."""
+        """
+        Recupera os parâmetros de trade com base no trade_id, do registro em memória
+        ou, para traders não registrados, do banco de dados.
+        """
+        trade_params = self.trade_params.get(trade_id)
+        if trade_params is not None:
+            return trade_params
         trade_params = self.db.query_single("active_traders", trade_id=trade_id)
         if not trade_params:
             return {}
         return trade_params
 
     def get_priority_table(self):
-        """Recupera a tabela de prioridades do banco de dados."""
-        priority_data = self.db.query_all("priority_criteria")
-        return pd.DataFrame(priority_data)
+        """Recupera a tabela de prioridades do banco de dados, ordenada pelo rank salvo."""
+        # limit=0: sem limite, a tabela do otimizador pode ter mais de 100 combinações
+        priority_table = pd.DataFrame(self.db.query_all("priority_criteria", limit=0))
+        if "rank" in priority_table:
+            # Linhas sem rank (tabelas antigas) ficam no fim, na ordem de inserção
+            priority_table = priority_table.sort_values("rank", kind="stable", na_position="last")
+            priority_table = priority_table.reset_index(drop=True)
+        return priority_table
+
+    @staticmethod
+    def _priority_key(params):
+        """Chave de hash dos parâmetros usados na tabela de prioridades."""
+        try:
+            return (
+                float(params["emaper_s"]),
+                float(params["emaper_l"]),
+                float(params["emaper_force"]),
+                float(params["sl_percent"]),
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def get_priority_index(self):
+        """
+        Índice da tabela de prioridades: chave dos parâmetros -> posição na tabela.
+        Carregado uma vez e mantido até invalidate_priority_index.
+        """
+        if self.priority_index is None:
+            priority_index = {}
+            for index, row in enumerate(self.get_priority_table().to_dict(orient="records")):
+                key = self._priority_key(row)
+                # Em chaves repetidas vale a primeira posição
+                if key is not None and key not in priority_index:
+                    priority_index[key] = index
+            self.priority_index = priority_index
+        return self.priority_index
+
+    def invalidate_priority_index(self):
+        """Descarta o índice de prioridades (chamar sempre que `priority_criteria` mudar)."""
+        self.priority_index = None
 
     def select_top_signals(self, signals: dict, top_n=5):
         """
@@ -77,7 +143,6 @@ class SignalManager:
         Se houver menos de 10 sinais, retorna todos.
         """
         decoded_signals = []
-        priority_table = self.get_priority_table()
 
         # Recupera os parâmetros do banco de dados e emparelha com os sinais
         for trade_id, signal_list in signals.items():
@@ -89,22 +154,15 @@ class SignalManager:
         if len(decoded_signals) <= top_n:
             return decoded_signals
 
-        # Prioriza com base na tabela
+        # Prioriza com base na posição na tabela; sinais sem parâmetros na tabela são descartados
+        priority_index = self.get_priority_index()
         ranked_signals = []
         for trade_params, signal in decoded_signals:
-            for index, row in priority_table.iterrows():
-                # Verifica se os parâmetros coincidem com a tabela
-                if (
-                    trade_params.get("emaper_s") == row["emaper_s"]
-                    and trade_params.get("emaper_l") == row["emaper_l"]
-                    and trade_params.get("emaper_force") == row["emaper_force"]
-                    and trade_params.get("sl_percent") == row["sl_percent"]
-                ):
-                    # Inclui a prioridade com base na posição na tabela
-                    ranked_signals.append((index, trade_params, signal))
-                    break
-
-        # Ordena por prioridade (índice da tabela)
+            index = priority_index.get(self._priority_key(trade_params))
+            if index is not None:
+                ranked_signals.append((index, trade_params, signal))
+
+        # Ordena por prioridade (índice da tabela); a ordenação é estável entre empates
         ranked_signals.sort(key=lambda x: x[0])
 
         # Seleciona os top_n sinais
@@ -113,9 +171,13 @@ class SignalManager:
         # Retorna apenas os parâmetros e sinais
         return [(trade_params, signal) for _, trade_params, signal in top_signals]
 
-    def process_signals(self):
-        """Processa sinais coletados e decide qual operação abrir, se houver."""
-        signals = self.get_signals()
+    def process_signals(self, signals=None):
+        """
+        Processa sinais coletados e decide qual operação abrir, se houver.
+        :param signals: Sinais por trade_id; se omitido, todos os sinais registrados.
+        """
+        if signals is None:
+            signals = self.get_signals()
         print("verifica sinais", signals)
 
         # Consulta a configuração para decidir se deve usar os melhores sinais
@@ -138,14 +200,46 @@ class SignalManager:
         if top_signals:
             for trade_params, signal in top_signals:
                 print(f"Abrindo operação para o sinal: {signal}")
-                self.trade_executor.execute_trade(trade_params, signal)
+                self.execute_trade(trade_params, signal)
 
-
-    def get_signals(self):
-        """Retorna todos os sinais registrados e limpa o registro para o próximo candle."""
-        signals = dict(self.signals)
-        self.signals.clear()  # Limpa os sinais após a consulta
-        return signals
+    def execute_trade(self, trade_params, signal):
+        """
+        Executa o trade sem bloquear o loop de eventos quando o executor assíncrono está disponível,
+        pelo ExecutionScheduler (símbolos diferentes em paralelo, o mesmo símbolo em sequência).
+        Fora de um loop (ou sem AsyncClient) usa o TradeExecutor síncrono.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if self.async_trade_executor is None or loop is None:
+            return self.trade_executor.execute_trade(trade_params, signal)
+
+        return self.execution_scheduler.submit(
+            trade_params["symbol"],
+            lambda: self.async_trade_executor.execute_trade(trade_params, signal),
+            candle_close=self.get_candle_close(trade_params, signal),
+        )
+
+    @staticmethod
+    def get_candle_close(trade_params, signal):
+        """Horário (ms) de fechamento do candle que gerou o sinal, ou None se não puder ser calculado."""
+        try:
+            return pd.Timestamp(signal["Time"]).value // 1_000_000 + interval_to_ms(trade_params["bar_length"])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def get_signals(self, trade_ids=None):
+        """
+        Retorna os sinais registrados e os remove do registro.
+        :param trade_ids: Traders cujos sinais devem ser retornados; se omitido, todos.
+        """
+        if trade_ids is None:
+            signals = dict(self.signals)
+            self.signals.clear()  # Limpa os sinais após a consulta
+            return signals
+        return {trade_id: self.signals.pop(trade_id) for trade_id in trade_ids if trade_id in self.signals}
 
     def check_signals(self):
         """
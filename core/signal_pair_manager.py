@@ -2,13 +2,7 @@ from collections import defaultdict
 from typing import Dict
 from data.database import DataDB
 from operations.pair_trade_executor import PairTradeExecutor
-
-import mplfinance as mpf
-import matplotlib.pyplot as plt
-import os
-import asyncio
-from constants.defs import (CHAT_TELEGRAM_ID)
-from core.telegram_bot import run_bot
+from core.notification_worker import notification_worker
 
 
 class SignalPairManager:
@@ -87,16 +81,6 @@ class SignalPairManager:
         return dict(self.signals)
 
     def send_bot_message(self, signal, pair_trader):
-        # Gera o gráfico de candlestick e salva como imagem
-        temp_images_dir = os.path.join(os.getcwd(), "temp_images")
-        os.makedirs(temp_images_dir, exist_ok=True)
-        img_path = os.path.join(temp_images_dir, "candle_chart.png")
-    
-        fig, ax = plt.subplots(figsize=(10, 6))
-        mpf.plot(pair_trader.df.set_index("Time").tail(100), type="candle", ax=ax)
-        plt.savefig(img_path)
-        plt.close(fig)
-        
         # Estrutura a mensagem para envio no Telegram
         title = f"################## \nSinal registrado para: \n{signal['pair_trader_id']}"
         message = f"""
@@ -111,9 +95,10 @@ class SignalPairManager:
         - Ativo: '{signal['target_asset']}'
         """
 
-        # Envia a mensagem usando o bot do Telegram
+        # Envia a mensagem e o gráfico dos últimos 100 candles pelo worker de notificações
         print("")
         print(message)
         print("")
         
-        asyncio.create_task(run_bot([message, ("photo", img_path)], CHAT_TELEGRAM_ID))
\ No newline at end of file
+        candles = pair_trader.candles.to_dataframe(100).set_index("Time") if pair_trader.candles is not None else None
+        notification_worker.notify(signal["pair_trader_id"], message, candles)
\ No newline at end of file
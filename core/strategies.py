@@ -10,6 +10,21 @@ class SignalStrategy(ABC):
     ) -> pd.DataFrame:
         pass
 
+    def detect_last_signal(self, previous, current, emaper_force) -> dict:
+        """
+        Sinais do candle mais recente. Por padrão aplica detect_signals às duas últimas linhas;
+        estratégias podem sobrescrever com uma avaliação direta.
+        :param previous: Linha (dict) do candle anterior ou None.
+        :param current: Linha (dict) do candle atual.
+        :return: Dicionário com SIGNAL_UP, SIGNAL_UP_FIRST, SIGNAL_DOWN e SIGNAL_DOWN_FIRST.
+        """
+        rows = [current] if previous is None else [previous, current]
+        last = self.detect_signals(pd.DataFrame(rows), emaper_force).iloc[-1]
+        return {
+            column: int(last[column])
+            for column in ["SIGNAL_UP", "SIGNAL_UP_FIRST", "SIGNAL_DOWN", "SIGNAL_DOWN_FIRST"]
+        }
+
 
 class Strategy1(SignalStrategy):
     def detect_signals(
@@ -28,51 +43,83 @@ class Strategy1(SignalStrategy):
         Operação é interrompida quando Average_EMA_percent_ema_short cruza zero no sentido oposto da operação.
         """
 
-        # Obtém os valores das colunas necessárias
-        avg_ema_short_values = df['Average_EMA_percent_ema_short'].values
-        avg_ema_long_values = df['Average_EMA_percent_ema_long'].values
-
-        # Vetores de sinal de compra e venda
-        signal_up = np.zeros(len(df), dtype=int)
-        signal_down = np.zeros(len(df), dtype=int)
-        signal_up_first = np.zeros(len(df), dtype=int)
-        signal_down_first = np.zeros(len(df), dtype=int)
-
-        # Itera sobre o DataFrame a partir do segundo valor
-        for i in range(1, len(df)):
-            # Valores atuais e anteriores
-            avg_ema_short = avg_ema_short_values[i]
-            avg_ema_short_prev = avg_ema_short_values[i-1]
-            avg_ema_long = avg_ema_long_values[i]
-            avg_ema_long_prev = avg_ema_long_values[i-1]
-            
-            # Detecção de cruzamento para compra
-            if (
-                avg_ema_short_prev < avg_ema_long_prev and  # short estava abaixo de long
-                avg_ema_short > avg_ema_long and  # short cruzou para cima de long
-                avg_ema_short < -emaper_force  # short está abaixo do EMA_percent_s_force
-            ):
-                signal_up[i] = 1  # Marca o ponto de compra
-                signal_up_first[i] = 1
-
-            # Detecção de cruzamento para venda
-            elif (
-                avg_ema_short_prev > avg_ema_long_prev and  # short estava acima de long
-                avg_ema_short < avg_ema_long and  # short cruzou para baixo de long
-                avg_ema_short > emaper_force  # short está acima do EMA_percent_s_force
-            ):
-                signal_down[i] = 1  # Marca o ponto de venda
-                signal_down_first[i] = 1
+        # Cruzamentos detectados por comparação vetorizada de cada ponto com o anterior
+        signal_up, signal_down = crossover_signals(
+            df['Average_EMA_percent_ema_short'].values,
+            df['Average_EMA_percent_ema_long'].values,
+            emaper_force,
+        )
 
         # Adiciona os arrays de sinais ao DataFrame de uma vez
         df["SIGNAL_UP"] = signal_up
-        df["SIGNAL_UP_FIRST"] = signal_up_first
+        df["SIGNAL_UP_FIRST"] = signal_up.copy()
         
         df["SIGNAL_DOWN"] = signal_down
-        df["SIGNAL_DOWN_FIRST"] = signal_down_first
+        df["SIGNAL_DOWN_FIRST"] = signal_down.copy()
 
         return df
 
+    def detect_last_signal(self, previous, current, emaper_force) -> dict:
+        """
+        Avalia apenas o candle mais recente a partir dos valores do candle anterior,
+        sem montar DataFrame.
+        """
+        up = down = 0
+        if previous is not None:
+            up, down = crossover_signal(
+                previous['Average_EMA_percent_ema_short'],
+                previous['Average_EMA_percent_ema_long'],
+                current['Average_EMA_percent_ema_short'],
+                current['Average_EMA_percent_ema_long'],
+                emaper_force,
+            )
+        return {"SIGNAL_UP": up, "SIGNAL_UP_FIRST": up, "SIGNAL_DOWN": down, "SIGNAL_DOWN_FIRST": down}
+
+
+def crossover_signals(avg_ema_short_values, avg_ema_long_values, emaper_force):
+    """
+    Versão vetorizada do cruzamento de Average_EMA_percent_ema_short com Average_EMA_percent_ema_long.
+    :return: Arrays (signal_up, signal_down) com 1 nos pontos de compra/venda; o primeiro ponto é sempre 0.
+    """
+    short = np.asarray(avg_ema_short_values, dtype=float)
+    long = np.asarray(avg_ema_long_values, dtype=float)
+    signal_up = np.zeros(len(short), dtype=int)
+    signal_down = np.zeros(len(short), dtype=int)
+    if len(short) < 2:
+        return signal_up, signal_down
+
+    short_prev, long_prev = short[:-1], long[:-1]
+    short_cur, long_cur = short[1:], long[1:]
+
+    # short cruzou para cima de long, abaixo de -emaper_force
+    up = (short_prev < long_prev) & (short_cur > long_cur) & (short_cur < -emaper_force)
+    # short cruzou para baixo de long, acima de emaper_force
+    down = ~up & (short_prev > long_prev) & (short_cur < long_cur) & (short_cur > emaper_force)
+
+    signal_up[1:] = up
+    signal_down[1:] = down
+    return signal_up, signal_down
+
+
+def crossover_signal(avg_ema_short_prev, avg_ema_long_prev, avg_ema_short, avg_ema_long, emaper_force):
+    """
+    Cruzamento avaliado somente no último candle.
+    :return: Tupla (signal_up, signal_down).
+    """
+    if (
+        avg_ema_short_prev < avg_ema_long_prev and  # short estava abaixo de long
+        avg_ema_short > avg_ema_long and  # short cruzou para cima de long
+        avg_ema_short < -emaper_force  # short está abaixo do EMA_percent_s_force
+    ):
+        return 1, 0
+    if (
+        avg_ema_short_prev > avg_ema_long_prev and  # short estava acima de long
+        avg_ema_short < avg_ema_long and  # short cruzou para baixo de long
+        avg_ema_short > emaper_force  # short está acima do EMA_percent_s_force
+    ):
+        return 0, 1
+    return 0, 0
+
 
 def get_strategy(strategy_type: int) -> SignalStrategy:
     if strategy_type == 1:
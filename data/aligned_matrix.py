@@ -0,0 +1,184 @@
+from collections import defaultdict
+import numpy as np
+from constants.defs import CANDLE_BUFFER_CAPACITY
+
+# Duração de cada unidade dos intervalos de kline da Binance, em ms
+INTERVAL_UNITS = {"m": 60_000, "h": 3_600_000, "d": 86_400_000, "w": 604_800_000}
+
+
+def interval_to_ms(interval):
+    """Converte um intervalo de kline (ex: '1m', '4h', '1d') para milissegundos."""
+    try:
+        return int(interval[:-1]) * INTERVAL_UNITS[interval[-1]]
+    except (KeyError, ValueError):
+        raise ValueError(f"Intervalo sem duração fixa: {interval}")
+
+
+class AlignedCandleMatrix:
+    def __init__(self, interval, capacity=CANDLE_BUFFER_CAPACITY):
+        """
+        Matriz horários × símbolos com os fechamentos de um intervalo, em arrays NumPy.
+        Cada horário de abertura ocupa a linha (open_time / intervalo) % capacity, de modo que
+        candles de símbolos diferentes com o mesmo horário ficam alinhados sem merge.
+        :param interval: Intervalo dos klines (ex: '1m').
+        :param capacity: Número de linhas (horários) mantidas.
+        """
+        self.interval = interval
+        self.step = interval_to_ms(interval)
+        self.capacity = capacity
+        self.symbols = {}  # símbolo -> coluna
+        self.close = np.full((capacity, 0), np.nan)
+        self.filled = np.zeros((capacity, 0), dtype=bool)
+        self.row_time = np.full(capacity, -1, dtype=np.int64)  # open time (ms) de cada linha
+        self.last_time = None
+        self.listeners = {}  # chave -> (colunas, callback)
+        self.listeners_by_symbol = defaultdict(set)
+        self.fired = {}  # chave -> último open time notificado
+
+    def add_symbol(self, symbol):
+        """Adiciona a coluna de um símbolo (idempotente) e retorna o seu índice."""
+        symbol = symbol.upper()
+        if symbol not in self.symbols:
+            self.symbols[symbol] = len(self.symbols)
+            self.close = np.hstack([self.close, np.full((self.capacity, 1), np.nan)])
+            self.filled = np.hstack([self.filled, np.zeros((self.capacity, 1), dtype=bool)])
+        return self.symbols[symbol]
+
+    def subscribe(self, key, symbols, callback):
+        """
+        Registra um callback chamado como callback(open_time) quando todos os `symbols`
+        tiverem fechado o candle de um mesmo horário. Linhas já completas não são notificadas.
+        :param key: Identificador do assinante (ex: pair_trader_id).
+        """
+        columns = np.array([self.add_symbol(symbol) for symbol in symbols])
+        self.unsubscribe(key)
+        self.listeners[key] = (columns, callback)
+        self.fired[key] = self.last_time if self.last_time is not None else -1
+        for symbol in symbols:
+            self.listeners_by_symbol[symbol.upper()].add(key)
+
+    def unsubscribe(self, key):
+        """Remove um assinante."""
+        if self.listeners.pop(key, None) is None:
+            return
+        self.fired.pop(key, None)
+        for keys in self.listeners_by_symbol.values():
+            keys.discard(key)
+
+    def load(self, symbol, open_times, closes):
+        """
+        Preenche a coluna de um símbolo com o histórico (sem notificar os assinantes).
+        Apenas candles fechados devem ser carregados.
+        :param open_times: Horários de abertura em ms.
+        """
+        column = self.add_symbol(symbol)
+        open_times = np.asarray(open_times, dtype=np.int64)[-self.capacity:]
+        closes = np.asarray(closes, dtype=np.float64)[-self.capacity:]
+        if not len(open_times):
+            return
+        rows = (open_times // self.step) % self.capacity
+
+        # Linhas que ainda guardam horários anteriores são reiniciadas
+        newer = open_times > self.row_time[rows]
+        self.row_time[rows[newer]] = open_times[newer]
+        self.close[rows[newer]] = np.nan
+        self.filled[rows[newer]] = False
+
+        valid = self.row_time[rows] == open_times
+        self.close[rows[valid], column] = closes[valid]
+        self.filled[rows[valid], column] = True
+        if self.last_time is None or open_times.max() > self.last_time:
+            self.last_time = int(open_times.max())
+
+    def update(self, symbol, open_time, close):
+        """
+        Grava o fechamento de um candle e notifica os assinantes cuja linha ficou completa.
+        Símbolos sem coluna e candles mais antigos que a janela são ignorados.
+        :param open_time: Horário de abertura em ms.
+        """
+        symbol = symbol.upper()
+        column = self.symbols.get(symbol)
+        if column is None:
+            return
+        row = self._row(open_time)
+        if row is None:
+            return
+        self.close[row, column] = close
+        self.filled[row, column] = True
+
+        for key in list(self.listeners_by_symbol.get(symbol, ())):
+            columns, callback = self.listeners[key]
+            if open_time > self.fired[key] and self.filled[row, columns].all():
+                self.fired[key] = open_time
+                try:
+                    callback(open_time)
+                except Exception as e:
+                    print(f"Erro ao notificar linha completa para {key}: {e}")
+
+    def row(self, symbols, open_time):
+        """Fechamentos dos `symbols` no horário, ou None se a linha não estiver completa."""
+        row = int(open_time // self.step) % self.capacity
+        columns = [self.symbols[symbol.upper()] for symbol in symbols]
+        if self.row_time[row] != open_time or not self.filled[row, columns].all():
+            return None
+        return self.close[row, columns]
+
+    def aligned(self, symbols, n=None):
+        """
+        Linhas em que todos os `symbols` têm candle (equivalente a um inner join por horário),
+        em ordem cronológica.
+        :param n: Quantidade máxima de linhas mais recentes.
+        :return: (open times em ms, matriz linhas × símbolos de fechamentos).
+        """
+        columns = [self.symbols[symbol.upper()] for symbol in symbols]
+        if self.last_time is None:
+            return np.empty(0, dtype=np.int64), np.empty((0, len(columns)))
+
+        last = self.last_time // self.step
+        positions = np.arange(last - self.capacity + 1, last + 1)
+        rows = positions % self.capacity
+        times = positions * self.step
+        mask = (self.row_time[rows] == times) & self.filled[np.ix_(rows, columns)].all(axis=1)
+        rows, times = rows[mask], times[mask]
+        if n is not None:
+            rows, times = rows[-n:], times[-n:]
+        return times, self.close[np.ix_(rows, columns)]
+
+    def _row(self, open_time):
+        # Linha do horário; reinicia a linha quando ela ainda guarda um horário anterior
+        row = int(open_time // self.step) % self.capacity
+        if self.row_time[row] > open_time:
+            return None
+        if self.row_time[row] != open_time:
+            self.row_time[row] = open_time
+            self.close[row] = np.nan
+            self.filled[row] = False
+        if self.last_time is None or open_time > self.last_time:
+            self.last_time = open_time
+        return row
+
+
+class AlignedMatrixStore:
+    def __init__(self, capacity=CANDLE_BUFFER_CAPACITY):
+        """
+        Matrizes alinhadas compartilhadas, uma por intervalo, preenchidas pelo KlineStreamIngestor.
+        :param capacity: Número de linhas de cada matriz.
+        """
+        self.capacity = capacity
+        self.matrices = {}
+
+    def matrix(self, interval):
+        """Matriz do intervalo (criada na primeira chamada)."""
+        if interval not in self.matrices:
+            self.matrices[interval] = AlignedCandleMatrix(interval, self.capacity)
+        return self.matrices[interval]
+
+    def update(self, symbol, interval, open_time, close):
+        """Grava um candle fechado na matriz do intervalo, se ela existir."""
+        matrix = self.matrices.get(interval)
+        if matrix is not None:
+            matrix.update(symbol, open_time, close)
+
+    def clear(self):
+        """Descarta todas as matrizes e assinantes."""
+        self.matrices.clear()
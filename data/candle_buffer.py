@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+from constants.defs import CANDLE_BUFFER_CAPACITY
+
+
+class RingBuffer:
+    def __init__(self, capacity, dtype=np.float64):
+        """
+        Buffer circular de capacidade fixa com append O(1).
+        Cada valor é gravado em duas posições (i e i + capacity), de modo que
+        os últimos N valores sempre formam uma fatia contígua do array interno
+        e podem ser retornados como view, sem cópia.
+        :param capacity: Número máximo de valores mantidos.
+        :param dtype: Tipo NumPy dos valores armazenados.
+        """
+        if capacity <= 0:
+            raise ValueError("A capacidade do buffer deve ser positiva.")
+        self.capacity = capacity
+        self._data = np.zeros(2 * capacity, dtype=dtype)
+        self._next = 0  # Próxima posição de escrita (0..capacity-1)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, value):
+        """Adiciona um valor, descartando o mais antigo quando o buffer está cheio."""
+        self._data[self._next] = value
+        self._data[self._next + self.capacity] = value
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def replace_last(self, value):
+        """Substitui o valor mais recente (ex.: candle em formação que foi fechado)."""
+        if self._size == 0:
+            raise IndexError("Buffer vazio.")
+        last = (self._next - 1) % self.capacity
+        self._data[last] = value
+        self._data[last + self.capacity] = value
+
+    def last(self):
+        """Retorna o valor mais recente."""
+        if self._size == 0:
+            raise IndexError("Buffer vazio.")
+        return self._data[(self._next - 1) % self.capacity]
+
+    def view(self, n=None):
+        """
+        Retorna uma view somente-leitura dos últimos `n` valores em ordem cronológica.
+        :param n: Quantidade de valores (None para todos).
+        """
+        n = self._size if n is None else min(n, self._size)
+        end = self._next + self.capacity
+        result = self._data[end - n:end]
+        result.flags.writeable = False
+        return result
+
+
+class CandleBuffer:
+    COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+    def __init__(self, capacity=CANDLE_BUFFER_CAPACITY):
+        """
+        Armazena candles OHLCV de um par (símbolo, intervalo) em buffers circulares NumPy.
+        :param capacity: Número máximo de candles mantidos em memória.
+        """
+        self.capacity = capacity
+        self.columns = {column: RingBuffer(capacity) for column in self.COLUMNS}
+        self.time = RingBuffer(capacity, dtype="datetime64[ns]")
+        self.complete = RingBuffer(capacity, dtype=bool)
+
+    def __len__(self):
+        return len(self.time)
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, capacity=CANDLE_BUFFER_CAPACITY):
+        """
+        Cria um buffer a partir de um DataFrame histórico
+        com colunas Open, High, Low, Close, Volume, Time e Complete.
+        """
+        buffer = cls(capacity)
+        df = df.tail(capacity)
+        complete = df["Complete"].values if "Complete" in df else np.ones(len(df), dtype=bool)
+        opens, highs, lows, closes, volumes = (df[column].values for column in cls.COLUMNS)
+        times = pd.to_datetime(df["Time"]).values
+        for i in range(len(df)):
+            buffer.append(opens[i], highs[i], lows[i], closes[i], volumes[i], times[i], complete[i])
+        return buffer
+
+    def append(self, open, high, low, close, volume, time, complete=True):
+        """
+        Adiciona um candle em O(1). Se o horário for igual ao do último candle
+        (ex.: candle histórico ainda em formação), o último candle é substituído.
+        """
+        time = np.datetime64(pd.Timestamp(time).to_datetime64(), "ns")
+        values = (open, high, low, close, volume)
+        if len(self) and self.time.last() == time:
+            for column, value in zip(self.COLUMNS, values):
+                self.columns[column].replace_last(value)
+            self.complete.replace_last(complete)
+            return
+
+        for column, value in zip(self.COLUMNS, values):
+            self.columns[column].append(value)
+        self.time.append(time)
+        self.complete.append(complete)
+
+    def view(self, column, n=None):
+        """
+        Retorna uma view somente-leitura (sem cópia) dos últimos `n` valores de uma coluna.
+        :param column: 'Open', 'High', 'Low', 'Close', 'Volume', 'Time' ou 'Complete'.
+        :param n: Quantidade de candles (None para todos).
+        """
+        if column == "Time":
+            return self.time.view(n)
+        if column == "Complete":
+            return self.complete.view(n)
+        return self.columns[column].view(n)
+
+    def last(self):
+        """Retorna o candle mais recente como dicionário."""
+        candle = {column: float(self.columns[column].last()) for column in self.COLUMNS}
+        candle["Time"] = pd.Timestamp(self.time.last())
+        candle["Complete"] = bool(self.complete.last())
+        return candle
+
+    def to_dataframe(self, n=None):
+        """
+        Monta um DataFrame com os últimos `n` candles, indexado por Date,
+        no mesmo formato usado pelos dados históricos.
+        """
+        times = self.time.view(n)
+        data = {column: self.columns[column].view(n) for column in self.COLUMNS}
+        data["Time"] = times
+        data["Complete"] = self.complete.view(n)
+        return pd.DataFrame(data, index=pd.DatetimeIndex(times, name="Date"))
@@ -1,31 +1,235 @@
 import asyncio
+import time
+from collections import defaultdict
+from binance import BinanceSocketManager, AsyncClient
+from core.metrics import KLINE_RECEIVE_LAG
+from data.aligned_matrix import interval_to_ms
 
-async def stream_data(symbol, trade_id, bm, manager):
-    """Stream de dados da Binance para um símbolo e gerencia candles completos no TraderManager."""
-    if bm is None:
-        raise ValueError("BinanceSocketManager (bm) não foi inicializado corretamente.")
 
-    async with bm.kline_socket(symbol=symbol, interval=manager.active_trader_instances[trade_id].bar_length) as tscm:
-        print(f"Streaming data for {symbol} with interval {manager.active_trader_instances[trade_id].bar_length}")  # Log para confirmar o início do stream
-        while True:
+def is_stale_candle(interval, open_time, now=None):
+    """
+    Indica se um candle fechado é antigo demais para gerar sinais ou ordens: fechou há mais de um intervalo.
+    Candles recuperados pelo backfill atualizam buffers e indicadores, mas não devem operar a preço atual.
+    :param interval: Intervalo do candle (ex: '1m').
+    :param open_time: Horário de abertura (ms).
+    :param now: Horário de referência (ms); padrão é o horário atual.
+    """
+    if now is None:
+        now = time.time() * 1000
+    try:
+        return now >= open_time + 2 * interval_to_ms(interval)
+    except ValueError:
+        return True  # Intervalo sem duração fixa (ex: '1M'): na dúvida, não opera
+
+
+class KlineStreamIngestor:
+    def __init__(self, max_backoff=60, recv_timeout=1, archive=None, aligned=None, prices=None):
+        """
+        Ingestão de klines da Binance por um único combined stream (multiplex socket).
+        Os símbolos/intervalos são assinados dinamicamente e as mensagens são
+        distribuídas para todos os handlers registrados (TraderManager, PairTraderManager...).
+        :param max_backoff: Espera máxima (segundos) entre tentativas de reconexão.
+        :param recv_timeout: Intervalo (segundos) para verificar mudanças nas assinaturas.
+        :param archive: KlineArchive (ou KlineArchiveWriter, que grava em segundo plano) opcional onde os
+                        candles fechados são gravados.
+        :param aligned: AlignedMatrixStore opcional preenchida com os fechamentos dos candles fechados.
+        :param prices: Objeto opcional com update_price(symbol, price), atualizado a cada kline (ex: SizingService).
+        """
+        self.client = None
+        self.bm = None
+        self.handlers = defaultdict(list)  # (símbolo, intervalo) -> handlers
+        self.last_closed = {}  # (símbolo, intervalo) -> open time (ms) do último candle fechado
+        self.max_backoff = max_backoff
+        self.recv_timeout = recv_timeout
+        self.task = None
+        self._resubscribe = asyncio.Event()
+        self._owns_client = False
+        self.archive = archive
+        self.aligned = aligned
+        self.prices = prices
+
+    async def start(self, client=None):
+        """
+        Inicia a tarefa de ingestão.
+        :param client: AsyncClient opcional; se omitido, um cliente próprio é criado.
+        """
+        if self.task is not None:
+            return
+        if client is None:
+            client = await AsyncClient.create()
+            self._owns_client = True
+        self.client = client
+        self.bm = BinanceSocketManager(self.client)
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Encerra a tarefa de ingestão e, se for o caso, o cliente próprio."""
+        if self.task is not None:
+            self.task.cancel()
             try:
-                msg = await tscm.recv()
-                manager.process_stream_message(symbol, msg)  # Envia a mensagem para o TraderManager
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        if self._owns_client and self.client:
+            await self.client.close_connection()
+        self.client = None
+        self.bm = None
+
+    def subscribe(self, symbol, interval, handler):
+        """
+        Assina os klines de um símbolo/intervalo.
+        :param handler: Função chamada como handler(symbol, msg) para cada mensagem.
+                        Mensagens recuperadas pelo backfill trazem msg["backfill"] = True.
+        """
+        key = (symbol.upper(), interval)
+        if handler not in self.handlers[key]:
+            is_new_stream = not self.handlers[key]
+            self.handlers[key].append(handler)
+            if is_new_stream:
+                print(f"Assinando stream {key[0]} {interval}")
+                self._resubscribe.set()
+
+    def unsubscribe(self, symbol, interval, handler=None):
+        """
+        Remove um handler (ou todos) de um símbolo/intervalo.
+        O stream é removido do socket quando não resta nenhum handler.
+        """
+        key = (symbol.upper(), interval)
+        if key not in self.handlers:
+            return
+        if handler is None:
+            self.handlers[key].clear()
+        elif handler in self.handlers[key]:
+            self.handlers[key].remove(handler)
+        if not self.handlers[key]:
+            del self.handlers[key]
+            self.last_closed.pop(key, None)
+            print(f"Removendo stream {key[0]} {interval}")
+            self._resubscribe.set()
+
+    def stream_names(self):
+        """Nomes dos streams no formato do combined stream (ex: 'btcusdt@kline_1m')."""
+        return sorted(f"{symbol.lower()}@kline_{interval}" for symbol, interval in self.handlers)
+
+    def dispatch(self, msg):
+        """Distribui uma mensagem de kline para os handlers do símbolo/intervalo."""
+        data = msg.get("data", msg)
+        if data.get("e") == "error":
+            raise ConnectionError(data.get("m", "Erro no combined stream"))
+        if "k" not in data:
+            return
+
+        key = (data["s"], data["k"]["i"])
+        if data["k"]["x"] and data["k"]["t"] <= self.last_closed.get(key, -1):
+            # Candle já entregue (ex: recebido no socket e também no backfill de uma reconexão)
+            return
+        if self.prices is not None:
+            self.prices.update_price(data["s"], data["k"]["c"])
+        if data["k"]["x"]:
+            if "T" in data["k"] and not data.get("backfill"):
+                # T é o último ms do candle; candles do backfill chegam atrasados por definição
+                KLINE_RECEIVE_LAG.observe(time.time() - (data["k"]["T"] + 1) / 1000, interval=data["k"]["i"])
+            self.last_closed[key] = data["k"]["t"]
+            self.archive_kline(data["s"], data["k"])
+        for handler in list(self.handlers.get(key, [])):
+            try:
+                handler(data["s"], data)
             except Exception as e:
-                print(f"Error while streaming data for {symbol}: {e}")
-                break
+                print(f"Erro ao processar kline de {key[0]} {key[1]}: {e}")
+
+        # Após os handlers, para que os buffers dos managers já tenham o candle quando a linha completar
+        if data["k"]["x"] and self.aligned is not None:
+            self.aligned.update(data["s"], data["k"]["i"], int(data["k"]["t"]), float(data["k"]["c"]))
+
+    def archive_kline(self, symbol, kline):
+        """Grava um kline fechado no arquivo colunar, se configurado."""
+        if self.archive is None:
+            return
+        try:
+            self.archive.append(
+                symbol, kline["i"], int(kline["t"]),
+                float(kline["o"]), float(kline["h"]), float(kline["l"]), float(kline["c"]), float(kline["v"]),
+            )
+        except Exception as e:
+            print(f"Erro ao arquivar kline de {symbol} {kline['i']}: {e}")
+
+    async def backfill(self, page_size=1000):
+        """
+        Recupera via REST os candles fechados perdidos durante uma desconexão
+        e os entrega aos handlers como mensagens de kline.
+        Só consulta os streams em que algum candle fechou durante a desconexão e
+        pagina a consulta até o presente quando a lacuna passa de `page_size` candles.
+        """
+        now = time.time() * 1000
+        for (symbol, interval), last_open_time in list(self.last_closed.items()):
+            try:
+                # O candle seguinte ao último entregue fecha em last_open_time + 2 intervalos
+                if now < last_open_time + 2 * interval_to_ms(interval):
+                    continue
+            except ValueError:
+                pass  # Intervalo sem duração fixa (ex: '1M'): consulta sempre
 
+            start_time = last_open_time + 1
+            while True:
+                try:
+                    klines = await self.client.get_klines(
+                        symbol=symbol, interval=interval, startTime=start_time, limit=page_size
+                    )
+                except Exception as e:
+                    print(f"Erro ao recuperar candles perdidos de {symbol} {interval}: {e}")
+                    break
 
-async def stream_data_pair(symbol, pair_trader_id, bm, manager):
-    """Stream de dados da Binance para o par de trading."""
-    if bm is None:
-        raise ValueError("BinanceSocketManager (bm) não foi inicializado corretamente.")
-    
-    async with bm.kline_socket(symbol=symbol, interval=manager.active_pair_traders[pair_trader_id].interval) as stream:
+                # Somente candles com close time (kline[6]) no passado estão fechados
+                now = time.time() * 1000
+                closed = [kline for kline in klines if kline[6] < now]
+                for kline in closed:
+                    print(f"Recuperando candle perdido de {symbol} {interval}: {kline[0]}")
+                    self.dispatch({
+                        "e": "kline",
+                        "s": symbol,
+                        "backfill": True,  # Recuperado via REST, não recebido no socket
+                        "k": {
+                            "t": kline[0], "T": kline[6], "i": interval,
+                            "o": kline[1], "h": kline[2], "l": kline[3], "c": kline[4], "v": kline[5],
+                            "x": True,
+                        },
+                    })
+
+                # Página incompleta ou com candle em formação: chegou ao presente
+                if len(klines) < page_size or len(closed) < len(klines):
+                    break
+                start_time = closed[-1][0] + 1
+
+    async def _run(self):
+        backoff = 1
+        connected_before = False
         while True:
+            streams = self.stream_names()
+            if not streams:
+                await self._resubscribe.wait()
+                self._resubscribe.clear()
+                continue
+
+            self._resubscribe.clear()
             try:
-                msg = await stream.recv()
-                manager.process_stream_message_pair(symbol, msg)
+                async with self.bm.multiplex_socket(streams) as socket:
+                    print(f"Combined stream conectado com {len(streams)} streams")
+                    if connected_before:
+                        await self.backfill()
+                    connected_before = True
+                    backoff = 1
+
+                    while not self._resubscribe.is_set():
+                        try:
+                            msg = await asyncio.wait_for(socket.recv(), timeout=self.recv_timeout)
+                        except asyncio.TimeoutError:
+                            continue
+                        if msg:
+                            self.dispatch(msg)
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
-                print(f"Erro no stream para {symbol}: {e}")
-                break
+                print(f"Erro no combined stream, reconectando em {backoff}s: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
@@ -1,16 +1,161 @@
-from pymongo import MongoClient, errors
-from constants.defs import MONGO_CONN
+from pymongo import MongoClient, AsyncMongoClient, ASCENDING, errors
+from constants.defs import MONGO_CONN, MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE
+from core.metrics import MongoCommandTimer
 from collections import defaultdict
+import threading
 
 
 class DataDB:
+    # MongoClient único por processo: todas as instâncias de DataDB compartilham o mesmo pool
+    _client = None
+    _lock = threading.Lock()
+    instances_created = 0
+    clients_created = 0
+
+    # Índices das coleções consultadas no caminho crítico: coleção -> lista de chaves
+    INDEXES = {
+        "opened_trades": [[("activate", ASCENDING), ("symbol", ASCENDING)]],
+        "opened_pair_trades": [
+            [("activate", ASCENDING), ("symbol", ASCENDING)],
+            [("pair_trader_id", ASCENDING)],
+        ],
+        "active_traders": [[("trade_id", ASCENDING)], [("active", ASCENDING)]],
+        "active_pair_traders": [[("pair_trader_id", ASCENDING)], [("active", ASCENDING)]],
+        "config_assets": [[("symbol", ASCENDING)]],
+        "config_pair_assets": [[("symbol", ASCENDING)]],
+    }
+
+    # Consultas frequentes auditadas com explain(): (coleção, filtro)
+    HOT_QUERIES = [
+        ("opened_trades", {"activate": True}),
+        ("opened_trades", {"activate": True, "symbol": "BTCUSDT"}),
+        ("opened_pair_trades", {"activate": True}),
+        ("opened_pair_trades", {"activate": True, "symbol": "BTCUSDT"}),
+        ("opened_pair_trades", {"pair_trader_id": "pair_trader_id"}),
+        ("active_traders", {"trade_id": "trade_id"}),
+        ("active_traders", {"active": True}),
+        ("active_pair_traders", {"pair_trader_id": "pair_trader_id"}),
+        ("config_assets", {"symbol": "BTCUSDT"}),
+        ("config_pair_assets", {"symbol": "BTCUSDT"}),
+    ]
+
     def __init__(self):
-        self.client = MongoClient(MONGO_CONN)
+        self.client = DataDB.get_client()
         self.db = self.client.forex_learning
+        DataDB.instances_created += 1
+
+    @classmethod
+    def get_client(cls):
+        """Retorna o MongoClient compartilhado, criando-o na primeira chamada."""
+        with cls._lock:
+            if cls._client is None:
+                cls._client = MongoClient(
+                    MONGO_CONN,
+                    maxPoolSize=MONGO_MAX_POOL_SIZE,
+                    minPoolSize=MONGO_MIN_POOL_SIZE,
+                    event_listeners=[MongoCommandTimer()],
+                )
+                cls.clients_created += 1
+            return cls._client
+
+    @classmethod
+    def close_client(cls):
+        """Fecha o MongoClient compartilhado (ex.: no encerramento da aplicação)."""
+        with cls._lock:
+            if cls._client is not None:
+                cls._client.close()
+                cls._client = None
 
     def test_connection(self):
         print(self.db.list_collection_names())
 
+    def ensure_indexes(self):
+        """
+        Cria (se ainda não existirem) os índices das coleções do caminho crítico.
+        create_index é idempotente, então pode ser chamado a cada inicialização.
+        """
+        created = []
+        for collection, indexes in self.INDEXES.items():
+            for keys in indexes:
+                try:
+                    created.append(self.db[collection].create_index(keys))
+                except errors.PyMongoError as error:
+                    print(f"Erro ao criar índice {keys} em {collection}:", error)
+        return created
+
+    def explain_hot_queries(self):
+        """
+        Executa explain() nas consultas frequentes e sinaliza as que fazem COLLSCAN.
+        :return: Lista de dicionários com coleção, filtro, estágios do plano e flag collscan.
+        """
+        report = []
+        for collection, filter_criteria in self.HOT_QUERIES:
+            try:
+                plan = self.db[collection].find(filter_criteria).explain()
+                stages = self._plan_stages(plan["queryPlanner"]["winningPlan"])
+                report.append({
+                    "collection": collection,
+                    "filter": list(filter_criteria),
+                    "stages": stages,
+                    "collscan": "COLLSCAN" in stages,
+                })
+            except errors.PyMongoError as error:
+                print(f"Erro no explain de {collection}:", error)
+        return report
+
+    @staticmethod
+    def _plan_stages(plan):
+        # Percorre o plano vencedor (inputStage/inputStages) coletando os estágios
+        stages = []
+        pending = [plan]
+        while pending:
+            node = pending.pop()
+            if "queryPlan" in node:
+                node = node["queryPlan"]
+            if "stage" in node:
+                stages.append(node["stage"])
+            if "inputStage" in node:
+                pending.append(node["inputStage"])
+            pending.extend(node.get("inputStages", []))
+        return stages
+
+    def connection_stats(self):
+        """
+        Métricas de conexão: instâncias de DataDB criadas, MongoClients abertos
+        e conexões vistas pelo servidor (serverStatus).
+        """
+        stats = {
+            "datadb_instances": DataDB.instances_created,
+            "mongo_clients": DataDB.clients_created,
+            "max_pool_size": MONGO_MAX_POOL_SIZE,
+            "min_pool_size": MONGO_MIN_POOL_SIZE,
+        }
+        try:
+            connections = self.client.admin.command("serverStatus")["connections"]
+            stats["server_connections"] = {
+                "current": connections.get("current"),
+                "available": connections.get("available"),
+                "total_created": connections.get("totalCreated"),
+            }
+        except Exception as error:
+            print("connection_stats error", error)
+        return stats
+
+    def create_time_series(self, collection, time_field, meta_field):
+        """
+        Cria uma coleção time-series, caso ainda não exista.
+        :param time_field: Campo com o horário de cada documento.
+        :param meta_field: Campo que identifica a série (ex: trade_id).
+        """
+        try:
+            if collection not in self.db.list_collection_names():
+                self.db.create_collection(
+                    collection,
+                    timeseries={"timeField": time_field, "metaField": meta_field, "granularity": "minutes"},
+                )
+        except errors.PyMongoError as error:
+            print("create_time_series error", error)
+
     def add_one(self, collection, ob):
         try:
             _ = self.db[collection].insert_one(ob)
@@ -108,3 +253,88 @@ class DataDB:
             )
         except errors.InvalidOperation as error:
             print("update_many error:", error)
+
+
+class AsyncDataDB:
+    # AsyncMongoClient único por processo, para uso a partir do loop de eventos
+    _client = None
+
+    def __init__(self):
+        self.client = AsyncDataDB.get_client()
+        self.db = self.client.forex_learning
+
+    @classmethod
+    def get_client(cls):
+        """Retorna o AsyncMongoClient compartilhado, criando-o na primeira chamada."""
+        if cls._client is None:
+            cls._client = AsyncMongoClient(
+                MONGO_CONN,
+                maxPoolSize=MONGO_MAX_POOL_SIZE,
+                minPoolSize=MONGO_MIN_POOL_SIZE,
+                event_listeners=[MongoCommandTimer()],
+            )
+        return cls._client
+
+    @classmethod
+    async def close_client(cls):
+        """Fecha o AsyncMongoClient compartilhado."""
+        if cls._client is not None:
+            await cls._client.close()
+            cls._client = None
+
+    async def add_one(self, collection, ob):
+        try:
+            _ = await self.db[collection].insert_one(ob)
+        except errors.InvalidOperation as error:
+            print("add one error", error)
+
+    async def add_many(self, collection, list_ob):
+        try:
+            _ = await self.db[collection].insert_many(list_ob)
+        except errors.InvalidOperation as error:
+            print("add many error", error)
+
+    async def query_all(self, collection, limit=100, **kargs):
+        try:
+            data = []
+            async for item in self.db[collection].find(kargs).limit(limit):
+                # Converte ObjectId para string
+                if "_id" in item:
+                    item["_id"] = str(item["_id"])
+                data.append(item)
+            return data
+        except errors.InvalidOperation as error:
+            print("query_all error", error)
+
+    async def query_single(self, collection, **kargs):
+        try:
+            result = await self.db[collection].find_one(kargs)
+            if result and "_id" in result:
+                # Converte o ObjectId para string
+                result["_id"] = str(result["_id"])
+            return result
+        except errors.InvalidOperation as error:
+            print("query_single error", error)
+            return None
+
+    async def update_one(self, collection, filter_criteria, update_values, upsert=False):
+        try:
+            if "$set" in update_values:
+                update_values = update_values["$set"]
+
+            return await self.db[collection].update_one(
+                filter_criteria,
+                {"$set": update_values},
+                upsert=upsert
+            )
+        except Exception as error:
+            print("Erro no update_one:", error)
+            return None
+
+    async def update_many(self, collection, filter_criteria, update_values):
+        try:
+            _ = await self.db[collection].update_many(
+                filter_criteria, {"$set": update_values}
+            )
+        except errors.InvalidOperation as error:
+            print("update_many error:", error)
@@ -0,0 +1,129 @@
+import asyncio
+import os
+from datetime import datetime, timedelta
+import pandas as pd
+from pytz import UTC
+from binance import AsyncClient
+from binance.exceptions import BinanceAPIException
+from constants.defs import KLINE_CACHE_DIR, HISTORICAL_MAX_CONCURRENCY
+
+KLINE_COLUMNS = [
+    "Open Time", "Open", "High", "Low", "Close", "Volume",
+    "Close Time", "Quote Asset Volume", "Number of Trades",
+    "Taker Buy Base Asset Volume", "Taker Buy Quote Asset Volume", "Ignore",
+]
+
+
+class HistoricalKlineLoader:
+    def __init__(self, client=None, cache_dir=KLINE_CACHE_DIR, max_concurrency=HISTORICAL_MAX_CONCURRENCY,
+                 max_retries=5):
+        """
+        Carga assíncrona do histórico de klines, com cache em disco (Feather) por símbolo/intervalo.
+        Após um restart apenas a cauda ainda não salva é buscada na Binance.
+        :param client: AsyncClient; se omitido, um cliente próprio é criado na primeira carga.
+        :param cache_dir: Diretório do cache. None desativa o cache.
+        :param max_concurrency: Máximo de símbolos baixados ao mesmo tempo.
+        :param max_retries: Tentativas ao receber erro de limite de requisições da Binance.
+        """
+        self.client = client
+        self.cache_dir = cache_dir
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self._semaphore = None
+
+    async def load_many(self, symbols, interval, days):
+        """
+        Carrega o histórico de vários símbolos em paralelo.
+        :return: Dicionário {símbolo: DataFrame}.
+        """
+        frames = await asyncio.gather(*(self.load(symbol, interval, days) for symbol in symbols))
+        return dict(zip(symbols, frames))
+
+    async def load(self, symbol, interval, days):
+        """
+        Carrega os últimos `days` dias de klines de um símbolo.
+        :return: DataFrame indexado por Date com Open, High, Low, Close, Volume, Time e Complete.
+        """
+        print(f"Adicionando dados historicos para {symbol}......")
+        start = datetime.now(UTC) - timedelta(days=days)
+        start_ms = int(start.timestamp() * 1000)
+
+        cached = self._read_cache(symbol, interval)
+        if cached is not None and len(cached):
+            cached = cached[cached["Open Time"] >= start_ms]
+        fetch_from = start_ms
+        if cached is not None and len(cached):
+            fetch_from = int(cached["Open Time"].iloc[-1]) + 1
+
+        bars = await self._fetch(symbol, interval, fetch_from)
+        fetched = pd.DataFrame(bars, columns=KLINE_COLUMNS) if bars else pd.DataFrame(columns=KLINE_COLUMNS)
+        fetched = fetched[["Open Time", "Open", "High", "Low", "Close", "Volume"]]
+        for column in ["Open", "High", "Low", "Close", "Volume"]:
+            fetched[column] = pd.to_numeric(fetched[column], errors="coerce")
+        fetched["Open Time"] = fetched["Open Time"].astype("int64")
+
+        if cached is not None and len(cached):
+            klines = pd.concat([cached, fetched], ignore_index=True)
+        else:
+            klines = fetched.reset_index(drop=True)
+        klines = klines.drop_duplicates("Open Time", keep="last").reset_index(drop=True)
+
+        # O último kline buscado ainda está em formação e não vai para o cache;
+        # sem linhas novas, todos os klines vieram do cache e já estão fechados
+        forming = 1 if len(fetched) else 0
+        self._write_cache(symbol, interval, klines.iloc[:len(klines) - forming])
+
+        df = klines[["Open", "High", "Low", "Close", "Volume"]].copy()
+        df["Date"] = pd.to_datetime(klines["Open Time"], unit="ms")
+        df["Time"] = df["Date"].copy()
+        df.set_index("Date", inplace=True)
+        df["Complete"] = [True] * (len(df) - forming) + [False] * forming if len(df) else []
+
+        print(f"Dados historicos para {symbol} adicionados!")
+        return df
+
+    async def _fetch(self, symbol, interval, start_ms):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        if self.client is None:
+            self.client = await AsyncClient.create()
+
+        delay = 1
+        async with self._semaphore:
+            for attempt in range(self.max_retries):
+                try:
+                    return await self.client.get_historical_klines(
+                        symbol=symbol, interval=interval, start_str=start_ms, end_str=None
+                    )
+                except BinanceAPIException as e:
+                    # -1003: limite de requisições excedido (HTTP 429/418)
+                    if e.code != -1003 and e.status_code not in (418, 429):
+                        raise
+                    print(f"Limite de requisições atingido para {symbol}, aguardando {delay}s")
+                    await asyncio.sleep(delay)
+                    delay *= 2
+        raise RuntimeError(f"Não foi possível obter o histórico de {symbol} após {self.max_retries} tentativas.")
+
+    def _cache_path(self, symbol, interval):
+        return os.path.join(self.cache_dir, f"{symbol.upper()}_{interval}.feather")
+
+    def _read_cache(self, symbol, interval):
+        if not self.cache_dir:
+            return None
+        path = self._cache_path(symbol, interval)
+        if not os.path.exists(path):
+            return None
+        try:
+            return pd.read_feather(path)
+        except Exception as e:
+            print(f"Erro ao ler cache de klines {path}: {e}")
+            return None
+
+    def _write_cache(self, symbol, interval, klines):
+        if not self.cache_dir:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            klines.reset_index(drop=True).to_feather(self._cache_path(symbol, interval))
+        except Exception as e:
+            print(f"Erro ao salvar cache de klines de {symbol}: {e}")
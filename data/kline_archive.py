@@ -0,0 +1,250 @@
+import os
+import queue
+import threading
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+from constants.defs import KLINE_ARCHIVE_DIR, KLINE_ARCHIVE_MAX_QUEUED
+
+
+class KlineArchive:
+    # Coluna -> dtype do arquivo binário da coluna
+    COLUMNS = {
+        "Open Time": np.int64,
+        "Open": np.float64,
+        "High": np.float64,
+        "Low": np.float64,
+        "Close": np.float64,
+        "Volume": np.float64,
+    }
+
+    def __init__(self, root=KLINE_ARCHIVE_DIR):
+        """
+        Arquivo colunar de klines fechados em disco, somente-anexação.
+        Layout: <root>/<SÍMBOLO>/<intervalo>/<AAAA-MM-DD>/<coluna>.bin, um array binário
+        por coluna, lido com np.memmap (sem copiar para a memória do processo).
+        :param root: Diretório raiz do arquivo.
+        """
+        self.root = root
+        self.last_open_time = {}  # (símbolo, intervalo) -> último open time (ms) gravado
+        self._lock = threading.Lock()
+
+    def append(self, symbol, interval, open_time, first, high, low, close, volume):
+        """
+        Anexa um kline fechado à partição do dia correspondente.
+        Klines repetidos ou fora de ordem são ignorados.
+        :param open_time: Horário de abertura em ms (epoch).
+        """
+        symbol = symbol.upper()
+        key = (symbol, interval)
+        with self._lock:
+            last = self.last_open_time.get(key)
+            if last is None:
+                last = self.last_open_time[key] = self._last_archived(symbol, interval)
+            if last is not None and open_time <= last:
+                return False
+
+            directory = self._partition_path(symbol, interval, self._day(open_time))
+            os.makedirs(directory, exist_ok=True)
+            values = (open_time, first, high, low, close, volume)
+            for (column, dtype), value in zip(self.COLUMNS.items(), values):
+                with open(self._column_path(directory, column), "ab") as f:
+                    f.write(np.array([value], dtype=dtype).tobytes())
+            self.last_open_time[key] = open_time
+            return True
+
+    def days(self, symbol, interval):
+        """Dias (AAAA-MM-DD) disponíveis para o símbolo/intervalo, em ordem."""
+        directory = os.path.join(self.root, symbol.upper(), interval)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(os.listdir(directory))
+
+    def read_day(self, symbol, interval, day):
+        """
+        Mapeia em memória as colunas de uma partição diária.
+        :return: Dicionário {coluna: np.memmap somente-leitura}.
+        """
+        directory = self._partition_path(symbol.upper(), interval, day)
+        columns = {}
+        for column, dtype in self.COLUMNS.items():
+            path = self._column_path(directory, column)
+            if not os.path.exists(path) or os.path.getsize(path) == 0:
+                columns[column] = np.empty(0, dtype=dtype)
+            else:
+                columns[column] = np.memmap(path, dtype=dtype, mode="r")
+
+        # Uma escrita interrompida pode deixar colunas com tamanhos diferentes
+        rows = min(len(values) for values in columns.values())
+        return {column: values[:rows] for column, values in columns.items()}
+
+    def read(self, symbol, interval, start=None, end=None):
+        """
+        Lê as colunas de um intervalo de datas (inclusive), concatenando as partições diárias.
+        :param start: Datetime inicial (opcional).
+        :param end: Datetime final (opcional).
+        :return: Dicionário {coluna: np.ndarray}.
+        """
+        days = self.days(symbol, interval)
+        if start is not None:
+            days = [day for day in days if day >= start.strftime("%Y-%m-%d")]
+        if end is not None:
+            days = [day for day in days if day <= end.strftime("%Y-%m-%d")]
+
+        parts = [self.read_day(symbol, interval, day) for day in days]
+        columns = {
+            column: np.concatenate([part[column] for part in parts]) if parts else np.empty(0, dtype=dtype)
+            for column, dtype in self.COLUMNS.items()
+        }
+
+        mask = np.ones(len(columns["Open Time"]), dtype=bool)
+        if start is not None:
+            mask &= columns["Open Time"] >= self._to_ms(start)
+        if end is not None:
+            mask &= columns["Open Time"] <= self._to_ms(end)
+        if not mask.all():
+            columns = {column: values[mask] for column, values in columns.items()}
+        return columns
+
+    def to_dataframe(self, symbol, interval, start=None, end=None):
+        """
+        Lê o arquivo no formato do histórico usado pelos managers
+        (indexado por Date, com Time e Complete).
+        """
+        columns = self.read(symbol, interval, start, end)
+        df = pd.DataFrame({column: columns[column] for column in ["Open", "High", "Low", "Close", "Volume"]})
+        df["Date"] = pd.to_datetime(columns["Open Time"], unit="ms")
+        df["Time"] = df["Date"].copy()
+        df.set_index("Date", inplace=True)
+        df["Complete"] = True
+        return df
+
+    def _last_archived(self, symbol, interval):
+        days = self.days(symbol, interval)
+        if days:
+            self._repair(symbol, interval, days[-1])
+        for day in reversed(days):
+            open_times = self.read_day(symbol, interval, day)["Open Time"]
+            if len(open_times):
+                return int(open_times[-1])
+        return None
+
+    def _repair(self, symbol, interval, day):
+        # Trunca as colunas para o mesmo número de linhas antes de voltar a anexar
+        directory = self._partition_path(symbol, interval, day)
+        sizes = {}
+        for column, dtype in self.COLUMNS.items():
+            path = self._column_path(directory, column)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            sizes[path] = (size, np.dtype(dtype).itemsize)
+        rows = min(size // itemsize for size, itemsize in sizes.values())
+        for path, (size, itemsize) in sizes.items():
+            if size != rows * itemsize:
+                with open(path, "r+b") as f:
+                    f.truncate(rows * itemsize)
+
+    def _partition_path(self, symbol, interval, day):
+        return os.path.join(self.root, symbol, interval, day)
+
+    @staticmethod
+    def _column_path(directory, column):
+        return os.path.join(directory, column.lower().replace(" ", "_") + ".bin")
+
+    @staticmethod
+    def _day(open_time):
+        return datetime.fromtimestamp(open_time / 1000, tz=timezone.utc).strftime("%Y-%m-%d")
+
+    @staticmethod
+    def _to_ms(value):
+        return int(pd.Timestamp(value).timestamp() * 1000)
+
+
+class KlineArchiveWriter:
+    def __init__(self, archive, max_queued=KLINE_ARCHIVE_MAX_QUEUED):
+        """
+        Gravação do KlineArchive em segundo plano: append() apenas enfileira o kline e uma
+        thread dedicada faz as escritas nos arquivos das colunas, fora do loop de eventos do stream.
+        :param archive: KlineArchive de destino.
+        :param max_queued: Limite da fila; acima dele novos klines são descartados e contados.
+        """
+        self.archive = archive
+        self.queue = queue.Queue(maxsize=max_queued)
+        self.thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+        # Métricas
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.max_depth = 0
+
+    def append(self, symbol, interval, open_time, first, high, low, close, volume):
+        """
+        Enfileira um kline fechado sem bloquear (mesma assinatura de KlineArchive.append).
+        :return: False se a fila estiver cheia e o kline foi descartado.
+        """
+        self.start()
+        try:
+            self.queue.put_nowait((symbol, interval, open_time, first, high, low, close, volume))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.enqueued += 1
+        self.max_depth = max(self.max_depth, self.queue.qsize())
+        return True
+
+    def start(self):
+        """Inicia a thread de escrita (idempotente)."""
+        with self._lock:
+            if self.thread is not None and self.thread.is_alive():
+                return
+            self._stop.clear()
+            self.thread = threading.Thread(target=self._run, name="kline-archive-writer", daemon=True)
+            self.thread.start()
+
+    def stop(self, timeout=10):
+        """Grava o que restou na fila e encerra a thread."""
+        with self._lock:
+            thread = self.thread
+            self.thread = None
+        if thread is None:
+            return
+        self._stop.set()
+        thread.join(timeout)
+
+    def stats(self):
+        """Métricas de vazão e de contrapressão da fila."""
+        return {
+            "queue_depth": self.queue.qsize(),
+            "max_queue_depth": self.max_depth,
+            "queue_capacity": self.queue.maxsize,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+    def _run(self):
+        while True:
+            try:
+                self._write(self.queue.get(timeout=0.5))
+                continue
+            except queue.Empty:
+                pass
+            if self._stop.is_set():
+                # Esvazia a fila antes de sair
+                while True:
+                    try:
+                        self._write(self.queue.get_nowait())
+                    except queue.Empty:
+                        return
+
+    def _write(self, kline):
+        try:
+            self.archive.append(*kline)
+            self.written += 1
+        except Exception as e:
+            self.failed += 1
+            print(f"Erro ao arquivar kline de {kline[0]} {kline[1]}: {e}")
@@ -0,0 +1,129 @@
+import queue
+import threading
+import time
+from data.database import DataDB
+from constants.defs import SNAPSHOT_BATCH_SIZE, SNAPSHOT_FLUSH_INTERVAL, SNAPSHOT_MAX_QUEUED
+
+
+class WriteBehindQueue:
+    def __init__(self, collection, batch_size=SNAPSHOT_BATCH_SIZE, flush_interval=SNAPSHOT_FLUSH_INTERVAL,
+                 max_queued=SNAPSHOT_MAX_QUEUED, time_field="Time", meta_field="trade_id", db=None):
+        """
+        Fila de escrita em segundo plano: os documentos são enfileirados sem bloquear
+        o callback do candle e gravados com insert_many por uma thread dedicada,
+        quando o lote atinge `batch_size` ou após `flush_interval` segundos.
+        :param collection: Coleção time-series de destino.
+        :param max_queued: Limite da fila; acima dele novos documentos são descartados e contados.
+        :param time_field: Campo de horário da coleção time-series.
+        :param meta_field: Campo que identifica a série (um trader).
+        :param db: DataDB opcional (criado na thread de escrita se omitido).
+        """
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.time_field = time_field
+        self.meta_field = meta_field
+        self.db = db
+        self.queue = queue.Queue(maxsize=max_queued)
+        self.thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+        # Métricas
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self.max_depth = 0
+        self.last_flush_seconds = 0.0
+
+    def put(self, document):
+        """
+        Enfileira um documento sem bloquear.
+        :return: False se a fila estiver cheia e o documento foi descartado.
+        """
+        self.start()
+        try:
+            self.queue.put_nowait(document)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.enqueued += 1
+        self.max_depth = max(self.max_depth, self.queue.qsize())
+        return True
+
+    def start(self):
+        """Inicia a thread de escrita (idempotente)."""
+        with self._lock:
+            if self.thread is not None and self.thread.is_alive():
+                return
+            self._stop.clear()
+            self.thread = threading.Thread(target=self._run, name=f"write-behind-{self.collection}", daemon=True)
+            self.thread.start()
+
+    def stop(self, timeout=10):
+        """Grava o que restou na fila e encerra a thread."""
+        with self._lock:
+            thread = self.thread
+            self.thread = None
+        if thread is None:
+            return
+        self._stop.set()
+        thread.join(timeout)
+
+    def stats(self):
+        """Métricas de vazão e de contrapressão da fila."""
+        return {
+            "collection": self.collection,
+            "queue_depth": self.queue.qsize(),
+            "max_queue_depth": self.max_depth,
+            "queue_capacity": self.queue.maxsize,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+            "last_flush_seconds": self.last_flush_seconds,
+        }
+
+    def _run(self):
+        if self.db is None:
+            self.db = DataDB()
+        self.db.create_time_series(self.collection, self.time_field, self.meta_field)
+
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            timeout = max(0.0, deadline - time.monotonic())
+            try:
+                batch.append(self.queue.get(timeout=min(timeout, 0.5)))
+            except queue.Empty:
+                pass
+
+            stopping = self._stop.is_set()
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline or stopping:
+                if stopping:
+                    # Esvazia a fila antes de sair
+                    while True:
+                        try:
+                            batch.append(self.queue.get_nowait())
+                        except queue.Empty:
+                            break
+                while batch:
+                    chunk, batch = batch[:self.batch_size], batch[self.batch_size:]
+                    self._flush(chunk)
+                deadline = time.monotonic() + self.flush_interval
+                if stopping:
+                    return
+
+    def _flush(self, batch):
+        started = time.perf_counter()
+        try:
+            self.db.db[self.collection].insert_many(batch, ordered=False)
+            self.written += len(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            print(f"Erro ao gravar lote de {len(batch)} documentos em {self.collection}: {e}")
+        self.batches += 1
+        self.last_flush_seconds = time.perf_counter() - started
@@ -1,6 +1,9 @@
+import asyncio
 from fastapi import FastAPI, Depends
 from api.server import app as api_app
-from core.instances import trader_manager, pair_trader_manager
+from core.instances import trader_manager, pair_trader_manager, stream_ingestor, order_tracker, kline_archive_writer
+from data.database import DataDB, AsyncDataDB
+from core.notification_worker import notification_worker
 from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
 import logging
@@ -11,11 +14,21 @@ logging.basicConfig(level=logging.INFO)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    DataDB().ensure_indexes()
     await trader_manager.init_binance_client()
     await pair_trader_manager.init_binance_client()
+    await notification_worker.start()
+    await stream_ingestor.start()
+    await order_tracker.start(trader_manager.client)
     yield
+    await order_tracker.stop()
+    await stream_ingestor.stop()
+    await asyncio.to_thread(kline_archive_writer.stop)
+    await notification_worker.stop()
     await trader_manager.close_binance_client()
     await pair_trader_manager.close_binance_client()
+    DataDB.close_client()
+    await AsyncDataDB.close_client()
 
 
 # Inicialize o FastAPI com o lifespan
@@ -1,15 +1,12 @@
 
-import pandas as pd
+import time
+import numpy as np
 from data.database import DataDB
 from core.strategies import SignalStrategy
 from core.signal_manager import SignalManager
-from core.telegram_bot import run_bot
-from technicals.indicators import EMAShort, calculate_ema, PAV
-from constants.defs import (CHAT_TELEGRAM_ID)
-import asyncio
-import mplfinance as mpf
-import matplotlib.pyplot as plt
-import os
+from core.notification_worker import notification_worker
+from technicals.streaming import EMAPERCrossStream
+from core.metrics import TRADER_STRATEGY_TIME
 
 class LongShortTrader:
     def __init__(
@@ -40,56 +37,86 @@ class LongShortTrader:
         self.manager = manager
         # Conexão com o MongoDB
         self.db = DataDB()
+        # EMAs incrementais específicas do trader
+        self.cross = EMAPERCrossStream(emaper_s, emaper_l)
+        self.last_indicator_time = None
+        self.last_indicators = None
+        self.previous_indicators = None
 
     def save_candle_strategy_to_db(self):
-        candle_data = self.prepared_data.iloc[-1].to_dict()
-        self.db.add_one(f"bot_{self.symbol}_{self.trade_id}", candle_data)
+        # Enfileira o snapshot; a gravação em lote é feita pela fila write-behind do manager
+        self.manager.snapshot_writer.put({"trade_id": self.trade_id, "symbol": self.symbol, **self.prepared_data})
         # print(
         #     f"Candle salvo para {self.symbol}: {candle_data['Close']} - {candle_data['Time']}"
         # )
 
+    def update_indicators(self, shared):
+        """
+        Alimenta as EMAs do trader com os valores de Average_EMA_percent ainda não processados.
+        Na primeira chamada as EMAs são semeadas com todo o histórico compartilhado.
+        :param shared: Indicadores compartilhados (arrays somente-leitura) retornados pelo IndicatorCache.
+        :return: Linha de indicadores do candle mais recente (ou None se não houver dado novo).
+        """
+        times = shared["Time"]
+        if not len(times):
+            return None
+
+        start = 0
+        if self.last_indicator_time is not None:
+            start = int(np.searchsorted(times, self.last_indicator_time, side="right"))
+
+        cross = None
+        for average in shared["Average_EMA_percent"][start:]:
+            cross = self.cross.update(float(average))
+            self.previous_indicators, self.last_indicators = self.last_indicators, cross
+        self.last_indicator_time = times[-1]
+        if cross is None:
+            return None
+
+        row = {column: float(values[-1]) for column, values in shared.items() if column != "Time"}
+        row.update(cross)
+        return row
+
+    def update_history(self, start_time):
+        """
+        Avança os indicadores com um candle antigo (recuperado pelo backfill), sem avaliar sinais
+        nem concluir a rodada do candle no SignalManager.
+        """
+        candles = self.manager.candle_data[(self.symbol, self.bar_length)]
+        shared = self.manager.indicator_cache.get(self.symbol, self.bar_length, self.ema_s, candles, start_time)
+        self.update_indicators(shared)
+
     def define_strategy(self, start_time):
-        # Implementar lógica da estratégia
-        self.prepared_data = self.manager.candle_data[self.symbol].copy()[-500:]
-        
-        self.prepared_data = EMAShort(self.prepared_data, self.ema_s)
-        self.prepared_data['Percent_Change_10'] = PAV(self.prepared_data['EMA_short'].values, 10)
-        self.prepared_data['EMA_percent_s_10'] = calculate_ema(self.prepared_data['Percent_Change_10'].values, 10)
-        self.prepared_data['Percent_Change_50'] = PAV(self.prepared_data['EMA_short'].values, 50)
-        self.prepared_data['EMA_percent_s_50'] = calculate_ema(self.prepared_data['Percent_Change_50'].values, 10)
-        self.prepared_data['Percent_Change_150'] = PAV(self.prepared_data['EMA_short'].values, 150)
-        self.prepared_data['EMA_percent_s_150'] = calculate_ema(self.prepared_data['Percent_Change_150'].values, 10)
-        self.prepared_data['Percent_Change_200'] = PAV(self.prepared_data['EMA_short'].values, 200)
-        self.prepared_data['EMA_percent_s_200'] = calculate_ema(self.prepared_data['Percent_Change_200'].values, 10)
-        self.prepared_data['Average_EMA_percent'] = self.prepared_data[['EMA_percent_s_10', 'EMA_percent_s_50', 'EMA_percent_s_150','EMA_percent_s_200']].mean(axis=1)
-        self.prepared_data['Average_EMA_percent_ema_short'] = calculate_ema(self.prepared_data['Average_EMA_percent'].values, self.emaper_s)
-        self.prepared_data['Average_EMA_percent_ema_long'] = calculate_ema(self.prepared_data['Average_EMA_percent'].values, self.emaper_l)
-        self.prepared_data.dropna(inplace=True)
-        self.prepared_data.reset_index(drop=True, inplace=True)
-        self.prepared_data = self.strategy.detect_signals(self.prepared_data.copy(), self.emaper_force)
+        # Os indicadores comuns (EMA_short, PAV, Average_EMA_percent) são calculados uma única vez
+        # por candle para todos os traders com o mesmo símbolo/intervalo/ema_s
+        started = time.perf_counter()
+        candles = self.manager.candle_data[(self.symbol, self.bar_length)]
+        shared = self.manager.indicator_cache.get(self.symbol, self.bar_length, self.ema_s, candles, start_time)
+        row = self.update_indicators(shared)
+        if row is None:
+            TRADER_STRATEGY_TIME.observe(time.perf_counter() - started, trade_id=self.trade_id)
+            self.signal_manager.register_task_completion(self.trade_id, self.bar_length, start_time)
+            return
+
+        # Avalia o cruzamento somente no candle atual, a partir dos valores do candle anterior
+        candle_prepared_data = {**candles.last(), **row}
+        candle_prepared_data.update(
+            self.strategy.detect_last_signal(self.previous_indicators, candle_prepared_data, self.emaper_force)
+        )
+        self.prepared_data = candle_prepared_data
+        TRADER_STRATEGY_TIME.observe(time.perf_counter() - started, trade_id=self.trade_id)
 
         self.save_candle_strategy_to_db()
       
         
-        candle_prepared_data = self.prepared_data.iloc[-1]
         # Verifica sinais ao final do candle completo
-        if candle_prepared_data.SIGNAL_UP_FIRST != 0 or candle_prepared_data.SIGNAL_DOWN_FIRST != 0:
-            # Gera o gráfico de candlestick e salva como imagem
-            temp_images_dir = os.path.join(os.getcwd(), "temp_images")
-            os.makedirs(temp_images_dir, exist_ok=True)
-            img_path = os.path.join(temp_images_dir, "candle_chart.png")
-            
-            fig, ax = plt.subplots(figsize=(10, 6))
-            mpf.plot(self.prepared_data.set_index("Time").tail(100), type="candle", ax=ax)
-            plt.savefig(img_path)
-            plt.close(fig)
-            
+        if candle_prepared_data["SIGNAL_UP_FIRST"] != 0 or candle_prepared_data["SIGNAL_DOWN_FIRST"] != 0:
             signal = {
                 "trade_id": self.trade_id,
-                "Time": candle_prepared_data.Time,
-                "Close": candle_prepared_data.Close,
-                "SIGNAL_UP": candle_prepared_data.SIGNAL_UP_FIRST,
-                "SIGNAL_DOWN": candle_prepared_data.SIGNAL_DOWN_FIRST
+                "Time": candle_prepared_data["Time"],
+                "Close": candle_prepared_data["Close"],
+                "SIGNAL_UP": candle_prepared_data["SIGNAL_UP_FIRST"],
+                "SIGNAL_DOWN": candle_prepared_data["SIGNAL_DOWN_FIRST"]
             }
             self.signal_manager.register_signal(self.trade_id, signal)
             
@@ -110,15 +137,15 @@ class LongShortTrader:
             - SL percent: '{self.sl_percent}'
             """
 
-            # Envia a mensagem usando o bot do Telegram
+            # Envia a mensagem e o gráfico dos últimos 100 candles pelo worker de notificações
             print("")
             print(message)
             print("")
             
-            asyncio.create_task(run_bot([message, ("photo", img_path)], CHAT_TELEGRAM_ID))
+            notification_worker.notify(self.trade_id, message, candles.to_dataframe(100).set_index("Time"))
         
         # Notifica o SignalManager sobre a conclusão conclusão da stratégia para um trader strategy
-        self.signal_manager.register_task_completion(start_time)
+        self.signal_manager.register_task_completion(self.trade_id, self.bar_length, start_time)
         
         
     def execute_trades(self):
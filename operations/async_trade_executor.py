@@ -0,0 +1,165 @@
+import asyncio
+from binance import AsyncClient
+from binance.exceptions import BinanceAPIException
+from operations.trade_executor import TradeExecutor
+from operations.sizing import sizing_service
+from data.database import AsyncDataDB
+
+
+class AsyncTradeExecutor:
+    # Filtros de negociação, preços e saldos em memória
+    sizing = sizing_service
+
+    def __init__(self, client: AsyncClient, trade_executor: TradeExecutor, place_exchange_orders=False, db=None):
+        """
+        Caminho de execução não bloqueante, usado a partir do loop asyncio dos streams.
+        :param client: AsyncClient já inicializado pelo TraderManager.
+        :param trade_executor: TradeExecutor síncrono, usado para os cálculos e para o livro de posições.
+        :param place_exchange_orders: Se True, cria ordens STOP_MARKET/TAKE_PROFIT_MARKET na Binance.
+                                      Por padrão TP/SL são monitorados pelos candles, como no fluxo síncrono.
+        :param db: AsyncDataDB usado nas escritas do MongoDB a partir do loop; se omitido, um é criado.
+        """
+        self.client = client
+        self.trade_executor = trade_executor
+        self.place_exchange_orders = place_exchange_orders
+        self.db = db or AsyncDataDB()
+
+    async def execute_trade(self, trade_params, signal):
+        """
+        Versão assíncrona de TradeExecutor.execute_trade.
+        Alavancagem e cotação são obtidas em paralelo; SL e TP também são enviados em paralelo.
+        :param trade_params: Parâmetros da operação (e.g., símbolo, estratégia).
+        :param signal: Dados do sinal que disparou a operação.
+        """
+        try:
+            symbol = trade_params["symbol"]
+            position_side = "LONG" if signal["SIGNAL_UP"] == 1 else "SHORT"
+
+            # Obtém alavancagem do banco e configura na Binance enquanto calcula a quantidade
+            leverage = await asyncio.to_thread(self.trade_executor.get_leverage, symbol)
+            _, quantity = await asyncio.gather(
+                self.client.futures_change_leverage(symbol=symbol, leverage=leverage),
+                self.get_quantity(symbol),
+            )
+
+            side = "BUY" if position_side == "LONG" else "SELL"
+            print(f"Abrindo trade {symbol} | {side} | {quantity} | {position_side}")
+            order = await self.open_trade(
+                symbol=symbol,
+                side=side,
+                quantity=quantity,
+                position_side=position_side
+            )
+
+            if not order:
+                print("Erro ao abrir a posição. Operação abortada.")
+                return None
+
+            # Salva a ordem e os detalhes iniciais do trade no banco
+            await self.log_order(order)
+            updates, sl_price, tp_price = self.trade_executor.build_opened_trade(
+                trade_params, signal, position_side, quantity
+            )
+            await self.edit_opened_trades(order["orderId"], updates, upsert=True)
+
+            if self.place_exchange_orders:
+                # SL e TP são independentes entre si
+                sl_order, tp_order = await asyncio.gather(
+                    self.set_stop_loss(symbol, quantity, position_side, sl_price),
+                    self.set_take_profit(symbol, quantity, position_side, tp_price),
+                )
+                updates = {}
+                if sl_order:
+                    updates["stop_loss_order_id"] = sl_order["orderId"]
+                if tp_order:
+                    updates["take_profit_order_id"] = tp_order["orderId"]
+                if updates:
+                    await self.edit_opened_trades(order["orderId"], updates)
+
+            return order
+        except Exception as e:
+            print(f"Erro ao executar trade: {e}")
+            return None
+
+    async def log_order(self, order):
+        """Salva uma ordem na coleção `orders`."""
+        await self.db.add_one("orders", order)
+        print(f"Ordem {order['orderId']} salva no banco!")
+
+    async def edit_opened_trades(self, opened_trade_id, updates, upsert=False):
+        """
+        Edita ou cria um trade na coleção `opened_trades` e aplica a mesma escrita
+        no livro de posições do TradeExecutor (write-through, como no fluxo síncrono).
+        """
+        result = await self.db.update_one("opened_trades", {"_id": opened_trade_id}, updates, upsert=upsert)
+        if result is not None:
+            self.trade_executor.position_book.apply(opened_trade_id, updates, upsert=upsert)
+        print(f"Trade aberto {opened_trade_id} atualizado!")
+        return result
+
+    async def get_quantity(self, symbol):
+        """
+        Calcula a quantidade a negociar com base na configuração do sistema e no último preço do stream,
+        arredondada no stepSize do símbolo.
+        Filtros e ticker faltantes vêm do cliente síncrono do TradeExecutor, fora do loop de eventos.
+        :param symbol: Ativo (ex: 'ADAUSDT').
+        """
+        config_system = self.trade_executor.config_system_manager.get_system_config()
+        quantity_in_dolar = config_system['total_earnings'] / config_system['percentage_of_total']
+        return await asyncio.to_thread(self.sizing.order_quantity, self.trade_executor.client, symbol, quantity_in_dolar)
+
+    async def open_trade(self, symbol, side, quantity, position_side):
+        """
+        Abre uma posição a mercado no mercado futuro.
+        :param symbol: Ativo (ex: 'ADAUSDT').
+        :param side: 'BUY' para abrir Long, 'SELL' para abrir Short.
+        :param quantity: Quantidade a negociar.
+        :param position_side: 'LONG' ou 'SHORT'.
+        """
+        try:
+            order = await self.client.futures_create_order(
+                symbol=symbol,
+                side=side,
+                type="MARKET",
+                quantity=quantity,
+                positionSide=position_side
+            )
+            print(f"Posição aberta: {order['orderId']}")
+            return order
+        except BinanceAPIException as e:
+            print(f"Erro ao abrir posição: {e}")
+            return None
+
+    async def set_stop_loss(self, symbol, quantity, position_side, sl_price):
+        """
+        Define uma ordem de Stop Loss para proteger a posição.
+        :param sl_price: Preço de disparo do Stop Loss.
+        """
+        return await self._create_protection_order(symbol, quantity, position_side, sl_price, "STOP_MARKET")
+
+    async def set_take_profit(self, symbol, quantity, position_side, tp_price):
+        """
+        Define uma ordem de Take Profit para a posição.
+        :param tp_price: Preço alvo para encerrar a posição.
+        """
+        return await self._create_protection_order(symbol, quantity, position_side, tp_price, "TAKE_PROFIT_MARKET")
+
+    async def _create_protection_order(self, symbol, quantity, position_side, stop_price, order_type):
+        try:
+            side = "SELL" if position_side == "LONG" else "BUY"
+            print(f"Abrindo {order_type} {symbol} | {side} | {stop_price} | {quantity} | {position_side}")
+            order = await self.client.futures_create_order(
+                symbol=symbol,
+                side=side,
+                type=order_type,
+                stopPrice=self.sizing.round_price(symbol, stop_price),
+                quantity=quantity,
+                positionSide=position_side
+            )
+            print(f"{order_type} definido: {order['orderId']}")
+
+            await self.log_order(order)
+            return order
+        except BinanceAPIException as e:
+            print(f"Erro ao definir {order_type}: {e}")
+            return None
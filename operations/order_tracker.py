@@ -0,0 +1,152 @@
+import asyncio
+import time
+from binance import BinanceSocketManager
+from constants.defs import ORDER_RECONCILE_INTERVAL
+
+
+class OrderTracker:
+    def __init__(self, executors, sizing=None, reconcile_interval=ORDER_RECONCILE_INTERVAL, max_backoff=60):
+        """
+        Acompanha as ordens de TP/SL pelo user-data stream de futuros da Binance.
+        Eventos ORDER_TRADE_UPDATE de ordens executadas são repassados aos executores, que
+        atualizam o livro de posições e o banco no momento do fill; as ordens abertas são
+        consultadas via REST apenas na reconciliação periódica e após cada (re)conexão.
+        :param executors: Executores com handle_order_update(order), get_reconcile_trades() e
+                          reconcile_orders(open_order_ids, active_trades=...) (TradeExecutor, PairTradeExecutor).
+        :param sizing: SizingService opcional; recebe os saldos do ACCOUNT_UPDATE e é recarregado a cada conexão.
+        :param reconcile_interval: Intervalo (segundos) entre reconciliações via REST.
+        :param max_backoff: Espera máxima (segundos) entre tentativas de reconexão.
+        """
+        self.executors = executors
+        self.sizing = sizing
+        self.reconcile_interval = reconcile_interval
+        self.max_backoff = max_backoff
+        self.client = None
+        self.bm = None
+        self.task = None
+        self.reconcile_task = None
+        self.connected = False
+        self.positions = {}  # (símbolo, positionSide) -> quantidade, pelo ACCOUNT_UPDATE
+
+        # Métricas
+        self.events = 0
+        self.fills = 0
+        self.reconciliations = 0
+        self.last_reconcile = None
+
+    async def start(self, client):
+        """
+        Inicia o user-data stream e a reconciliação periódica.
+        :param client: AsyncClient autenticado.
+        """
+        if self.task is not None:
+            return
+        self.client = client
+        self.bm = BinanceSocketManager(client)
+        self.task = asyncio.create_task(self._run())
+        self.reconcile_task = asyncio.create_task(self._reconcile_loop())
+
+    async def stop(self):
+        """Encerra o stream e a reconciliação."""
+        for task in (self.task, self.reconcile_task):
+            if task is None:
+                continue
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self.task = None
+        self.reconcile_task = None
+        self.connected = False
+
+    async def handle_message(self, msg):
+        """Processa uma mensagem do user-data stream."""
+        event = msg.get("e")
+        if event == "error":
+            raise ConnectionError(msg.get("m", "Erro no user-data stream"))
+        if event == "listenKeyExpired":
+            raise ConnectionError("listenKey expirada")
+
+        self.events += 1
+        if event == "ORDER_TRADE_UPDATE":
+            order = msg["o"]
+            if order.get("X") != "FILLED":
+                return
+            for executor in self.executors:
+                # Os executores usam o cliente REST síncrono (cancelamento da ordem restante)
+                if await asyncio.to_thread(executor.handle_order_update, order):
+                    self.fills += 1
+                    break
+        elif event == "ACCOUNT_UPDATE":
+            if self.sizing is not None:
+                for balance in msg.get("a", {}).get("B", []):
+                    self.sizing.update_balance(balance["a"], balance["wb"])
+            for position in msg.get("a", {}).get("P", []):
+                self.positions[(position["s"], position["ps"])] = float(position["pa"])
+
+    async def reconcile(self):
+        """Compara os trades ativos com as ordens abertas na Binance (uma chamada REST)."""
+        # Trades lidos antes das ordens abertas: um trade aberto entre as duas leituras
+        # ficaria com TP/SL fora do snapshot e seria fechado indevidamente
+        active_trades = [await asyncio.to_thread(executor.get_reconcile_trades) for executor in self.executors]
+        open_orders = await self.client.futures_get_open_orders()
+        open_order_ids = {order["orderId"] for order in open_orders}
+        for executor, trades in zip(self.executors, active_trades):
+            await asyncio.to_thread(executor.reconcile_orders, open_order_ids, active_trades=trades)
+        self.reconciliations += 1
+        self.last_reconcile = time.time()
+
+    def stats(self):
+        """Estado do stream e contadores."""
+        return {
+            "connected": self.connected,
+            "events": self.events,
+            "fills": self.fills,
+            "reconciliations": self.reconciliations,
+            "last_reconcile": self.last_reconcile,
+            "positions": {f"{symbol} {side}": amount for (symbol, side), amount in self.positions.items()},
+        }
+
+    async def _run(self):
+        backoff = 1
+        while True:
+            try:
+                async with self.bm.futures_user_socket() as socket:
+                    print("User-data stream de futuros conectado")
+                    self.connected = True
+                    backoff = 1
+                    # Saldos, filtros e fills que mudaram enquanto o stream estava desconectado
+                    await self._safe_refresh_sizing()
+                    await self._safe_reconcile()
+
+                    while True:
+                        msg = await socket.recv()
+                        if msg:
+                            await self.handle_message(msg)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.connected = False
+                print(f"Erro no user-data stream, reconectando em {backoff}s: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+
+    async def _reconcile_loop(self):
+        while True:
+            await asyncio.sleep(self.reconcile_interval)
+            await self._safe_reconcile()
+
+    async def _safe_reconcile(self):
+        try:
+            await self.reconcile()
+        except Exception as e:
+            print(f"Erro na reconciliação de ordens: {e}")
+
+    async def _safe_refresh_sizing(self):
+        if self.sizing is None:
+            return
+        try:
+            await self.sizing.refresh(self.client)
+        except Exception as e:
+            print(f"Erro ao recarregar filtros e saldos: {e}")
@@ -2,9 +2,11 @@ from binance.client import Client
 from binance.exceptions import BinanceAPIException
 from data.database import DataDB
 from core.config_pair_system_manager import ConfigPairSystemManager
+from operations.position_book import PositionBook
+from operations.sizing import sizing_service
+from core.metrics import instrument_binance_client
 import pandas as pd
 from typing import Optional, Dict, Any
-import math
 from constants.defs import (
     BINANCE_KEY,
     BINANCE_TESTNET_KEY,
@@ -13,13 +15,18 @@ from constants.defs import (
 )
 
 class PairTradeExecutor:
+    # Livro em memória dos pair trades ativos, compartilhado por todas as instâncias
+    position_book = PositionBook("opened_pair_trades")
+    # Filtros de negociação, preços e saldos em memória
+    sizing = sizing_service
+
     def __init__(self):
         """
         Inicializa o TradeExecutor com a API Binance.
         :param binance_client: Instância do cliente da API Binance.
         """
         self.db = DataDB()
-        self.client = Client(api_key=BINANCE_KEY, api_secret=BINANCE_SECRET, tld="com")
+        self.client = instrument_binance_client(Client(api_key=BINANCE_KEY, api_secret=BINANCE_SECRET, tld="com"))
         self.config_pair_system_manager = ConfigPairSystemManager()
     # ------------------
     # MÉTODOS PRINCIPAIS
@@ -117,6 +124,11 @@ class PairTradeExecutor:
         :return: Lista de trades filtrados.
         """
         try:
+            # Trades ativos vêm do livro em memória; os demais filtros consultam o banco
+            if activate is True:
+                self.position_book.ensure_loaded(self.db)
+                return self.position_book.get_active(break_even=break_even)
+
             query = {}
             if activate is not None:
                 query["activate"] = activate
@@ -144,6 +156,8 @@ class PairTradeExecutor:
                 update_values=updates,
                 upsert=upsert
             )
+            if result is not None:
+                self.position_book.apply(opened_pair_trader_id, updates, upsert=upsert)
             
             print(f"Trade aberto {opened_pair_trader_id} atualizado!")
             
@@ -191,41 +205,77 @@ class PairTradeExecutor:
         Atualiza o banco de dados caso uma ordem tenha sido executada e cancela as ordens restantes.
         """
         try:
+            # Os trades são lidos antes das ordens abertas (ver reconcile_orders)
+            active_trades = self.get_reconcile_trades()
             # Obtém todas as ordens abertas na Binance
             open_orders = self.client.futures_get_open_orders()
-            open_order_ids = {order["orderId"] for order in open_orders}
-
-            # Obtém todos os opened_trades ativos do banco
-            active_trades = self.db.query_all("opened_pair_trades", activate=True)
-
-            for trade in active_trades:
-                if trade["symbol"] == symbol:
-                    open_order_id = trade["_id"]
-                    stop_loss_order_id = trade.get("stop_loss_order_id")
-
-                    # Verifica se as ordens SL ainda estão na lista de ordens abertas
-                    sl_active = stop_loss_order_id in open_order_ids
-
-                    if not sl_active:
-                        close_type = "SL"
-
-                        self.cancel_order(trade["symbol"], stop_loss_order_id)
-                        
-                        # Atualiza o banco de dados
-                        self.edit_opened_trades(
-                            opened_pair_trader_id=int(open_order_id),
-                            updates={
-                                "activate": False,
-                                "close_type": close_type,
-                                "stop_loss_order_id": None,
-                                "take_profit_order_id": None,
-                            }
-                        )
-                        print(f"[{symbol}] Trade {open_order_id} atualizado: fechado por {close_type}.")
-                    
+            self.reconcile_orders({order["orderId"] for order in open_orders}, symbol, active_trades)
         except Exception as e:
             print(f"Erro ao verificar e fechar ordens TP/SL: {e}")
 
+    def get_reconcile_trades(self):
+        """Obtém do banco todos os pair trades ativos, para a reconciliação."""
+        return self.db.query_all("opened_pair_trades", limit=0, activate=True)
+
+    def reconcile_orders(self, open_order_ids, symbol=None, active_trades=None):
+        """
+        Fecha os pair trades ativos cujo SL não está mais entre as ordens abertas.
+        Usado na reconciliação periódica via REST; no dia a dia os fechamentos chegam
+        pelo user-data stream (handle_order_update).
+        :param open_order_ids: Conjunto de orderIds abertos na Binance.
+        :param symbol: Restringe a verificação a um símbolo (opcional).
+        :param active_trades: Trades ativos lidos ANTES da consulta das ordens abertas.
+                              Se omitido, são lidos do banco.
+        """
+        if active_trades is None:
+            active_trades = self.get_reconcile_trades()
+
+        for trade in active_trades:
+            if symbol is not None and trade["symbol"] != symbol:
+                continue
+            stop_loss_order_id = trade.get("stop_loss_order_id")
+            if stop_loss_order_id is None:
+                # Trade em abertura: SL ainda não registrado
+                continue
+
+            # Verifica se as ordens SL ainda estão na lista de ordens abertas
+            if stop_loss_order_id not in open_order_ids:
+                self.cancel_order(trade["symbol"], stop_loss_order_id)
+                self.close_trade_by_order(trade, "SL")
+
+    def handle_order_update(self, order):
+        """
+        Processa um evento ORDER_TRADE_UPDATE do user-data stream de futuros.
+        Quando o SL de um pair trade ativo é executado, o trade é fechado.
+        :param order: Campo "o" do evento.
+        :return: True se a ordem pertencia a um pair trade ativo.
+        """
+        if order.get("X") != "FILLED":
+            return False
+
+        self.position_book.ensure_loaded(self.db)
+        if order.get("i") is None:
+            return False
+        for trade in self.position_book.get_active(symbol=order.get("s")):
+            if trade.get("stop_loss_order_id") == order["i"]:
+                self.close_trade_by_order(trade, "SL")
+                return True
+        return False
+
+    def close_trade_by_order(self, trade, close_type):
+        """Registra o fechamento de um pair trade pela execução da ordem de `close_type`."""
+        # Atualiza o banco de dados
+        self.edit_opened_trades(
+            opened_pair_trader_id=int(trade["_id"]),
+            updates={
+                "activate": False,
+                "close_type": close_type,
+                "stop_loss_order_id": None,
+                "take_profit_order_id": None,
+            }
+        )
+        print(f"[{trade['symbol']}] Trade {trade['_id']} atualizado: fechado por {close_type}.")
+
 
 
     def check_trailing_stop_target(self, symbol, current_price):
@@ -234,8 +284,8 @@ class PairTradeExecutor:
         Atualiza o banco de dados caso uma ordem tenha sido executada e cancela as ordens restantes.
         """
         try:
-            # Obtém todos os opened_trades ativos do banco
-            active_trades = self.db.query_all("opened_pair_trades", activate=True)
+            # Obtém todos os opened_trades ativos (livro em memória)
+            active_trades = self.get_opened_trades(activate=True)
 
             for opened_pair_trade in active_trades:
                 if opened_pair_trade["symbol"] == symbol:
@@ -270,8 +320,8 @@ class PairTradeExecutor:
         Atualiza o banco de dados caso uma ordem tenha sido executada e cancela as ordens restantes.
         """
         try:
-            # Obtém todos os opened_trades ativos do banco
-            active_trades = self.db.query_all("opened_pair_trades", activate=True)
+            # Obtém todos os opened_trades ativos (livro em memória)
+            active_trades = self.get_opened_trades(activate=True)
 
             for opened_pair_trade in active_trades:
                 if opened_pair_trade["symbol"] == symbol:
@@ -320,8 +370,10 @@ class PairTradeExecutor:
             }
         )
         
-        # Retorna saldo atual e atualiza available_balance
-        balance = self.get_available_balance()
+        # Saldo do user-data stream (REST apenas se o stream ainda não enviou saldo) e atualiza available_balance
+        balance = self.sizing.balance()
+        if balance is None:
+            balance = self.get_available_balance()
         if balance:
             self.config_pair_system_manager.update_system_available_balance(balance)
             
@@ -488,7 +540,7 @@ class PairTradeExecutor:
                 symbol=symbol,
                 side=side,
                 type="STOP_MARKET",
-                stopPrice=sl_price,
+                stopPrice=self.sizing.round_price(symbol, sl_price),
                 quantity=quantity,
                 positionSide=position_side
             )
@@ -515,7 +567,7 @@ class PairTradeExecutor:
                 symbol=symbol,
                 side=side,
                 type="TAKE_PROFIT_MARKET",
-                stopPrice=tp_price,
+                stopPrice=self.sizing.round_price(symbol, tp_price),
                 quantity=quantity,
                 positionSide=position_side
             )
@@ -556,25 +608,22 @@ class PairTradeExecutor:
 
     def get_quantity(self, symbol):
         """
-        Obtém a quantidade configurada para um símbolo específico do banco de dados.
+        Calcula a quantidade a negociar com base no saldo da carteira (user-data stream) e no último
+        preço do stream, arredondada no stepSize do símbolo.
         :param symbol: Ativo (ex: 'ADAUSDT').
-        :return: Quantidade configurada para o símbolo.
+        :return: (quantidade, saldo considerado).
         """
         try:
-            config_pair_system = self.db.query_single("config_pair_system")
-            balance = (config_pair_system['available_balance']-5)
+            config_pair_system = self.config_pair_system_manager.get_system_config()
+            balance = self.sizing.balance()
+            if balance is None:
+                # Stream de usuário ainda sem saldo: usa o último saldo salvo na configuração
+                balance = config_pair_system['available_balance']
+            balance = balance - 5
             percentage_of_total = config_pair_system['percentage_of_total']
             quantity_in_dolar = balance / percentage_of_total
-            
-            price_data = self.client.get_symbol_ticker(symbol=symbol)
-            current_price = float(price_data['price'])
-        
-            quantity = math.floor(quantity_in_dolar / current_price)
-            
-            if quantity:
-                return quantity, balance
-            else:
-                raise ValueError(f"Configuração de quantidade não encontrada para {symbol}.")
+
+            return self.sizing.order_quantity(self.client, symbol, quantity_in_dolar), balance
         except Exception as e:
             print(f"Erro ao obter quantidade para {symbol}: {e}")
             return None
@@ -0,0 +1,111 @@
+import threading
+from collections import defaultdict
+
+
+class PositionBook:
+    def __init__(self, collection="opened_trades"):
+        """
+        Livro em memória dos trades abertos ativos, indexado por id e por símbolo.
+        O MongoDB continua sendo o armazenamento durável: o livro é carregado uma vez
+        e mantido em sincronia a cada escrita (write-through) feita pelo executor.
+        :param collection: Coleção de onde os trades ativos são carregados.
+        """
+        self.collection = collection
+        self.trades = {}  # str(_id) -> trade
+        self.by_symbol = defaultdict(dict)  # símbolo -> {str(_id): trade}
+        self.loaded = False
+        self.versions = defaultdict(int)  # símbolo -> contador de alterações
+        self.generation = 0  # incrementado a cada recarga completa
+        self._lock = threading.RLock()
+
+    def load(self, db):
+        """
+        Carrega os trades ativos do banco, substituindo o conteúdo atual.
+        :param db: Instância de DataDB.
+        """
+        trades = db.query_all(self.collection, limit=0, activate=True) or []
+        with self._lock:
+            self.trades.clear()
+            self.by_symbol.clear()
+            self.generation += 1
+            for trade in trades:
+                self._index(trade)
+            self.loaded = True
+
+    def ensure_loaded(self, db):
+        """Carrega o livro na primeira utilização."""
+        if not self.loaded:
+            self.load(db)
+
+    def apply(self, trade_id, updates, upsert=False):
+        """
+        Aplica no livro a mesma escrita feita no banco.
+        Trades desativados (activate=False) saem do livro.
+        :param trade_id: _id do trade.
+        :param updates: Campos atualizados.
+        :param upsert: Se True, cria o trade caso ele não exista no livro.
+        """
+        if "$set" in updates:
+            updates = updates["$set"]
+
+        key = str(trade_id)
+        with self._lock:
+            trade = self.trades.get(key)
+            if trade is None:
+                if not upsert:
+                    return
+                trade = {"_id": trade_id}
+
+            self._discard(key)
+            trade.update(updates)
+            if trade.get("activate", False):
+                self._index(trade)
+
+    def get(self, trade_id):
+        """Retorna uma cópia do trade ativo ou None."""
+        with self._lock:
+            trade = self.trades.get(str(trade_id))
+            return dict(trade) if trade else None
+
+    def get_active(self, symbol=None, break_even=None):
+        """
+        Retorna cópias dos trades ativos.
+        :param symbol: Filtra por símbolo (opcional).
+        :param break_even: Filtra pelo estado da parcial (opcional).
+        """
+        with self._lock:
+            trades = self.by_symbol.get(symbol, {}).values() if symbol else self.trades.values()
+            return [
+                dict(trade) for trade in trades
+                if break_even is None or trade.get("break_even", False) == break_even
+            ]
+
+    def version(self, symbol):
+        """Identifica o estado atual dos trades de um símbolo (muda a cada escrita)."""
+        with self._lock:
+            return self.generation, self.versions[symbol]
+
+    def symbols(self):
+        """Símbolos com ao menos um trade ativo."""
+        with self._lock:
+            return list(self.by_symbol)
+
+    def _index(self, trade):
+        key = str(trade["_id"])
+        self.trades[key] = trade
+        self.by_symbol[trade.get("symbol")][key] = trade
+        self.versions[trade.get("symbol")] += 1
+
+    def _discard(self, key):
+        trade = self.trades.pop(key, None)
+        if trade is None:
+            return
+        self.versions[trade.get("symbol")] += 1
+        symbol_trades = self.by_symbol.get(trade.get("symbol"))
+        if symbol_trades is not None:
+            symbol_trades.pop(key, None)
+            if not symbol_trades:
+                del self.by_symbol[trade.get("symbol")]
+
+    def __len__(self):
+        return len(self.trades)
@@ -0,0 +1,137 @@
+import math
+import time
+from decimal import Decimal, ROUND_DOWN, ROUND_HALF_UP
+
+
+class SizingService:
+    def __init__(self, max_price_age=60):
+        """
+        Dimensionamento de posições em memória: filtros de negociação do exchangeInfo de futuros
+        (LOT_SIZE, MIN_NOTIONAL, PRICE_FILTER), último preço recebido no stream de klines e saldo
+        da carteira recebido no user-data stream.
+        :param max_price_age: Idade máxima (segundos) do preço do stream para ser usado.
+        """
+        self.max_price_age = max_price_age
+        self.filters = {}  # símbolo -> {"step_size", "min_qty", "min_notional", "tick_size"} (Decimal)
+        self.prices = {}  # símbolo -> (preço, horário de recebimento)
+        self.balances = {}  # ativo -> saldo da carteira (walletBalance)
+
+    # ------------------
+    # ATUALIZAÇÃO
+    # ------------------
+
+    def load_exchange_info(self, exchange_info):
+        """Extrai os filtros de cada símbolo da resposta de futures_exchange_info."""
+        for symbol_info in exchange_info.get("symbols", []):
+            filters = {item["filterType"]: item for item in symbol_info.get("filters", [])}
+            lot_size = filters.get("LOT_SIZE", {})
+            self.filters[symbol_info["symbol"]] = {
+                "step_size": Decimal(lot_size.get("stepSize", "1")),
+                "min_qty": Decimal(lot_size.get("minQty", "0")),
+                "min_notional": Decimal(filters.get("MIN_NOTIONAL", {}).get("notional", "0")),
+                "tick_size": Decimal(filters.get("PRICE_FILTER", {}).get("tickSize", "0")),
+            }
+
+    def load_account(self, account_info):
+        """Atualiza os saldos a partir da resposta de futures_account."""
+        for asset in account_info.get("assets", []):
+            self.update_balance(asset["asset"], asset["walletBalance"])
+
+    async def refresh(self, client):
+        """
+        Recarrega filtros e saldos via REST (na inicialização e a cada reconexão do user-data stream).
+        :param client: AsyncClient autenticado.
+        """
+        self.load_exchange_info(await client.futures_exchange_info())
+        self.load_account(await client.futures_account())
+
+    def ensure_filters(self, client):
+        """Carrega os filtros com o cliente síncrono caso ainda não tenham sido carregados."""
+        if not self.filters:
+            self.load_exchange_info(client.futures_exchange_info())
+
+    def update_price(self, symbol, price):
+        """Registra o último preço de um símbolo (chamado a cada kline do stream)."""
+        self.prices[symbol.upper()] = (float(price), time.monotonic())
+
+    def update_balance(self, asset, balance):
+        """Registra o saldo da carteira de um ativo (ACCOUNT_UPDATE do user-data stream)."""
+        self.balances[asset] = float(balance)
+
+    # ------------------
+    # CONSULTA
+    # ------------------
+
+    def price(self, symbol):
+        """Último preço do stream, ou None se o símbolo não tiver preço recente."""
+        last = self.prices.get(symbol.upper())
+        if last is None or time.monotonic() - last[1] > self.max_price_age:
+            return None
+        return last[0]
+
+    def balance(self, asset="USDT"):
+        """Saldo da carteira do ativo, ou None se ainda não recebido."""
+        return self.balances.get(asset)
+
+    def round_quantity(self, symbol, quantity):
+        """
+        Arredonda a quantidade para baixo no stepSize do símbolo.
+        Sem filtros carregados, arredonda para baixo no inteiro.
+        """
+        filters = self.filters.get(symbol)
+        if filters is None or not filters["step_size"]:
+            return float(math.floor(quantity))
+        step = filters["step_size"]
+        return float((Decimal(str(quantity)) / step).to_integral_value(ROUND_DOWN) * step)
+
+    def round_price(self, symbol, price):
+        """Arredonda o preço para o tickSize do símbolo (inalterado sem filtros carregados)."""
+        filters = self.filters.get(symbol)
+        if filters is None or not filters["tick_size"]:
+            return price
+        tick = filters["tick_size"]
+        return float((Decimal(str(price)) / tick).to_integral_value(ROUND_HALF_UP) * tick)
+
+    def quantity(self, symbol, notional, price):
+        """
+        Quantidade para um valor em dólar, respeitando stepSize, minQty e o notional mínimo.
+        :param notional: Valor da posição em dólar.
+        :param price: Preço de referência.
+        :raises ValueError: Se a quantidade resultante for menor que o mínimo do símbolo.
+        """
+        quantity = self.round_quantity(symbol, notional / price)
+        filters = self.filters.get(symbol)
+        if not quantity or (filters and (
+            Decimal(str(quantity)) < filters["min_qty"]
+            or Decimal(str(quantity)) * Decimal(str(price)) < filters["min_notional"]
+        )):
+            raise ValueError(f"Quantidade {quantity} abaixo do mínimo negociável para {symbol}.")
+        return quantity
+
+    def order_quantity(self, client, symbol, notional):
+        """
+        Quantidade de uma ordem a mercado: garante os filtros carregados, usa o último preço do stream
+        (ou o ticker REST se o símbolo não tiver kline recente) e aplica os filtros do símbolo.
+        :param client: Client síncrono, usado só quando faltam filtros ou preço.
+        :param symbol: Ativo (ex: 'ADAUSDT').
+        :param notional: Valor da posição em dólar.
+        :raises ValueError: Se a quantidade resultante for menor que o mínimo do símbolo.
+        """
+        self.ensure_filters(client)
+        current_price = self.price(symbol)
+        if current_price is None:
+            # Símbolo sem kline recente no stream
+            current_price = float(client.get_symbol_ticker(symbol=symbol)['price'])
+        return self.quantity(symbol, notional, current_price)
+
+    def stats(self):
+        """Tamanho dos caches de filtros, preços e saldos."""
+        return {
+            "symbols_with_filters": len(self.filters),
+            "symbols_with_price": len(self.prices),
+            "balances": dict(self.balances),
+        }
+
+
+# Instância única do processo, alimentada pelos streams de klines e de usuário
+sizing_service = SizingService()
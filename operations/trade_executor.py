@@ -1,6 +1,11 @@
 from binance.client import Client
 from binance.exceptions import BinanceAPIException
 from data.database import DataDB
+from operations.position_book import PositionBook
+from operations.trigger_index import TriggerIndex
+from operations.sizing import sizing_service
+from core.metrics import instrument_binance_client
+from core.config_system_manager import ConfigSystemManager
 import pandas as pd
 from typing import Optional, Dict, Any
 from binance.client import Client
@@ -12,13 +17,20 @@ from constants.defs import (
 )
 
 class TradeExecutor:
+    # Livro de posições compartilhado por todas as instâncias do processo
+    position_book = PositionBook("opened_trades")
+    trigger_index = TriggerIndex(position_book)
+    # Filtros de negociação, preços e saldos em memória
+    sizing = sizing_service
+
     def __init__(self):
         """
         Inicializa o TradeExecutor com a API Binance.
         :param binance_client: Instância do cliente da API Binance.
         """
         self.db = DataDB()
-        self.client = Client(api_key=BINANCE_KEY, api_secret=BINANCE_SECRET, tld="com")
+        self.config_system_manager = ConfigSystemManager()
+        self.client = instrument_binance_client(Client(api_key=BINANCE_KEY, api_secret=BINANCE_SECRET, tld="com"))
         
     # ------------------
     # MÉTODOS PRINCIPAIS
@@ -56,36 +68,8 @@ class TradeExecutor:
                 print("Erro ao abrir a posição. Operação abortada.")
                 return None
             
-            # Salva a ordem no banco
-            self.log_order(order)
-
-            entry_price = float(signal['Close'])
-            
-            # Calcula SL e TP
-            sl_price = self.calculate_stop_loss(entry_price, trade_params, position_side)
-            tp_price = self.calculate_take_profit(entry_price, trade_params, position_side)
-            
-            # Salva os detalhes iniciais do trade (criação ou atualização)
-            self.edit_opened_trades(
-                opened_trade_id=order["orderId"],
-                updates={
-                    "trade_id": trade_params["trade_id"],
-                    "entry_price": entry_price,
-                    "symbol": symbol,
-                    "position_side": position_side,
-                    "quantity": quantity,
-                    "remaining_quantity": quantity,
-                    "stop_loss_order_id": None,  # Atualizado posteriormente
-                    "take_profit_order_id": None,  # Atualizado posteriormente
-                    "activate": True,
-                    "close_type": None,
-                    "take_profit": tp_price,
-                    "stop_loss": sl_price,
-                    "break_even": False,
-                    "timestamp": pd.Timestamp.now(),
-                },
-                upsert=True
-            )
+            # Salva a ordem e os detalhes iniciais do trade no banco
+            sl_price, tp_price = self.record_opened_trade(order, trade_params, signal, position_side, quantity)
 
             # # Define Stop Loss e atualiza no banco
             # if sl_price:
@@ -110,14 +94,20 @@ class TradeExecutor:
             print(f"Erro ao executar trade: {e}")
             return None
     
-    def get_opened_trades(self, activate: Optional[bool] = None, break_even: Optional[bool] = None):
+    def get_opened_trades(self, activate: Optional[bool] = None, break_even: Optional[bool] = None, symbol: Optional[str] = None):
         """
         Retorna trades abertos da coleção `opened_trades` com base nos filtros fornecidos.
+        Trades ativos são servidos pelo livro de posições em memória.
         :param activate: True para trades ativos, False para inativos.
         :param break_even: True para trades com parcial ativada, False para sem parcial.
+        :param symbol: Filtra por símbolo (apenas para trades ativos).
         :return: Lista de trades filtrados.
         """
         try:
+            if activate:
+                self.position_book.ensure_loaded(self.db)
+                return self.position_book.get_active(symbol=symbol, break_even=break_even)
+
             query = {}
             if activate is not None:
                 query["activate"] = activate
@@ -130,6 +120,23 @@ class TradeExecutor:
             print(f"Erro ao buscar opened_trades: {e}")
             return []
     
+    def get_triggered_trades(self, symbol: str, current_price: float):
+        """
+        Retorna os trades ativos do símbolo cujos níveis de TP, SL ou Break Even
+        foram cruzados pelo preço atual.
+        :param symbol: Ativo (ex: 'BTCUSDT').
+        :param current_price: Preço atual do mercado.
+        """
+        try:
+            self.position_book.ensure_loaded(self.db)
+            breakeven_threshold = self.config_system_manager.get_system_config().get("breakeven_profit_threshold", 0)
+            trade_ids = self.trigger_index.crossed(symbol, current_price, breakeven_threshold)
+            trades = (self.position_book.get(trade_id) for trade_id in trade_ids)
+            return [trade for trade in trades if trade]
+        except Exception as e:
+            print(f"Erro ao buscar trades disparados para {symbol}: {e}")
+            return []
+
     def edit_opened_trades(self, opened_trade_id: int, updates: Dict[str, Any], upsert: bool = False):
         """
         Edita ou cria um trade específico na coleção `opened_trades`.
@@ -145,6 +152,8 @@ class TradeExecutor:
                 update_values=updates,
                 upsert=upsert
             )
+            if result is not None:
+                self.position_book.apply(opened_trade_id, updates, upsert=upsert)
             
             print(f"Trade aberto {opened_trade_id} atualizado!")
             
@@ -191,47 +200,91 @@ class TradeExecutor:
         Atualiza o banco de dados caso uma ordem tenha sido executada e cancela as ordens restantes.
         """
         try:
+            # Os trades são lidos antes das ordens abertas (ver reconcile_orders)
+            active_trades = self.get_reconcile_trades()
             # Obtém todas as ordens abertas na Binance
             open_orders = self.client.futures_get_open_orders()
-            open_order_ids = {order["orderId"] for order in open_orders}
-
-            # Obtém todos os opened_trades ativos do banco
-            active_trades = self.db.query_all("opened_trades", activate=True)
-
-            for trade in active_trades:
-                open_order_id = trade["_id"]
-                take_profit_order_id = trade.get("take_profit_order_id")
-                stop_loss_order_id = trade.get("stop_loss_order_id")
-
-                # Verifica se as ordens TP e SL ainda estão na lista de ordens abertas
-                tp_active = take_profit_order_id in open_order_ids
-                sl_active = stop_loss_order_id in open_order_ids
-
-                # Determina o motivo do fechamento
-                if not tp_active or not sl_active:
-                    close_type = "TP" if not tp_active else "SL"
-
-                    # Cancela a ordem restante
-                    if close_type == "TP" and sl_active:
-                        self.cancel_order(trade["symbol"], stop_loss_order_id)
-                    elif close_type == "SL" and tp_active:
-                        self.cancel_order(trade["symbol"], take_profit_order_id)
-
-                    # Atualiza o banco de dados
-                    self.edit_opened_trades(
-                        opened_trade_id=open_order_id,
-                        updates={
-                            "activate": False,
-                            "close_type": close_type,
-                            "stop_loss_order_id": None,
-                            "take_profit_order_id": None,
-                        }
-                    )
-                    print(f"Trade {open_order_id} atualizado: fechado por {close_type}.")
-
+            self.reconcile_orders({order["orderId"] for order in open_orders}, active_trades)
         except Exception as e:
             print(f"Erro ao verificar e fechar ordens TP/SL: {e}")
 
+    def get_reconcile_trades(self):
+        """Obtém do banco todos os opened_trades ativos, para a reconciliação."""
+        return self.db.query_all("opened_trades", limit=0, activate=True)
+
+    def reconcile_orders(self, open_order_ids, active_trades=None):
+        """
+        Fecha os opened_trades ativos cujo TP ou SL não está mais entre as ordens abertas.
+        Usado na reconciliação periódica via REST; no dia a dia os fechamentos chegam
+        pelo user-data stream (handle_order_update).
+        :param open_order_ids: Conjunto de orderIds abertos na Binance.
+        :param active_trades: Trades ativos lidos ANTES da consulta das ordens abertas; um trade
+                              aberto depois da consulta teria suas ordens ausentes do conjunto.
+                              Se omitido, são lidos do banco.
+        """
+        if active_trades is None:
+            active_trades = self.get_reconcile_trades()
+
+        for trade in active_trades:
+            take_profit_order_id = trade.get("take_profit_order_id")
+            stop_loss_order_id = trade.get("stop_loss_order_id")
+            if take_profit_order_id is None or stop_loss_order_id is None:
+                # Trade em abertura: TP/SL ainda não registrados
+                continue
+
+            # Verifica se as ordens TP e SL ainda estão na lista de ordens abertas
+            tp_active = take_profit_order_id in open_order_ids
+            sl_active = stop_loss_order_id in open_order_ids
+
+            # Determina o motivo do fechamento e cancela a ordem restante
+            if not tp_active:
+                self.close_trade_by_order(trade, "TP", stop_loss_order_id if sl_active else None)
+            elif not sl_active:
+                self.close_trade_by_order(trade, "SL", take_profit_order_id)
+
+    def handle_order_update(self, order):
+        """
+        Processa um evento ORDER_TRADE_UPDATE do user-data stream de futuros.
+        Quando o TP ou o SL de um trade ativo é executado, o trade é fechado e a ordem restante cancelada.
+        :param order: Campo "o" do evento.
+        :return: True se a ordem pertencia a um trade ativo.
+        """
+        if order.get("X") != "FILLED":
+            return False
+
+        self.position_book.ensure_loaded(self.db)
+        if order.get("i") is None:
+            return False
+        for trade in self.position_book.get_active(symbol=order.get("s")):
+            if trade.get("take_profit_order_id") == order["i"]:
+                self.close_trade_by_order(trade, "TP", trade.get("stop_loss_order_id"))
+                return True
+            if trade.get("stop_loss_order_id") == order["i"]:
+                self.close_trade_by_order(trade, "SL", trade.get("take_profit_order_id"))
+                return True
+        return False
+
+    def close_trade_by_order(self, trade, close_type, remaining_order_id=None):
+        """
+        Registra o fechamento de um trade pela execução do TP ou do SL.
+        :param close_type: 'TP' ou 'SL'.
+        :param remaining_order_id: Ordem ainda aberta a cancelar (opcional).
+        """
+        if remaining_order_id is not None:
+            self.cancel_order(trade["symbol"], remaining_order_id)
+
+        # Atualiza o banco de dados
+        self.edit_opened_trades(
+            opened_trade_id=trade["_id"],
+            updates={
+                "activate": False,
+                "close_type": close_type,
+                "stop_loss_order_id": None,
+                "take_profit_order_id": None,
+            }
+        )
+        print(f"Trade {trade['_id']} atualizado: fechado por {close_type}.")
+
             
     # ------------------
     # CÁLCULOS
@@ -297,7 +350,7 @@ class TradeExecutor:
                 symbol=symbol,
                 side=side,
                 type="STOP_MARKET",
-                stopPrice=sl_price,
+                stopPrice=self.sizing.round_price(symbol, sl_price),
                 quantity=quantity,
                 positionSide=position_side
             )
@@ -324,7 +377,7 @@ class TradeExecutor:
                 symbol=symbol,
                 side=side,
                 type="TAKE_PROFIT_MARKET",
-                stopPrice=tp_price,
+                stopPrice=self.sizing.round_price(symbol, tp_price),
                 quantity=quantity,
                 positionSide=position_side
             )
@@ -340,28 +393,66 @@ class TradeExecutor:
     # MÉTODOS AUXILIARES
     # ------------------
 
+    def record_opened_trade(self, order, trade_params, signal, position_side, quantity):
+        """
+        Salva a ordem de abertura e os detalhes iniciais do trade.
+        :param order: Ordem MARKET retornada pela Binance.
+        :param trade_params: Parâmetros da operação.
+        :param signal: Dados do sinal que disparou a operação.
+        :param position_side: 'LONG' ou 'SHORT'.
+        :param quantity: Quantidade aberta.
+        :return: (preço de Stop Loss, preço de Take Profit).
+        """
+        self.log_order(order)
+
+        # Salva os detalhes iniciais do trade (criação ou atualização)
+        updates, sl_price, tp_price = self.build_opened_trade(trade_params, signal, position_side, quantity)
+        self.edit_opened_trades(opened_trade_id=order["orderId"], updates=updates, upsert=True)
+        return sl_price, tp_price
+
+    def build_opened_trade(self, trade_params, signal, position_side, quantity):
+        """
+        Monta o documento inicial de um trade aberto (usado pelos fluxos síncrono e assíncrono).
+        :return: (campos do opened_trade, preço de Stop Loss, preço de Take Profit).
+        """
+        entry_price = float(signal['Close'])
+
+        # Calcula SL e TP
+        sl_price = self.calculate_stop_loss(entry_price, trade_params, position_side)
+        tp_price = self.calculate_take_profit(entry_price, trade_params, position_side)
+
+        updates = {
+            "trade_id": trade_params["trade_id"],
+            "entry_price": entry_price,
+            "symbol": trade_params["symbol"],
+            "position_side": position_side,
+            "quantity": quantity,
+            "remaining_quantity": quantity,
+            "stop_loss_order_id": None,  # Atualizado posteriormente
+            "take_profit_order_id": None,  # Atualizado posteriormente
+            "activate": True,
+            "close_type": None,
+            "take_profit": tp_price,
+            "stop_loss": sl_price,
+            "break_even": False,
+            "timestamp": pd.Timestamp.now(),
+        }
+        return updates, sl_price, tp_price
+
     def get_quantity(self, symbol):
         """
-        Obtém a quantidade configurada para um símbolo específico do banco de dados.
+        Calcula a quantidade a negociar com base na configuração do sistema e no último preço do stream,
+        arredondada no stepSize do símbolo.
         :param symbol: Ativo (ex: 'ADAUSDT').
-        :return: Quantidade configurada para o símbolo.
+        :return: Quantidade a negociar.
         """
         try:
-            config_system = self.db.query_single("config_system")
+            config_system = self.config_system_manager.get_system_config()
             balance = config_system['total_earnings']
             percentage_of_total = config_system['percentage_of_total']
             quantity_in_dolar = balance / percentage_of_total
-            
-            price_data = self.client.get_symbol_ticker(symbol=symbol)
-            current_price = float(price_data['price'])
-        
-            quantity = round(quantity_in_dolar / current_price,0)
-            
-            # config_asset = self.db.query_single("config_assets", symbol=symbol)
-            if quantity:
-                return quantity
-            else:
-                raise ValueError(f"Configuração de quantidade não encontrada para {symbol}.")
+
+            return self.sizing.order_quantity(self.client, symbol, quantity_in_dolar)
         except Exception as e:
             print(f"Erro ao obter quantidade para {symbol}: {e}")
             return None
@@ -419,7 +510,7 @@ class TradeExecutor:
 
             entry_price = opened_trade["entry_price"]
             position_side = opened_trade["position_side"]
-            breakeven_threshold = self.db.query_single("config_system").get("breakeven_profit_threshold", 0)
+            breakeven_threshold = self.config_system_manager.get_system_config().get("breakeven_profit_threshold", 0)
 
             # Calcula o lucro percentual
             profit_percent = self.calculate_profit_percent(entry_price, current_price, position_side)
@@ -454,7 +545,7 @@ class TradeExecutor:
             symbol = opened_trade["symbol"]
             position_side = opened_trade["position_side"]
             total_quantity = opened_trade["quantity"]
-            partial_quantity = round(total_quantity * (percentage / 100),0)
+            partial_quantity = self.sizing.round_quantity(symbol, total_quantity * (percentage / 100))
 
             # Fecha a posição parcial
             side = "SELL" if position_side == "LONG" else "BUY"
@@ -529,8 +620,8 @@ class TradeExecutor:
         :param opened_trade: Trade aberto ativo.
         """
         try:
-            # Recupera os detalhes do trade
-            opened_trade = self.db.query_single("opened_trades", _id=opened_trade['_id'])
+            # Recupera o estado atual do trade (pode ter mudado após a parcial)
+            opened_trade = self.position_book.get(opened_trade['_id'])
             if not opened_trade or not opened_trade.get("activate", False):
                 print(f"Trade aberto {opened_trade['_id']} não está ativo.")
                 return
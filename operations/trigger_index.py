@@ -0,0 +1,57 @@
+from bisect import bisect_left, bisect_right
+
+
+class TriggerIndex:
+    def __init__(self, position_book):
+        """
+        Índice ordenado de níveis de disparo (TP, SL e Break Even) por símbolo.
+        Para um preço, retorna apenas os trades cujos níveis foram cruzados,
+        em O(log n + k) via busca binária.
+        :param position_book: PositionBook com os trades ativos.
+        """
+        self.position_book = position_book
+        self.levels = {}  # símbolo -> (versão, níveis_acima, ids_acima, níveis_abaixo, ids_abaixo)
+
+    def crossed(self, symbol, price, breakeven_threshold=0):
+        """
+        Retorna os ids dos trades do símbolo com algum nível cruzado pelo preço.
+        :param symbol: Ativo (ex: 'BTCUSDT').
+        :param price: Preço atual.
+        :param breakeven_threshold: Lucro (fração) que ativa o Break Even.
+        """
+        version = (self.position_book.version(symbol), breakeven_threshold)
+        entry = self.levels.get(symbol)
+        if entry is None or entry[0] != version:
+            entry = self.levels[symbol] = (version, *self._build(symbol, breakeven_threshold))
+        _, up_levels, up_ids, down_levels, down_ids = entry
+
+        # Níveis de alta disparam com preço >= nível; níveis de baixa com preço <= nível
+        triggered = set(up_ids[:bisect_right(up_levels, price)])
+        triggered.update(down_ids[bisect_left(down_levels, price):])
+        return triggered
+
+    def _build(self, symbol, breakeven_threshold):
+        up, down = [], []
+        for trade in self.position_book.get_active(symbol=symbol):
+            trade_id = str(trade["_id"])
+            entry_price = trade.get("entry_price")
+            take_profit = trade.get("take_profit")
+            stop_loss = trade.get("stop_loss")
+            if trade.get("position_side") == "LONG":
+                if take_profit:
+                    up.append((take_profit, trade_id))
+                if stop_loss:
+                    down.append((stop_loss, trade_id))
+                if entry_price and not trade.get("break_even", False):
+                    up.append((entry_price * (1 + breakeven_threshold), trade_id))
+            else:
+                if take_profit:
+                    down.append((take_profit, trade_id))
+                if stop_loss:
+                    up.append((stop_loss, trade_id))
+                if entry_price and not trade.get("break_even", False):
+                    down.append((entry_price * (1 - breakeven_threshold), trade_id))
+
+        up.sort()
+        down.sort()
+        return [level for level, _ in up], [i for _, i in up], [level for level, _ in down], [i for _, i in down]
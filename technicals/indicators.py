@@ -74,19 +74,25 @@ def EMALong(df: pd.DataFrame, window: 50):
     return df
 
 
-# Função para calcular a variação percentual acumulada
-def calculate_percent_change(close_prices, window):
-    percent_change = np.zeros(len(close_prices))
+def _percent_changes(close_prices):
+    """Variação percentual entre pontos consecutivos (posição 0 igual a zero)."""
+    close_prices = np.asarray(close_prices, dtype=float)
+    changes = np.zeros(len(close_prices))
+    if len(close_prices) > 1:
+        changes[1:] = (close_prices[1:] - close_prices[:-1]) / close_prices[:-1] * 100
+    return changes
 
-    for i in range(window, len(close_prices)):
-        window_sum = 0.0
-        for j in range(i - window + 1, i + 1):
-            percent_change[j] = (
-                (close_prices[j] - close_prices[j - 1]) / close_prices[j - 1] * 100
-            )
-            window_sum += percent_change[j]
-        percent_change[i] = window_sum
 
+# Função para calcular a variação percentual acumulada
+def calculate_percent_change(close_prices, window):
+    # Mantém o resultado da versão original em loop: variações individuais
+    # nas posições 1..n-2 e a soma da última janela na última posição.
+    n = len(close_prices)
+    if n <= window:
+        return np.zeros(n)
+
+    percent_change = _percent_changes(close_prices)
+    percent_change[-1] = percent_change[n - window:].sum()
     return percent_change
 
 
@@ -97,28 +103,49 @@ def calculate_ema(values, period):
     ema[period - 1] = values[
         period - 1
     ]  # O primeiro valor da EMA é igual ao valor inicial
-    for i in range(period, len(values)):
-        ema[i] = (values[i] - ema[i - 1]) * multiplier + ema[i - 1]
+    tail = np.asarray(values[period - 1:], dtype=float)
+    if np.isnan(tail).any():
+        # NaN se propaga pela recursão; o ewm do pandas o ignoraria
+        for i in range(period, len(values)):
+            ema[i] = (values[i] - ema[i - 1]) * multiplier + ema[i - 1]
+        return ema
+
+    # Mesma recursão do laço, executada pelo ewm(adjust=False) do pandas
+    ema[period - 1:] = pd.Series(tail).ewm(alpha=multiplier, adjust=False).mean().values
     return ema
 
 
 
 # Função para calcular a variação percentual acumulada com uma janela deslizante correta
 def PAV(close_prices, window):
+    # Soma móvel das variações percentuais via soma acumulada: O(n) em vez de O(n·window)
     percent_change = np.zeros(len(close_prices))
+    if len(close_prices) <= window:
+        return percent_change
 
-    for i in range(window, len(close_prices)):
-        window_sum = 0.0
-        for j in range(i - window + 1, i + 1):
-            # Calcula a variação percentual entre o ponto atual e o ponto anterior
-            change = (close_prices[j] - close_prices[j - 1]) / close_prices[j - 1] * 100
-            window_sum += change
-        # Atribui o valor acumulado da janela atual ao ponto final da janela
-        percent_change[i] = window_sum
-
+    cumulative = np.cumsum(_percent_changes(close_prices))
+    percent_change[window:] = cumulative[window:] - cumulative[:-window]
     return percent_change
 
 
+def PAV_multi(close_prices, windows=(10, 50, 150, 200)):
+    """
+    Calcula o PAV de várias janelas em uma única passada sobre as variações percentuais.
+    :param close_prices: Série de preços.
+    :param windows: Janelas desejadas.
+    :return: Dicionário {janela: array com o PAV}.
+    """
+    n = len(close_prices)
+    cumulative = np.cumsum(_percent_changes(close_prices))
+    result = {}
+    for window in windows:
+        percent_change = np.zeros(n)
+        if n > window:
+            percent_change[window:] = cumulative[window:] - cumulative[:-window]
+        result[window] = percent_change
+    return result
+
+
 # Função para calcular os indicadores e adicionar ao DataFrame
 def EMAPER(df: pd.DataFrame, window=14, ema_period_1=10):
 
@@ -0,0 +1,316 @@
+from collections import deque
+import numpy as np
+
+# Versões incrementais (O(1) por candle) dos indicadores de technicals/indicators.py.
+# Cada classe reproduz exatamente a semântica da função em lote correspondente
+# quando alimentada, candle a candle, com a mesma série.
+
+
+class EWMStream:
+    def __init__(self, span, min_periods=0):
+        """
+        Equivalente incremental de `Series.ewm(span=span, min_periods=min_periods).mean()`
+        (adjust=True), usado por EMAShort/EMALong.
+        """
+        self.decay = 1 - 2 / (span + 1)
+        self.min_periods = min_periods
+        self.count = 0
+        self._numerator = 0.0
+        self._denominator = 0.0
+
+    def update(self, value):
+        """Adiciona um valor e retorna a média exponencial (NaN antes de min_periods)."""
+        self._numerator = value + self.decay * self._numerator
+        self._denominator = 1 + self.decay * self._denominator
+        self.count += 1
+        if self.count < self.min_periods:
+            return np.nan
+        return self._numerator / self._denominator
+
+
+class EMAStream:
+    def __init__(self, period):
+        """
+        Equivalente incremental de `calculate_ema(values, period)`:
+        zero até period-1, semente igual ao valor em period-1 e recursão padrão depois.
+        """
+        self.period = period
+        self.multiplier = 2 / (period + 1)
+        self.count = 0
+        self.value = 0.0
+
+    def update(self, value):
+        """Adiciona um valor e retorna a EMA correspondente."""
+        self.count += 1
+        if self.count == self.period:
+            self.value = value
+        elif self.count > self.period:
+            self.value = (value - self.value) * self.multiplier + self.value
+        return self.value
+
+
+class PAVStream:
+    def __init__(self, window):
+        """
+        Equivalente incremental de `PAV(close_prices, window)`: soma das variações
+        percentuais dos últimos `window` pontos, zero enquanto i < window.
+        """
+        self.window = window
+        self.count = 0
+        self.previous = None
+        self.changes = deque(maxlen=window)
+        self._sum = 0.0
+        self._since_resum = 0
+
+    def update(self, value):
+        """Adiciona um preço e retorna a variação percentual acumulada da janela."""
+        if self.previous is not None:
+            change = (value - self.previous) / self.previous * 100
+            if len(self.changes) == self.window:
+                self._sum -= self.changes[0]
+            self.changes.append(change)
+            self._sum += change
+
+            # Recalcula a soma periodicamente para não acumular erro de arredondamento
+            self._since_resum += 1
+            if self._since_resum >= self.window:
+                self._sum = sum(self.changes)
+                self._since_resum = 0
+
+        self.previous = value
+        self.count += 1
+        if self.count <= self.window:
+            return 0.0
+        return self._sum
+
+
+class EMAPERStream:
+    WINDOWS = (10, 50, 150, 200)
+
+    def __init__(self, ema_s, ema_percent_period=10):
+        """
+        Pilha de indicadores do LongShortTrader que depende apenas do fechamento e de `ema_s`:
+        EMA_short, Percent_Change_{10,50,150,200}, EMA_percent_s_{...} e Average_EMA_percent.
+        :param ema_s: Período da EMA curta aplicada ao fechamento.
+        :param ema_percent_period: Período da EMA aplicada a cada PAV.
+        """
+        self.ema_s = ema_s
+        self.ema_short = EWMStream(ema_s, min_periods=ema_s)
+        self.pav = {window: PAVStream(window) for window in self.WINDOWS}
+        self.ema_percent = {window: EMAStream(ema_percent_period) for window in self.WINDOWS}
+
+    def update(self, close):
+        """
+        Processa um novo fechamento.
+        :return: Dicionário com os indicadores ou None enquanto EMA_short não está disponível
+                 (linhas que o caminho em lote remove com dropna).
+        """
+        ema_short = self.ema_short.update(close)
+        if np.isnan(ema_short):
+            return None
+
+        row = {"EMA_short": ema_short}
+        ema_percent_values = []
+        for window in self.WINDOWS:
+            percent_change = self.pav[window].update(ema_short)
+            ema_percent = self.ema_percent[window].update(percent_change)
+            row[f"Percent_Change_{window}"] = percent_change
+            row[f"EMA_percent_s_{window}"] = ema_percent
+            ema_percent_values.append(ema_percent)
+        row["Average_EMA_percent"] = sum(ema_percent_values) / len(ema_percent_values)
+        return row
+
+
+class EMAPERCrossStream:
+    def __init__(self, emaper_s, emaper_l):
+        """
+        EMAs curta e longa de Average_EMA_percent, específicas de cada trader.
+        :param emaper_s: Período da EMA curta.
+        :param emaper_l: Período da EMA longa.
+        """
+        self.ema_short = EMAStream(emaper_s)
+        self.ema_long = EMAStream(emaper_l)
+
+    def update(self, average_ema_percent):
+        """Processa um novo Average_EMA_percent e retorna as duas EMAs."""
+        return {
+            "Average_EMA_percent_ema_short": self.ema_short.update(average_ema_percent),
+            "Average_EMA_percent_ema_long": self.ema_long.update(average_ema_percent),
+        }
+
+
+class IndicatorPipeline:
+    def __init__(self, ema_s, emaper_s, emaper_l):
+        """
+        Pipeline incremental completo usado pelo LongShortTrader.
+        Produz, para cada candle, as mesmas colunas que o cálculo em lote de define_strategy.
+        """
+        self.emaper = EMAPERStream(ema_s)
+        self.cross = EMAPERCrossStream(emaper_s, emaper_l)
+
+    def update(self, close):
+        """Processa um novo fechamento e retorna a linha de indicadores (ou None no aquecimento)."""
+        row = self.emaper.update(close)
+        if row is None:
+            return None
+        row.update(self.cross.update(row["Average_EMA_percent"]))
+        return row
+
+    def seed(self, closes):
+        """
+        Alimenta o pipeline com o histórico de fechamentos.
+        :return: Lista com as linhas de indicadores válidas geradas.
+        """
+        rows = []
+        for close in closes:
+            row = self.update(close)
+            if row is not None:
+                rows.append(row)
+        return rows
+
+
+class RollingMomentsStream:
+    def __init__(self, dim, window=None):
+        """
+        Média e matriz de co-momentos (somas de produtos dos desvios) de vetores de dimensão `dim`,
+        atualizadas por Welford ao entrar e ao sair uma observação da janela.
+        :param window: Tamanho da janela móvel (None para acumular todo o histórico).
+        """
+        self.dim = dim
+        self.window = window
+        self.count = 0
+        self.mean = np.zeros(dim)
+        self.comoment = np.zeros((dim, dim))
+        self.values = deque(maxlen=window) if window else None
+        self._since_resum = 0
+
+    def update(self, value):
+        """Adiciona uma observação (removendo a mais antiga quando a janela está cheia)."""
+        value = np.asarray(value, dtype=np.float64)
+        if self.values is not None:
+            if len(self.values) == self.window:
+                self._remove(self.values[0])
+            self.values.append(value)
+
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.comoment += np.outer(delta, value - self.mean)
+
+        # Recalcula os momentos da janela periodicamente para não acumular erro de arredondamento
+        if self.values is not None:
+            self._since_resum += 1
+            if self._since_resum >= self.window:
+                values = np.array(self.values)
+                self.mean = values.mean(axis=0)
+                centered = values - self.mean
+                self.comoment = centered.T @ centered
+                self._since_resum = 0
+
+    def seed(self, values):
+        """
+        Inicializa os momentos em lote a partir de um histórico (linhas = observações),
+        mantendo apenas as últimas `window` observações quando a janela é móvel.
+        """
+        values = np.asarray(values, dtype=np.float64).reshape(-1, self.dim)
+        if self.values is not None:
+            values = values[-self.window:]
+            self.values.clear()
+            self.values.extend(values)
+        self.count = len(values)
+        self._since_resum = 0
+        if not self.count:
+            self.mean = np.zeros(self.dim)
+            self.comoment = np.zeros((self.dim, self.dim))
+            return
+        self.mean = values.mean(axis=0)
+        centered = values - self.mean
+        self.comoment = centered.T @ centered
+
+    def _remove(self, value):
+        self.count -= 1
+        if self.count == 0:
+            self.mean = np.zeros(self.dim)
+            self.comoment = np.zeros((self.dim, self.dim))
+            return
+        delta = value - self.mean
+        self.mean -= delta / self.count
+        self.comoment -= np.outer(delta, value - self.mean)
+
+
+class PairSpreadStream:
+    def __init__(self, n_assets, window, regression_window=None):
+        """
+        Equivalente incremental de apply_regression + calculate_zscore no último candle:
+        regressão linear do alvo sobre os ativos do cluster e Z-Score do spread nos últimos
+        `window` candles, com a regressão atual aplicada a toda a janela.
+        O custo por candle depende apenas do número de ativos, não do tamanho do histórico.
+        :param n_assets: Número de ativos do cluster.
+        :param window: Janela do Z-Score.
+        :param regression_window: Candles usados na regressão (None para todo o histórico).
+        """
+        self.n_assets = n_assets
+        self.window = window
+        # Vetores (ativo_0, ..., ativo_k-1, alvo)
+        self.regression = RollingMomentsStream(n_assets + 1, regression_window)
+        self.spread_window = RollingMomentsStream(n_assets + 1, window)
+
+    def coefficients(self):
+        """Intercepto e coeficientes da regressão atual (mínimos quadrados)."""
+        k = self.n_assets
+        mean, comoment = self.regression.mean, self.regression.comoment
+        try:
+            beta = np.linalg.solve(comoment[:k, :k], comoment[:k, k])
+        except np.linalg.LinAlgError:
+            beta = np.linalg.lstsq(comoment[:k, :k], comoment[:k, k], rcond=None)[0]
+        return mean[k] - beta @ mean[:k], beta
+
+    def seed(self, target_closes, asset_closes):
+        """
+        Inicializa a regressão e a janela do Z-Score em lote com o histórico sincronizado
+        e calcula somente a linha do último candle (equivale a chamar update em cada linha).
+        :param target_closes: Fechamentos do alvo (n,).
+        :param asset_closes: Fechamentos dos ativos do cluster (n, n_assets).
+        :return: Linha do último candle, como em update.
+        """
+        values = np.column_stack([
+            np.asarray(asset_closes, dtype=np.float64), np.asarray(target_closes, dtype=np.float64)
+        ])
+        self.regression.seed(values[:-1])
+        self.spread_window.seed(values[:-1])
+        return self.update(values[-1, -1], values[-1, :-1])
+
+    def update(self, target_close, asset_closes):
+        """
+        Processa um candle sincronizado.
+        :return: Dicionário com Regression_Index, Spread, Spread_Mean, Spread_Std e Z-Score.
+        """
+        value = np.append(np.asarray(asset_closes, dtype=np.float64), float(target_close))
+        self.regression.update(value)
+        self.spread_window.update(value)
+
+        k = self.n_assets
+        intercept, beta = self.coefficients()
+        regression_index = intercept + beta @ value[:k]
+        spread = value[k] - regression_index
+
+        row = {
+            "Regression_Index": float(regression_index),
+            "Spread": float(spread),
+            "Spread_Mean": np.nan,
+            "Spread_Std": np.nan,
+            "Z-Score": np.nan,
+        }
+        if self.spread_window.count < self.window:
+            return row
+
+        # Média e variância amostral de y - intercepto - beta·x na janela
+        mean, comoment = self.spread_window.mean, self.spread_window.comoment
+        weights = np.append(-beta, 1.0)
+        spread_mean = mean[k] - intercept - beta @ mean[:k]
+        spread_var = max(weights @ comoment @ weights, 0.0) / (self.spread_window.count - 1)
+        spread_std = np.sqrt(spread_var)
+        row["Spread_Mean"] = float(spread_mean)
+        row["Spread_Std"] = float(spread_std)
+        row["Z-Score"] = float((spread - spread_mean) / spread_std) if spread_std > 0 else np.nan
+        return row
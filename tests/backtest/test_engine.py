@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+from backtest.engine import BacktestEngine, compute_indicators, simulate_trade
+from technicals.streaming import IndicatorPipeline
+
+
+def test_compute_indicators_matches_streaming_pipeline():
+    rng = np.random.default_rng(3)
+    closes = 100 + np.cumsum(rng.normal(0, 0.5, 1200))
+    batch = compute_indicators(pd.DataFrame({"Close": closes}), 20, 10, 50)
+    streamed = pd.DataFrame(IndicatorPipeline(20, 10, 50).seed(closes))
+
+    assert len(batch) == len(streamed)
+    for column in ["Average_EMA_percent", "Average_EMA_percent_ema_short", "Average_EMA_percent_ema_long"]:
+        np.testing.assert_allclose(batch[column], streamed[column], rtol=1e-9, atol=1e-9)
+
+
+def test_simulate_trade_take_profit_after_partial():
+    closes = np.array([100.0, 100.5, 101.2, 100.8, 102.5])
+    trade = simulate_trade(closes, 0, "LONG", sl_percent=0.02, breakeven_threshold=0.01)
+
+    assert trade["partial_index"] == 2
+    assert trade["exit_index"] == 4 and trade["close_type"] == "TP"
+    assert trade["pnl"] == pytest.approx(0.5 * 0.012 + 0.5 * 0.025)
+
+
+def test_simulate_trade_stop_moves_to_entry_after_partial():
+    closes = np.array([100.0, 98.9, 99.5, 100.9, 99.9])
+    trade = simulate_trade(closes, 0, "SHORT", sl_percent=0.02, breakeven_threshold=0.01)
+
+    # Parcial do SHORT em 98.9; o SL passa para a entrada e é atingido em 100.9
+    assert trade["partial_index"] == 1
+    assert trade["exit_index"] == 3 and trade["close_type"] == "SL"
+    assert trade["pnl"] == pytest.approx(0.5 * 0.011 - 0.5 * 0.009)
+
+
+def test_simulate_trade_stop_loss_before_break_even():
+    closes = np.array([100.0, 99.0, 97.9, 105.0])
+    trade = simulate_trade(closes, 0, "LONG", sl_percent=0.02, breakeven_threshold=0.01)
+
+    assert trade["partial_index"] is None
+    assert trade["exit_index"] == 2 and trade["close_type"] == "SL"
+
+
+def test_evaluate_metrics():
+    df = pd.DataFrame({
+        "Close": [100.0, 103.0, 100.0, 97.0, 100.0, 100.0],
+        "SIGNAL_UP_FIRST": [1, 0, 1, 0, 0, 0],
+        "SIGNAL_DOWN_FIRST": [0, 0, 0, 0, 1, 0],
+    })
+    result = BacktestEngine(breakeven_profit_threshold=0.5).evaluate(df, 0.02)
+
+    assert result["total_trades"] == 3
+    assert (result["tp"], result["sl"], result["open"]) == (1, 1, 1)
+    assert result["pnl"] == pytest.approx(0.03 - 0.03)
+    assert result["max_drawdown"] == pytest.approx(0.03)
+    assert result["win_rate"] == pytest.approx(1 / 3)
@@ -0,0 +1,46 @@
+from unittest.mock import MagicMock
+import numpy as np
+import pandas as pd
+from backtest.engine import BacktestEngine
+from backtest.optimizer import GridOptimizer
+
+GRID = {"emaper_s": [5, 10], "emaper_l": [10, 50], "emaper_force": [0.5, 1], "sl_percent": [-0.01, -0.02]}
+
+
+def candles(seed, n=3000):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"Close": 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))})
+
+
+def test_run_matches_single_backtests():
+    data = {"AAAUSDT": candles(1), "BBBUSDT": candles(2)}
+    results = GridOptimizer(grid=GRID, ema_s=10, max_workers=2).run(data)
+
+    # emaper_s >= emaper_l é descartado: (5,10), (5,50), (10,50)
+    assert len(results) == 2 * 3 * 2 * 2
+
+    row = results[(results.symbol == "BBBUSDT") & (results.emaper_s == 5) & (results.emaper_l == 50)
+                  & (results.emaper_force == 1) & (results.sl_percent == -0.02)].iloc[0]
+    expected = BacktestEngine().run(data["BBBUSDT"], 10, 5, 50, 1, -0.02)
+    assert row.total_trades == expected["total_trades"]
+    assert np.isclose(row.pnl, expected["pnl"])
+
+
+def test_rank_and_save_priority_criteria():
+    results = pd.DataFrame([
+        {"symbol": "A", "emaper_s": 5, "emaper_l": 50, "emaper_force": 2, "sl_percent": -0.01, "pnl": 0.1, "total_trades": 3},
+        {"symbol": "B", "emaper_s": 5, "emaper_l": 50, "emaper_force": 2, "sl_percent": -0.01, "pnl": 0.3, "total_trades": 1},
+        {"symbol": "A", "emaper_s": 10, "emaper_l": 50, "emaper_force": 2, "sl_percent": -0.01, "pnl": 0.5, "total_trades": 2},
+    ])
+    optimizer = GridOptimizer(metric="pnl")
+    optimizer.db = MagicMock()
+
+    ranking = optimizer.rank(results)
+    assert ranking[["emaper_s", "rank"]].values.tolist() == [[10, 1], [5, 2]]
+    assert np.isclose(ranking.loc[1, "score"], 0.2)
+
+    saved = optimizer.save_priority_criteria(ranking, top_n=1)
+    optimizer.db.delete_many.assert_called_once_with("priority_criteria")
+    optimizer.db.add_many.assert_called_once_with("priority_criteria", saved)
+    assert saved == [{"emaper_s": 10, "emaper_l": 50, "emaper_force": 2.0, "sl_percent": -0.01,
+                      "metric": "pnl", "score": 0.5, "rank": 1}]
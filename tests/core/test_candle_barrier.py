@@ -0,0 +1,59 @@
+import asyncio
+import pytest
+from core.candle_barrier import CandleBarrier
+
+
+def make_barrier(deadline=5):
+    rounds = []
+    barrier = CandleBarrier(lambda *args: rounds.append(args), deadline=deadline)
+    return barrier, rounds
+
+
+def test_round_is_released_when_all_participants_arrive():
+    barrier, rounds = make_barrier()
+    barrier.add_participant("a", "1m")
+    barrier.add_participant("b", "1m")
+
+    barrier.arrive("a", "1m", 60)
+    assert rounds == []
+    barrier.arrive("b", "1m", 60)
+    assert rounds == [("1m", 60, {"a", "b"}, set())]
+    assert barrier.stats()["completed_rounds"] == 1
+
+
+def test_rounds_of_different_close_times_are_independent():
+    barrier, rounds = make_barrier()
+    barrier.add_participant("a", "1m")
+    barrier.add_participant("b", "1m")
+
+    # "a" já fechou o candle seguinte antes de "b" fechar o anterior
+    barrier.arrive("a", "1m", 60)
+    barrier.arrive("a", "1m", 120)
+    barrier.arrive("b", "1m", 60)
+    assert rounds == [("1m", 60, {"a", "b"}, set())]
+    assert len(barrier.stats()["open_rounds"]) == 1
+
+
+def test_late_arrival_is_processed_alone():
+    barrier, rounds = make_barrier(deadline=0)
+    barrier.add_participant("a", "1m")
+    barrier.add_participant("b", "1m")
+
+    barrier.arrive("a", "1m", 60)
+    barrier.expire()
+    barrier.arrive("b", "1m", 60)
+    assert rounds == [("1m", 60, {"a"}, {"b"}), ("1m", 60, {"b"}, set())]
+    assert barrier.stats()["partial_rounds"] == 1
+    assert barrier.stats()["late_arrivals"] == 1
+
+
+@pytest.mark.asyncio
+async def test_deadline_timer_releases_partial_round():
+    barrier, rounds = make_barrier(deadline=0.05)
+    barrier.add_participant("a", "1m")
+    barrier.add_participant("b", "1m")
+
+    barrier.arrive("a", "1m", 60)
+    await asyncio.sleep(0.1)
+    assert rounds == [("1m", 60, {"a"}, {"b"})]
+    assert barrier.stats()["open_rounds"] == []
@@ -0,0 +1,73 @@
+import asyncio
+import pandas as pd
+import pytest
+from core.execution_scheduler import ExecutionScheduler
+from core.signal_manager import SignalManager
+
+
+def make_execution(log, name, delay=0.02, order=None):
+    async def execute():
+        log.append(("start", name))
+        await asyncio.sleep(delay)
+        log.append(("end", name))
+        return order if order is not None else {"orderId": name}
+    return execute
+
+
+@pytest.mark.asyncio
+async def test_same_symbol_is_serialized_and_different_symbols_run_concurrently():
+    scheduler = ExecutionScheduler(max_concurrency=5)
+    log = []
+    scheduler.submit("BTCUSDT", make_execution(log, "btc1"))
+    scheduler.submit("BTCUSDT", make_execution(log, "btc2"))
+    scheduler.submit("ETHUSDT", make_execution(log, "eth"))
+    await scheduler.drain()
+
+    # ETH começa antes de o primeiro BTC terminar; o segundo BTC só começa depois dele
+    assert log.index(("start", "eth")) < log.index(("end", "btc1"))
+    assert log.index(("end", "btc1")) < log.index(("start", "btc2"))
+    assert scheduler.stats()["completed"] == 3
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_capped():
+    scheduler = ExecutionScheduler(max_concurrency=2)
+    peak = 0
+
+    async def execute():
+        nonlocal peak
+        peak = max(peak, scheduler.running)
+        await asyncio.sleep(0.01)
+        return {"orderId": 1}
+
+    for symbol in ("A", "B", "C", "D", "E"):
+        scheduler.submit(symbol, execute)
+    await scheduler.drain()
+
+    assert peak == 2
+    assert scheduler.stats()["completed"] == 5
+
+
+@pytest.mark.asyncio
+async def test_latency_uses_order_ack_time_and_failures_are_counted():
+    scheduler = ExecutionScheduler()
+    scheduler.submit("BTCUSDT", make_execution([], "ok", order={"orderId": 1, "updateTime": 61_250}), candle_close=60_000)
+
+    async def failing():
+        raise RuntimeError("timeout")
+
+    scheduler.submit("ETHUSDT", failing)
+    scheduler.submit("ADAUSDT", make_execution([], "rejected", order={}))
+    await scheduler.drain()
+
+    stats = scheduler.stats()
+    assert stats["latency_ms"]["count"] == 1
+    assert stats["latency_ms"]["max"] == 1250
+    assert stats["failed"] == 2
+    assert stats["pending"] == 0
+
+
+def test_candle_close_from_signal_time_and_interval():
+    signal = {"Time": pd.Timestamp("2024-01-01 00:00:00")}
+    assert SignalManager.get_candle_close({"bar_length": "1m"}, signal) == 1704067260000
+    assert SignalManager.get_candle_close({}, signal) is None
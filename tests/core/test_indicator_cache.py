@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+from core.indicator_cache import IndicatorCache
+from data.candle_buffer import CandleBuffer
+from technicals.streaming import IndicatorPipeline
+
+
+def _candles(n):
+    rng = np.random.default_rng(3)
+    closes = 100 + np.cumsum(rng.normal(0, 0.3, n))
+    times = pd.date_range("2024-01-01", periods=n, freq="min")
+    df = pd.DataFrame({
+        "Open": closes, "High": closes, "Low": closes, "Close": closes,
+        "Volume": 1.0, "Time": times, "Complete": True,
+    })
+    return CandleBuffer.from_dataframe(df), closes, times
+
+
+def test_indicator_cache_computes_once_per_candle():
+    candles, _, times = _candles(400)
+    cache = IndicatorCache()
+
+    with patch("core.indicator_cache.SharedIndicators.advance", autospec=True) as mock_advance:
+        cache.get("BTCUSDT", "1m", 20, candles, times[-1])
+        cache.get("BTCUSDT", "1m", 20, candles, times[-1])
+        assert mock_advance.call_count == 1
+
+        cache.get("BTCUSDT", "1m", 50, candles, times[-1])
+        assert mock_advance.call_count == 2
+
+
+def test_indicator_cache_matches_pipeline_and_is_read_only():
+    candles, closes, times = _candles(600)
+    cache = IndicatorCache()
+
+    shared = cache.get("BTCUSDT", "1m", 20, candles, times[-1])
+    expected = pd.DataFrame(IndicatorPipeline(20, 10, 50).seed(closes))
+
+    np.testing.assert_allclose(shared["Average_EMA_percent"], expected["Average_EMA_percent"].values)
+    assert not shared["Average_EMA_percent"].flags.writeable
+    assert len(shared["Time"]) == len(expected)
+
+
+def test_indicator_cache_discard_removes_only_the_symbol_interval():
+    candles, _, times = _candles(300)
+    cache = IndicatorCache()
+    cache.get("BTCUSDT", "1m", 20, candles, times[-1])
+    cache.get("BTCUSDT", "1m", 50, candles, times[-1])
+    cache.get("ETHUSDT", "1m", 20, candles, times[-1])
+
+    cache.discard("BTCUSDT", "1m")
+
+    assert list(cache.entries) == [("ETHUSDT", "1m", 20)]
+    assert list(cache.snapshots) == [("ETHUSDT", "1m", 20)]
@@ -1,4 +1,5 @@
 import pytest
+import pandas as pd
 from unittest.mock import AsyncMock, patch, MagicMock
 from core.manager import TraderManager
 
@@ -65,7 +66,10 @@ async def test_start_trading(trader_manager):
     # Mock de `db` e métodos dependentes
     trader_manager.db = MagicMock()
     trader_manager.db.query_single.return_value = None  # Indica que o trade não existe
-    trader_manager.get_historical_data = MagicMock(return_value=MagicMock())  # Mocka dados históricos
+    trader_manager.get_historical_data = AsyncMock(return_value=pd.DataFrame({
+        "Open": [1.0], "High": [2.0], "Low": [0.5], "Close": [1.5], "Volume": [100.0],
+        "Time": [pd.Timestamp("2023-01-01")], "Complete": [False],
+    }))  # Mocka dados históricos
     trader_manager.signal_manager = MagicMock()  # Mock do SignalManager
     trader_manager.bm = MagicMock()  # Mock do BinanceSocketManager
     trader_manager.db.add_one = MagicMock()  # Mock para adicionar o trade
@@ -102,14 +106,36 @@ async def test_stop_trading(trader_manager):
 
 
 
-@patch("binance.Client.get_historical_klines")
-@patch("pandas.DataFrame")
-def test_get_historical_data(mock_dataframe, mock_get_historical_klines, trader_manager):
-    mock_get_historical_klines.return_value = [[1, 2, 3, 4, 5, 6]]
-    mock_dataframe.return_value = MagicMock()
+@pytest.mark.asyncio
+async def test_stop_trading_drops_buffer_of_released_stream(trader_manager):
+    trader_manager.db = MagicMock()
+    trader_manager.db.query_single.return_value = None
+    trader_manager.stream_ingestor = MagicMock()
+    trader_manager.indicator_cache = MagicMock()
+    trader_manager.active_trader_instances = {
+        "t1": MagicMock(symbol="BTCUSDT", bar_length="1h"),
+        "t2": MagicMock(symbol="BTCUSDT", bar_length="1h"),
+    }
+    trader_manager.active_streams = {("BTCUSDT", "1h")}
+    trader_manager.candle_data = {("BTCUSDT", "1h"): MagicMock()}
+
+    # Outro trader ainda usa o stream: o buffer é mantido
+    await trader_manager.stop_trading("t1")
+    assert ("BTCUSDT", "1h") in trader_manager.candle_data
 
-    df = trader_manager.get_historical_data("BTCUSDT", "1h")
-    assert mock_get_historical_klines.called
+    # Último assinante: o próximo trader recarrega o histórico em vez de continuar após a lacuna
+    await trader_manager.stop_trading("t2")
+    assert ("BTCUSDT", "1h") not in trader_manager.candle_data
+    trader_manager.indicator_cache.discard.assert_called_once_with("BTCUSDT", "1h")
+    trader_manager.stream_ingestor.unsubscribe.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_get_historical_data(trader_manager):
+    trader_manager.historical_loader.load = AsyncMock(return_value=MagicMock())
+
+    df = await trader_manager.get_historical_data("BTCUSDT", "1h")
+    trader_manager.historical_loader.load.assert_awaited_once_with("BTCUSDT", "1h", days=8)
     assert isinstance(df, MagicMock)
 
 
@@ -120,6 +146,7 @@ def test_process_stream_message(mock_to_datetime, trader_manager):
     mock_msg = {
         "k": {
             "t": 1672444800000,
+            "i": "1h",
             "o": "1.0",
             "h": "2.0",
             "l": "0.5",
@@ -139,6 +166,7 @@ def test_process_stream_message(mock_to_datetime, trader_manager):
     # Verifica a chamada do update_candle_data quando o candle estiver completo
     trader_manager.update_candle_data.assert_called_once_with(
         mock_symbol,
+        "1h",
         [
             1.0,  # Open
             2.0,  # High
@@ -151,6 +179,35 @@ def test_process_stream_message(mock_to_datetime, trader_manager):
         "2023-01-01 00:00:00",
     )
 
+def test_process_stream_message_routes_stale_backfill_to_history(trader_manager):
+    msg = {
+        "backfill": True,
+        "k": {"t": 1672444800000, "i": "1h", "o": "1", "h": "2", "l": "0.5", "c": "1.5", "v": "100", "x": True},
+    }
+    trader_manager.update_candle_data = MagicMock()
+    trader_manager.update_candle_history = MagicMock()
+
+    trader_manager.process_stream_message("BTCUSDT", msg)
+
+    trader_manager.update_candle_data.assert_not_called()
+    trader_manager.update_candle_history.assert_called_once()
+
+
+def test_update_candle_history_skips_trade_monitoring_and_signals(trader_manager):
+    candles = MagicMock()
+    trader_manager.candle_data = {("BTCUSDT", "1h"): candles}
+    trader_manager.monitor_trades_for_partial_close = MagicMock()
+    trader = MagicMock(symbol="BTCUSDT", bar_length="1h")
+    trader_manager.active_trader_instances = {"trade_id_123": trader}
+    candle_data = [1.0, 2.0, 0.5, 1.5, 100.0, "2023-01-01 00:00:00", True]
+
+    trader_manager.update_candle_history("BTCUSDT", "1h", candle_data, "2023-01-01 00:00:00")
+
+    candles.append.assert_called_once_with(*candle_data)
+    trader.update_history.assert_called_once_with("2023-01-01 00:00:00")
+    trader.define_strategy.assert_not_called()
+    trader_manager.monitor_trades_for_partial_close.assert_not_called()
+
 def test_update_candle_data(trader_manager):
     # Mock dos dados
     mock_symbol = "BTCUSDT"
@@ -158,24 +215,23 @@ def test_update_candle_data(trader_manager):
     mock_start_time = "2023-01-01 00:00:00"
 
     # Mock de atributos e métodos dependentes
-    trader_manager.candle_data = {mock_symbol: MagicMock()}
+    candles = MagicMock()
+    trader_manager.candle_data = {(mock_symbol, "1h"): candles}
     trader_manager.monitor_trades_for_partial_close = MagicMock()
     trader_manager.active_trader_instances = {
-        "trade_id_123": MagicMock(symbol=mock_symbol)
+        "trade_id_123": MagicMock(symbol=mock_symbol, bar_length="1h")
     }
     mock_trader_instance = trader_manager.active_trader_instances["trade_id_123"]
 
     # Chama o método
-    trader_manager.update_candle_data(mock_symbol, mock_candle_data, mock_start_time)
+    trader_manager.update_candle_data(mock_symbol, "1h", mock_candle_data, mock_start_time)
 
-    # Verifica se o DataFrame centralizado foi atualizado
-    trader_manager.candle_data[mock_symbol].loc.__setitem__.assert_called_once_with(
-        mock_start_time, mock_candle_data
-    )
+    # Verifica se o buffer centralizado foi atualizado
+    candles.append.assert_called_once_with(*mock_candle_data)
 
-    # Verifica se monitor_trades_for_partial_close foi chamado
+    # Verifica se monitor_trades_for_partial_close foi chamado com o último candle
     trader_manager.monitor_trades_for_partial_close.assert_called_once_with(
-        mock_symbol, mock_candle_data
+        mock_symbol, candles.last.return_value
     )
 
     # Verifica se a estratégia do trader foi atualizada
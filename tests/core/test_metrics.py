@@ -0,0 +1,57 @@
+import pytest
+from unittest.mock import MagicMock
+from core.metrics import MetricsRegistry, MongoCommandTimer, MONGO_COMMAND_TIME, BINANCE_REST_TIME, instrument_binance_client
+
+
+def test_histogram_renders_cumulative_buckets_in_prometheus_format():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("stage_seconds", "Duração do estágio", ("stage",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, stage="db")
+    histogram.observe(0.5, stage="db")
+    histogram.observe(3, stage="db")
+
+    assert registry.render().splitlines() == [
+        "# HELP stage_seconds Duração do estágio",
+        "# TYPE stage_seconds histogram",
+        'stage_seconds_bucket{stage="db",le="0.1"} 1',
+        'stage_seconds_bucket{stage="db",le="1.0"} 2',
+        'stage_seconds_bucket{stage="db",le="+Inf"} 3',
+        'stage_seconds_sum{stage="db"} 3.55',
+        'stage_seconds_count{stage="db"} 3',
+    ]
+
+
+def test_histogram_timer_and_label_escaping():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("block_seconds", "Bloco", ("name",))
+    with histogram.time(name='a"b'):
+        pass
+
+    assert registry.histogram("block_seconds", "Bloco") is histogram
+    assert 'block_seconds_count{name="a\\"b"} 1' in registry.render()
+
+
+def test_mongo_command_timer_observes_duration():
+    before = MONGO_COMMAND_TIME.series.get(("find",), [None, 0.0, 0])[2]
+    MongoCommandTimer().succeeded(MagicMock(command_name="find", duration_micros=1500))
+    assert MONGO_COMMAND_TIME.series[("find",)][2] == before + 1
+
+
+def test_instrument_sync_binance_client():
+    client = MagicMock()
+    client._request = MagicMock(return_value={"ok": True})
+    instrument_binance_client(client)
+
+    assert client._request("get", "https://fapi.binance.com/fapi/v1/ticker/price?symbol=BTCUSDT", False) == {"ok": True}
+    assert BINANCE_REST_TIME.series[("GET", "/fapi/v1/ticker/price")][2] >= 1
+
+
+@pytest.mark.asyncio
+async def test_instrument_async_binance_client():
+    class FakeAsyncClient:
+        async def _request(self, method, uri, signed, force_params=False, **kwargs):
+            return {"orderId": 1}
+
+    client = instrument_binance_client(FakeAsyncClient())
+    assert await client._request("post", "https://fapi.binance.com/fapi/v1/order", True) == {"orderId": 1}
+    assert BINANCE_REST_TIME.series[("POST", "/fapi/v1/order")][2] >= 1
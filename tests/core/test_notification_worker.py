@@ -0,0 +1,89 @@
+import asyncio
+import time
+import pandas as pd
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from telegram.error import RetryAfter
+from core.notification_worker import NotificationWorker, render_candle_chart
+
+
+def make_worker(**kwargs):
+    bot = MagicMock()
+    bot.initialize = AsyncMock()
+    bot.shutdown = AsyncMock()
+    bot.send_message = AsyncMock()
+    bot.send_photo = AsyncMock()
+    bot.send_media_group = AsyncMock()
+    worker = NotificationWorker(chat_id="1", telegram_bot=bot, **{"batch_window": 0.05, "rate_limit": 0, **kwargs})
+    # Renderização simulada: evita subir o pool de processos nos testes
+    worker._render = AsyncMock(side_effect=lambda candles: None if candles is None else b"png")
+    return worker, bot
+
+
+@pytest.mark.asyncio
+async def test_burst_is_coalesced_per_key_and_batched():
+    worker, bot = make_worker()
+    await worker.start()
+    worker.notify("trade1", "primeiro", "candles")
+    worker.notify("trade2", "outro trader", "candles")
+    worker.notify("trade1", "segundo", "candles")
+    await worker.stop()
+
+    bot.initialize.assert_awaited_once()
+    bot.shutdown.assert_awaited_once()
+    bot.send_message.assert_awaited_once_with(chat_id="1", text="outro trader\nsegundo")
+    media = bot.send_media_group.await_args.kwargs["media"]
+    assert [item.caption for item in media] == ["trade2", "trade1"]
+    assert worker.stats()["coalesced"] == 1
+    assert worker.stats()["sent"] == 2
+    assert worker.stats()["batches"] == 1
+
+
+@pytest.mark.asyncio
+async def test_single_notification_sends_photo():
+    worker, bot = make_worker()
+    await worker.start()
+    worker.notify("trade1", "sinal", "candles")
+    worker.notify("trade2", "sem gráfico")
+    await worker.stop()
+
+    bot.send_photo.assert_awaited_once_with(chat_id="1", photo=b"png", caption="trade1")
+    bot.send_media_group.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_drops_when_queue_is_full():
+    worker, bot = make_worker(max_queued=1)
+    await worker.start()
+    assert worker.notify("trade1", "a")
+    assert not worker.notify("trade2", "b")
+    await worker.stop()
+    assert worker.stats()["dropped"] == 1
+
+
+def test_notify_without_loop_is_dropped():
+    worker, _ = make_worker()
+    assert not worker.notify("trade1", "a")
+    assert worker.dropped == 1
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_and_retry_after():
+    worker, bot = make_worker(rate_limit=20)
+    bot.send_message.side_effect = [RetryAfter(0), None, None]
+
+    started = time.monotonic()
+    await worker._call(bot.send_message, chat_id="1", text="a")
+    await worker._call(bot.send_message, chat_id="1", text="b")
+    assert bot.send_message.await_count == 3
+    # Três chamadas espaçadas por ao menos 1/20 s
+    assert time.monotonic() - started >= 0.1
+
+
+def test_render_candle_chart_returns_png():
+    candles = pd.DataFrame(
+        {"Open": [1.0, 2.0, 3.0], "High": [2.0, 3.0, 4.0], "Low": [0.5, 1.5, 2.5], "Close": [1.5, 2.5, 3.5]},
+        index=pd.date_range("2024-01-01", periods=3, freq="min"),
+    )
+    png = render_candle_chart(candles)
+    assert png.startswith(b"\x89PNG")
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import MagicMock, patch
+from core.pair_trader import PairTrader
+from data.aligned_matrix import AlignedCandleMatrix
+
+MINUTE = 60_000
+T0 = 1_700_000_040_000
+
+
+def make_candles(times, closes):
+    return pd.DataFrame({
+        "Open": closes, "High": closes, "Low": closes, "Close": closes,
+        "Time": pd.to_datetime(times, unit="ms"),
+    })
+
+
+@pytest.fixture
+def pair_trader():
+    with patch("core.pair_trader.SignalPairManager"), patch("core.pair_trader.DataDB"):
+        executor = MagicMock()
+        executor.get_opened_trades.return_value = []
+        yield PairTrader("pair1", "TARGET", ["A", "B"], 2, 0, 30, "1m", executor)
+
+
+def test_incremental_update_matches_batch(pair_trader):
+    rng = np.random.default_rng(3)
+    times = T0 + MINUTE * np.arange(400)
+    assets = 100 + np.cumsum(rng.normal(0, 0.5, (400, 2)), axis=0)
+    target = assets @ [0.6, 0.4] + rng.normal(0, 0.3, len(assets))
+    series = {"A": assets[:, 0], "B": assets[:, 1], "TARGET": target}
+
+    # Histórico até o candle 300; os demais chegam um a um pelo stream
+    matrix = AlignedCandleMatrix("1m", capacity=1000)
+    for symbol, closes in series.items():
+        matrix.load(symbol, times[:300], closes[:300])
+    matrix.subscribe("pair1", pair_trader.symbols(), lambda open_time: pair_trader.define_strategy(matrix, open_time))
+    pair_trader.define_strategy(matrix)
+    for i in range(300, 400):
+        for symbol, closes in series.items():
+            matrix.update(symbol, int(times[i]), closes[i])
+
+    frames = {symbol: make_candles(times, closes) for symbol, closes in series.items()}
+    expected = pair_trader.prepare_data([frames["A"], frames["B"]], frames["TARGET"]).iloc[-1]
+    assert pair_trader.last_row["Time"] == expected["Time"]
+    assert pair_trader.last_row["Z-Score"] == pytest.approx(expected["Z-Score"], rel=1e-7)
+
+
+def test_skips_incomplete_row_and_registers_signal(pair_trader):
+    times = T0 + MINUTE * np.arange(200)
+    closes = 100 + np.sin(np.arange(200) / 5)
+    matrix = AlignedCandleMatrix("1m", capacity=500)
+    for symbol in pair_trader.symbols():
+        matrix.load(symbol, times, closes)
+    pair_trader.define_strategy(matrix)
+    last_time = pair_trader.last_time
+    next_time = last_time + MINUTE
+
+    # Apenas o alvo fechou o candle: nada é recalculado
+    matrix.update("TARGET", next_time, 1.0)
+    assert pair_trader.update(matrix, next_time) is None
+    assert pair_trader.last_time == last_time
+
+    pair_trader.spread.update = MagicMock(return_value={
+        "Regression_Index": 100.0, "Spread": 5.0, "Spread_Mean": 0.0, "Spread_Std": 1.0, "Z-Score": 5.0,
+    })
+    for symbol in ["A", "B"]:
+        matrix.update(symbol, next_time, 1.0)
+    pair_trader.define_strategy(matrix, next_time)
+
+    assert pair_trader.last_row["SIGNAL_DOWN_PAIR1"] == 1
+    pair_trader.signal_pair_manager.register_signal.assert_called_once()
+
+
+def test_update_history_advances_spread_without_signals(pair_trader):
+    times = T0 + MINUTE * np.arange(200)
+    closes = 100 + np.sin(np.arange(200) / 5)
+    matrix = AlignedCandleMatrix("1m", capacity=500)
+    for symbol in pair_trader.symbols():
+        matrix.load(symbol, times[:199], closes[:199])
+    pair_trader.define_strategy(matrix)
+    pair_trader.signal_pair_manager.register_signal.reset_mock()
+    last_row = pair_trader.last_row
+
+    for symbol in pair_trader.symbols():
+        matrix.update(symbol, int(times[199]), closes[199] * 1.5)
+    pair_trader.update_history(matrix, int(times[199]))
+
+    # A linha antiga entra na regressão, mas não gera sinal nem checa trades abertos
+    assert pair_trader.last_time == int(times[199])
+    assert pair_trader.last_row is last_row
+    pair_trader.signal_pair_manager.register_signal.assert_not_called()
+    pair_trader.pair_trade_executor.check_zscore_change.assert_not_called()
@@ -0,0 +1,7 @@
+from core.process_pool import spawn_process_pool
+
+
+def test_spawn_process_pool_uses_spawn_context():
+    with spawn_process_pool(1) as pool:
+        assert pool._mp_context.get_start_method() == "spawn"
+        assert pool.submit(abs, -3).result(timeout=30) == 3
@@ -6,7 +6,7 @@ import pandas as pd
 
 @pytest.fixture
 def signal_manager():
-    return SignalManager(total_tasks=5)
+    return SignalManager()
 
 
 # Teste para `register_signal`
@@ -20,35 +20,51 @@ def test_register_signal(signal_manager):
 # Teste para `register_task_completion`
 @patch("core.signal_manager.SignalManager.process_signals")
 def test_register_task_completion(mock_process_signals, signal_manager):
-    signal_manager.completed_tasks_count = 4  # Total tasks - 1
-    signal_manager.register_task_completion("2023-01-01T12:00:00")
-    assert signal_manager.completed_tasks_count == 0
-    mock_process_signals.assert_called_once()
+    signal_manager.register_trader("trade1", {"bar_length": "1m"})
+    signal_manager.register_trader("trade2", {"bar_length": "1m"})
+    signal_manager.register_signal("trade1", {"SIGNAL_UP": 1})
+
+    signal_manager.register_task_completion("trade1", "1m", "2023-01-01T12:00:00")
+    mock_process_signals.assert_not_called()
+    signal_manager.register_task_completion("trade2", "1m", "2023-01-01T12:00:00")
+    mock_process_signals.assert_called_once_with({"trade1": [{"SIGNAL_UP": 1}]})
+    assert not signal_manager.signals
 
 
 @patch("core.signal_manager.SignalManager.process_signals")
-def test_register_task_completion_not_ready(mock_process_signals, signal_manager):
-    signal_manager.completed_tasks_count = 2  # Menor que total_tasks
-    signal_manager.register_task_completion("2023-01-01T12:00:00")
-    assert signal_manager.completed_tasks_count == 3
-    mock_process_signals.assert_not_called()
+def test_register_task_completion_intervals_are_independent(mock_process_signals, signal_manager):
+    signal_manager.register_trader("trade1", {"bar_length": "1m"})
+    signal_manager.register_trader("trade2", {"bar_length": "5m"})
+
+    # O trader de 5m não segura a rodada de 1m
+    signal_manager.register_task_completion("trade1", "1m", "2023-01-01T12:01:00")
+    mock_process_signals.assert_called_once_with({})
 
 
 @patch("core.signal_manager.SignalManager.process_signals")
-def test_register_task_completion_already_processed(mock_process_signals, signal_manager):
-    signal_manager.completed_tasks_count = 4  # Total tasks - 1
-    signal_manager.last_processed_timestamp = "2023-01-01T12:00:00"
-    signal_manager.register_task_completion("2023-01-01T12:00:00")
-    assert signal_manager.completed_tasks_count == 5  # Apenas incrementa
-    mock_process_signals.assert_not_called()
+def test_register_task_completion_releases_partial_round_after_deadline(mock_process_signals, signal_manager):
+    signal_manager.candle_barrier.deadline = 0
+    signal_manager.register_trader("trade1", {"bar_length": "1m"})
+    signal_manager.register_trader("trade2", {"bar_length": "1m"})
+    signal_manager.register_signal("trade1", {"SIGNAL_UP": 1})
+
+    signal_manager.register_task_completion("trade1", "1m", "2023-01-01T12:00:00")
+    # A próxima conclusão verifica o deadline e libera a rodada sem o trade2
+    signal_manager.register_task_completion("trade1", "1m", "2023-01-01T12:01:00")
+    mock_process_signals.assert_any_call({"trade1": [{"SIGNAL_UP": 1}]})
+    assert signal_manager.candle_barrier.stats()["partial_rounds"] >= 1
+
 
 @patch("core.signal_manager.SignalManager.process_signals")
-def test_register_task_completion_count_exceeds_total(mock_process_signals, signal_manager):
-    signal_manager.completed_tasks_count = 6  # Maior que total_tasks (suposto erro lógico)
-    signal_manager.register_task_completion("2023-01-01T12:00:00")
-    assert signal_manager.completed_tasks_count == 7  # Continua incrementando
+def test_unregister_trader_releases_waiting_round(mock_process_signals, signal_manager):
+    signal_manager.register_trader("trade1", {"bar_length": "1m"})
+    signal_manager.register_trader("trade2", {"bar_length": "1m"})
+    signal_manager.register_task_completion("trade1", "1m", "2023-01-01T12:00:00")
     mock_process_signals.assert_not_called()
 
+    signal_manager.unregister_trader("trade2")
+    mock_process_signals.assert_called_once()
+
 
 # Teste para `add_priority_in_db`
 def test_add_priority_in_db(signal_manager):
@@ -56,6 +72,8 @@ def test_add_priority_in_db(signal_manager):
     signal_manager.add_priority_in_db()
     signal_manager.db.delete_many.assert_called_once_with("priority_criteria")
     signal_manager.db.add_many.assert_called_once()
+    priority_data = signal_manager.db.add_many.call_args.args[1]
+    assert [row["rank"] for row in priority_data] == list(range(1, len(priority_data) + 1))
 
 
 # Teste para `get_trade_params`
@@ -75,7 +93,19 @@ def test_get_priority_table(signal_manager):
     ]
     priority_table = signal_manager.get_priority_table()
     assert not priority_table.empty
-    signal_manager.db.query_all.assert_called_once_with("priority_criteria")
+    signal_manager.db.query_all.assert_called_once_with("priority_criteria", limit=0)
+
+
+def test_priority_index_follows_stored_rank(signal_manager):
+    signal_manager.db = MagicMock()
+    # O MongoDB não garante a ordem de inserção sem sort
+    signal_manager.db.query_all.return_value = [
+        {"emaper_s": 5, "emaper_l": 50, "emaper_force": 2, "sl_percent": -0.04, "rank": 150},
+        {"emaper_s": 20, "emaper_l": 50, "emaper_force": 4, "sl_percent": -0.04, "rank": 2},
+        {"emaper_s": 50, "emaper_l": 100, "emaper_force": 5, "sl_percent": -0.03, "rank": 1},
+    ]
+    index = signal_manager.get_priority_index()
+    assert index == {(50.0, 100.0, 5.0, -0.03): 0, (20.0, 50.0, 4.0, -0.04): 1, (5.0, 50.0, 2.0, -0.04): 2}
 
 
 # Teste para `select_top_signals`
@@ -144,6 +174,54 @@ def test_select_top_signals_respects_priority_table(mock_get_priority_table, sig
     ]
     assert top_signals == expected_signals
 
+def test_get_trade_params_from_registry(signal_manager):
+    signal_manager.db = MagicMock()
+    signal_manager.register_trader("trade1", {"trade_id": "trade1", "symbol": "BTCUSDT"})
+    assert signal_manager.get_trade_params("trade1") == {"trade_id": "trade1", "symbol": "BTCUSDT"}
+    signal_manager.db.query_single.assert_not_called()
+
+    signal_manager.unregister_trader("trade1")
+    signal_manager.db.query_single.return_value = None
+    assert signal_manager.get_trade_params("trade1") == {}
+
+
+def test_priority_index_loaded_once_and_invalidated(signal_manager):
+    signal_manager.db = MagicMock()
+    signal_manager.db.query_all.return_value = [
+        {"emaper_s": 50, "emaper_l": 100, "emaper_force": 5, "sl_percent": -0.03},
+        {"emaper_s": 20, "emaper_l": 50, "emaper_force": 4.0, "sl_percent": -0.04},
+        {"emaper_s": 50, "emaper_l": 100, "emaper_force": 5, "sl_percent": -0.03},
+    ]
+    index = signal_manager.get_priority_index()
+    assert index == {(50.0, 100.0, 5.0, -0.03): 0, (20.0, 50.0, 4.0, -0.04): 1}
+
+    signal_manager.get_priority_index()
+    signal_manager.db.query_all.assert_called_once()
+
+    signal_manager.add_priority_in_db()
+    signal_manager.get_priority_index()
+    assert signal_manager.db.query_all.call_count == 2
+
+
+def test_select_top_signals_skips_unranked_without_io(signal_manager):
+    signal_manager.db = MagicMock()
+    signal_manager.priority_index = {(50.0, 100.0, 5.0, -0.03): 0, (20.0, 50.0, 4.0, -0.04): 1}
+    params = {
+        "trade1": {"emaper_s": 20, "emaper_l": 50, "emaper_force": 4, "sl_percent": -0.04},
+        "trade2": {"emaper_s": 50, "emaper_l": 100, "emaper_force": 5, "sl_percent": -0.03},
+        "trade3": {"emaper_s": 5, "emaper_l": 50, "emaper_force": 2, "sl_percent": -0.01},
+    }
+    for trade_id, trade_params in params.items():
+        signal_manager.register_trader(trade_id, trade_params)
+
+    signals = {trade_id: [{"SIGNAL_UP": i}] for i, trade_id in enumerate(params)}
+    top_signals = signal_manager.select_top_signals(signals, top_n=2)
+
+    assert top_signals == [(params["trade2"], {"SIGNAL_UP": 1}), (params["trade1"], {"SIGNAL_UP": 0})]
+    signal_manager.db.query_single.assert_not_called()
+    signal_manager.db.query_all.assert_not_called()
+
+
 # Teste para `process_signals`
 @patch("core.signal_manager.SignalManager.select_top_signals", return_value=[({}, {"SIGNAL_UP": 1})])
 @patch("core.signal_manager.TradeExecutor.execute_trade")
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+from core.strategies import Strategy1, SignalStrategy, crossover_signals
+
+
+def reference_signals(short, long, emaper_force):
+    # Cópia do laço original de Strategy1.detect_signals
+    signal_up = np.zeros(len(short), dtype=int)
+    signal_down = np.zeros(len(short), dtype=int)
+    for i in range(1, len(short)):
+        if short[i - 1] < long[i - 1] and short[i] > long[i] and short[i] < -emaper_force:
+            signal_up[i] = 1
+        elif short[i - 1] > long[i - 1] and short[i] < long[i] and short[i] > emaper_force:
+            signal_down[i] = 1
+    return signal_up, signal_down
+
+
+def make_df(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    short = np.cumsum(rng.normal(0, 1, n))
+    long = pd.Series(short).ewm(span=20).mean().to_numpy()
+    short[rng.integers(0, n, 20)] = np.nan
+    return pd.DataFrame({"Average_EMA_percent_ema_short": short, "Average_EMA_percent_ema_long": long})
+
+
+def test_detect_signals_matches_loop():
+    df = make_df()
+    for emaper_force in (0, 0.5, 3):
+        result = Strategy1().detect_signals(df.copy(), emaper_force)
+        expected_up, expected_down = reference_signals(
+            df["Average_EMA_percent_ema_short"].to_numpy(), df["Average_EMA_percent_ema_long"].to_numpy(), emaper_force
+        )
+        np.testing.assert_array_equal(result["SIGNAL_UP_FIRST"], expected_up)
+        np.testing.assert_array_equal(result["SIGNAL_DOWN_FIRST"], expected_down)
+        assert expected_up.sum() and expected_down.sum()
+
+
+def test_detect_last_signal_matches_full_detection():
+    df = make_df(500, seed=1)
+    up, down = crossover_signals(df["Average_EMA_percent_ema_short"], df["Average_EMA_percent_ema_long"], 0.5)
+    rows = df.to_dict("records")
+    for i in range(1, len(rows)):
+        signal = Strategy1().detect_last_signal(rows[i - 1], rows[i], 0.5)
+        assert (signal["SIGNAL_UP_FIRST"], signal["SIGNAL_DOWN_FIRST"]) == (up[i], down[i])
+    assert Strategy1().detect_last_signal(None, rows[0], 0.5)["SIGNAL_UP"] == 0
+
+
+def test_default_detect_last_signal_uses_detect_signals():
+    class LoopStrategy(SignalStrategy):
+        def detect_signals(self, df, emaper_force):
+            return Strategy1().detect_signals(df, emaper_force)
+
+    previous = {"Average_EMA_percent_ema_short": -3.0, "Average_EMA_percent_ema_long": -2.0}
+    current = {"Average_EMA_percent_ema_short": -1.0, "Average_EMA_percent_ema_long": -1.5}
+    assert LoopStrategy().detect_last_signal(previous, current, 0.5)["SIGNAL_UP_FIRST"] == 1
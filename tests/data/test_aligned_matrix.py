@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import MagicMock
+from core.pair_trading_strategy import synchronize_dataframes
+from data.aligned_matrix import AlignedCandleMatrix, AlignedMatrixStore, interval_to_ms
+
+MINUTE = 60_000
+T0 = 1_700_000_040_000  # múltiplo de 1 minuto
+
+
+def test_interval_to_ms():
+    assert interval_to_ms("1m") == MINUTE
+    assert interval_to_ms("4h") == 4 * 3_600_000
+    with pytest.raises(ValueError):
+        interval_to_ms("1M")
+
+
+def test_row_complete_fires_once_when_all_symbols_close():
+    matrix = AlignedCandleMatrix("1m", capacity=16)
+    callback = MagicMock()
+    matrix.subscribe("pair1", ["A", "B", "T"], callback)
+
+    matrix.update("A", T0, 1.0)
+    matrix.update("T", T0, 3.0)
+    callback.assert_not_called()
+    matrix.update("B", T0, 2.0)
+    callback.assert_called_once_with(T0)
+
+    # Candle repetido não notifica de novo; linha incompleta não é retornada
+    matrix.update("B", T0, 2.5)
+    matrix.update("A", T0 + MINUTE, 1.1)
+    assert callback.call_count == 1
+    assert matrix.row(["A", "B", "T"], T0 + MINUTE) is None
+    np.testing.assert_array_equal(matrix.row(["A", "B", "T"], T0), [1.0, 2.5, 3.0])
+
+
+def test_aligned_matches_inner_merge_and_wraps_around():
+    rng = np.random.default_rng(0)
+    capacity = 50
+    times = T0 + MINUTE * np.arange(120)
+    frames = {}
+    matrix = AlignedCandleMatrix("1m", capacity=capacity)
+    for symbol in ["A", "B", "T"]:
+        # Cada símbolo com lacunas diferentes
+        keep = rng.random(len(times)) > 0.1
+        closes = rng.normal(100, 1, keep.sum())
+        frames[symbol] = pd.DataFrame({
+            "Time": pd.to_datetime(times[keep], unit="ms"),
+            "Close": closes, "High": closes, "Low": closes, "Open": closes,
+        })
+        matrix.load(symbol, times[keep], closes)
+
+    aligned_times, closes = matrix.aligned(["A", "B", "T"])
+    merged = synchronize_dataframes([frames["A"], frames["B"]], frames["T"])
+    merged = merged[merged["Time"] >= pd.to_datetime(times[-capacity], unit="ms")]
+
+    np.testing.assert_array_equal(pd.to_datetime(aligned_times, unit="ms"), merged["Time"].values)
+    np.testing.assert_array_equal(closes, merged[["Asset_0", "Asset_1", "Close"]].values)
+
+    # Candles mais antigos que a janela são ignorados
+    matrix.update("A", int(times[0]), 0.0)
+    assert matrix.row(["A"], int(times[0])) is None
+
+
+def test_store_ignores_unknown_intervals_and_symbols():
+    store = AlignedMatrixStore(capacity=8)
+    store.update("A", "1m", T0, 1.0)
+    matrix = store.matrix("1m")
+    matrix.update("A", T0, 1.0)
+    assert matrix.last_time is None
+    matrix.add_symbol("A")
+    store.update("a", "1m", T0, 1.0)
+    np.testing.assert_array_equal(matrix.row(["A"], T0), [1.0])
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+from data.candle_buffer import RingBuffer, CandleBuffer
+
+
+def test_ring_buffer_append_and_view():
+    buffer = RingBuffer(3)
+    for value in [1.0, 2.0, 3.0, 4.0]:
+        buffer.append(value)
+
+    assert len(buffer) == 3
+    assert buffer.view().tolist() == [2.0, 3.0, 4.0]
+    assert buffer.view(2).tolist() == [3.0, 4.0]
+    assert buffer.last() == 4.0
+
+
+def test_ring_buffer_view_is_read_only_and_zero_copy():
+    buffer = RingBuffer(4)
+    for value in range(6):
+        buffer.append(value)
+
+    view = buffer.view(3)
+    assert not view.flags.writeable
+    assert np.shares_memory(view, buffer._data)
+
+
+def test_ring_buffer_replace_last():
+    buffer = RingBuffer(2)
+    buffer.append(1.0)
+    buffer.append(2.0)
+    buffer.replace_last(5.0)
+    assert buffer.view().tolist() == [1.0, 5.0]
+
+
+def test_ring_buffer_empty():
+    buffer = RingBuffer(2)
+    with pytest.raises(IndexError):
+        buffer.last()
+    assert len(buffer.view()) == 0
+
+
+def _historical_df(n):
+    times = pd.date_range("2024-01-01", periods=n, freq="min")
+    df = pd.DataFrame({
+        "Open": np.arange(n, dtype=float),
+        "High": np.arange(n, dtype=float) + 1,
+        "Low": np.arange(n, dtype=float) - 1,
+        "Close": np.arange(n, dtype=float) + 0.5,
+        "Volume": np.ones(n),
+        "Time": times,
+        "Complete": [True] * (n - 1) + [False],
+    }, index=pd.DatetimeIndex(times, name="Date"))
+    return df
+
+
+def test_candle_buffer_from_dataframe_keeps_capacity():
+    buffer = CandleBuffer.from_dataframe(_historical_df(10), capacity=5)
+    assert len(buffer) == 5
+    assert buffer.view("Close").tolist() == [5.5, 6.5, 7.5, 8.5, 9.5]
+
+
+def test_candle_buffer_replaces_candle_with_same_time():
+    df = _historical_df(3)
+    buffer = CandleBuffer.from_dataframe(df, capacity=10)
+
+    # O último candle histórico ainda estava em formação
+    buffer.append(2.0, 4.0, 1.0, 3.0, 10.0, df["Time"].iloc[-1], True)
+    assert len(buffer) == 3
+    assert buffer.last()["Close"] == 3.0
+    assert buffer.last()["Complete"] is True
+
+    buffer.append(3.0, 5.0, 2.0, 4.0, 10.0, df["Time"].iloc[-1] + pd.Timedelta(minutes=1), True)
+    assert len(buffer) == 4
+    assert buffer.last()["Close"] == 4.0
+
+
+def test_candle_buffer_to_dataframe():
+    buffer = CandleBuffer.from_dataframe(_historical_df(10), capacity=20)
+    df = buffer.to_dataframe(3)
+    assert list(df.columns) == ["Open", "High", "Low", "Close", "Volume", "Time", "Complete"]
+    assert len(df) == 3
+    assert df["Close"].tolist() == [7.5, 8.5, 9.5]
+    assert df.index[-1] == df["Time"].iloc[-1]
@@ -0,0 +1,205 @@
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from data.collector import KlineStreamIngestor, is_stale_candle
+
+
+def _kline_msg(symbol, interval, open_time, closed):
+    return {
+        "stream": f"{symbol.lower()}@kline_{interval}",
+        "data": {
+            "e": "kline",
+            "s": symbol,
+            "k": {"t": open_time, "i": interval, "o": "1", "h": "1", "l": "1", "c": "1", "v": "1", "x": closed},
+        },
+    }
+
+
+def test_subscribe_and_unsubscribe_streams():
+    ingestor = KlineStreamIngestor()
+    handler_a, handler_b = MagicMock(), MagicMock()
+
+    ingestor.subscribe("BTCUSDT", "1m", handler_a)
+    ingestor.subscribe("btcusdt", "1m", handler_b)
+    ingestor.subscribe("ETHUSDT", "5m", handler_a)
+    assert ingestor.stream_names() == ["btcusdt@kline_1m", "ethusdt@kline_5m"]
+
+    ingestor.unsubscribe("BTCUSDT", "1m", handler_a)
+    assert ingestor.stream_names() == ["btcusdt@kline_1m", "ethusdt@kline_5m"]
+
+    ingestor.unsubscribe("BTCUSDT", "1m", handler_b)
+    assert ingestor.stream_names() == ["ethusdt@kline_5m"]
+
+
+def test_dispatch_fans_out_to_all_handlers():
+    ingestor = KlineStreamIngestor()
+    handler_a, handler_b = MagicMock(), MagicMock(side_effect=Exception("falha"))
+    ingestor.subscribe("BTCUSDT", "1m", handler_b)
+    ingestor.subscribe("BTCUSDT", "1m", handler_a)
+
+    msg = _kline_msg("BTCUSDT", "1m", 1000, True)
+    ingestor.dispatch(msg)
+
+    # Um handler com erro não impede os demais
+    handler_a.assert_called_once_with("BTCUSDT", msg["data"])
+    assert ingestor.last_closed[("BTCUSDT", "1m")] == 1000
+
+
+def test_dispatch_raises_on_stream_error():
+    ingestor = KlineStreamIngestor()
+    with pytest.raises(ConnectionError):
+        ingestor.dispatch({"e": "error", "m": "Queue overflow"})
+
+
+def _rest_kline(open_time, interval_ms=60000):
+    return [open_time, "1", "2", "0.5", "1.5", "10", open_time + interval_ms - 1]
+
+
+@pytest.mark.asyncio
+async def test_backfill_dispatches_missing_closed_candles():
+    ingestor = KlineStreamIngestor()
+    handler = MagicMock()
+    ingestor.subscribe("BTCUSDT", "1m", handler)
+    current = int(time.time() * 1000) // 60000 * 60000  # Abertura do candle em formação
+    ingestor.last_closed[("BTCUSDT", "1m")] = current - 180000
+
+    ingestor.client = AsyncMock()
+    ingestor.client.get_klines.return_value = [
+        _rest_kline(current - 120000),
+        _rest_kline(current - 60000),
+        _rest_kline(current),  # Ainda em formação
+    ]
+
+    await ingestor.backfill()
+
+    ingestor.client.get_klines.assert_awaited_once_with(
+        symbol="BTCUSDT", interval="1m", startTime=current - 180000 + 1, limit=1000
+    )
+    assert [call.args[1]["k"]["t"] for call in handler.call_args_list] == [current - 120000, current - 60000]
+    assert all(call.args[1]["k"]["x"] is True for call in handler.call_args_list)
+    assert ingestor.last_closed[("BTCUSDT", "1m")] == current - 60000
+
+
+@pytest.mark.asyncio
+async def test_backfill_pages_until_the_present_and_keeps_closed_last_bar():
+    ingestor = KlineStreamIngestor()
+    handler = MagicMock()
+    ingestor.subscribe("BTCUSDT", "1m", handler)
+    current = int(time.time() * 1000) // 60000 * 60000
+    ingestor.last_closed[("BTCUSDT", "1m")] = current - 300000
+
+    ingestor.client = AsyncMock()
+    ingestor.client.get_klines.side_effect = [
+        # Página cheia: o último candle já fechou e não pode ser descartado
+        [_rest_kline(current - 240000), _rest_kline(current - 180000)],
+        [_rest_kline(current - 120000), _rest_kline(current - 60000)],
+        [],
+    ]
+
+    await ingestor.backfill(page_size=2)
+
+    starts = [call.kwargs["startTime"] for call in ingestor.client.get_klines.await_args_list]
+    assert starts == [current - 300000 + 1, current - 180000 + 1, current - 60000 + 1]
+    assert handler.call_count == 4
+    assert ingestor.last_closed[("BTCUSDT", "1m")] == current - 60000
+
+
+def test_dispatch_archives_closed_klines():
+    archive = MagicMock()
+    ingestor = KlineStreamIngestor(archive=archive)
+
+    ingestor.dispatch(_kline_msg("BTCUSDT", "1m", 1000, closed=False))
+    archive.append.assert_not_called()
+
+    ingestor.dispatch(_kline_msg("BTCUSDT", "1m", 1000, closed=True))
+    archive.append.assert_called_once()
+    assert archive.append.call_args.args[:3] == ("BTCUSDT", "1m", 1000)
+
+
+@patch("data.collector.KLINE_RECEIVE_LAG")
+def test_receive_lag_is_observed_only_for_socket_klines(receive_lag):
+    ingestor = KlineStreamIngestor()
+    backfilled = _kline_msg("BTCUSDT", "1m", 0, closed=True)
+    backfilled["data"]["k"]["T"] = 59999
+    backfilled["data"]["backfill"] = True
+    ingestor.dispatch(backfilled)
+    receive_lag.observe.assert_not_called()
+
+    socket_msg = _kline_msg("BTCUSDT", "1m", 60000, closed=True)
+    socket_msg["data"]["k"]["T"] = 119999
+    ingestor.dispatch(socket_msg)
+    receive_lag.observe.assert_called_once()
+    assert receive_lag.observe.call_args.kwargs == {"interval": "1m"}
+
+
+def test_dispatch_fills_aligned_matrix_after_handlers():
+    aligned = MagicMock()
+    ingestor = KlineStreamIngestor(aligned=aligned)
+    handler = MagicMock(side_effect=lambda symbol, msg: aligned.update.assert_not_called())
+    ingestor.subscribe("BTCUSDT", "1m", handler)
+
+    ingestor.dispatch(_kline_msg("BTCUSDT", "1m", 1000, closed=False))
+    aligned.update.assert_not_called()
+    ingestor.dispatch(_kline_msg("BTCUSDT", "1m", 1000, closed=True))
+    assert handler.call_count == 2
+    aligned.update.assert_called_once()
+    assert aligned.update.call_args.args[:3] == ("BTCUSDT", "1m", 1000)
+
+
+def test_dispatch_updates_last_price_for_every_kline():
+    prices = MagicMock()
+    ingestor = KlineStreamIngestor(prices=prices)
+
+    ingestor.dispatch(_kline_msg("BTCUSDT", "1m", 1000, closed=False))
+    ingestor.dispatch(_kline_msg("BTCUSDT", "1m", 1000, closed=True))
+    assert prices.update_price.call_count == 2
+    assert prices.update_price.call_args.args[0] == "BTCUSDT"
+
+
+def test_dispatch_drops_already_delivered_closed_klines():
+    ingestor = KlineStreamIngestor()
+    handler = MagicMock()
+    ingestor.subscribe("BTCUSDT", "1m", handler)
+
+    ingestor.dispatch(_kline_msg("BTCUSDT", "1m", 60000, closed=True))
+    ingestor.dispatch(_kline_msg("BTCUSDT", "1m", 60000, closed=True))
+    ingestor.dispatch(_kline_msg("BTCUSDT", "1m", 0, closed=True))
+
+    handler.assert_called_once()
+    assert ingestor.last_closed[("BTCUSDT", "1m")] == 60000
+
+
+@pytest.mark.asyncio
+async def test_backfill_skips_streams_without_missed_candles():
+    ingestor = KlineStreamIngestor()
+    ingestor.subscribe("BTCUSDT", "1h", MagicMock())
+    # O último candle entregue fechou há 1 minuto: o seguinte ainda está em formação
+    ingestor.last_closed[("BTCUSDT", "1h")] = int(time.time() * 1000) - 3_600_000 - 60_000
+    ingestor.client = AsyncMock()
+
+    await ingestor.backfill()
+
+    ingestor.client.get_klines.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_backfilled_klines_are_marked():
+    ingestor = KlineStreamIngestor()
+    handler = MagicMock()
+    ingestor.subscribe("BTCUSDT", "1m", handler)
+    current = int(time.time() * 1000) // 60000 * 60000
+    ingestor.last_closed[("BTCUSDT", "1m")] = current - 120000
+    ingestor.client = AsyncMock()
+    ingestor.client.get_klines.return_value = [_rest_kline(current - 60000), _rest_kline(current)]
+
+    await ingestor.backfill()
+
+    assert handler.call_args.args[1]["backfill"] is True
+
+
+def test_is_stale_candle():
+    # Candle de 1m aberto em 0 fecha em 60000; fica antigo um intervalo depois
+    assert not is_stale_candle("1m", 0, now=60000)
+    assert not is_stale_candle("1m", 0, now=119999)
+    assert is_stale_candle("1m", 0, now=120000)
+    assert is_stale_candle("1M", 0, now=1)
@@ -0,0 +1,38 @@
+from unittest.mock import patch
+from data.database import DataDB, AsyncDataDB
+
+
+@patch("data.database.MongoClient")
+def test_datadb_shares_single_client(mock_mongo_client):
+    DataDB._client = None
+    clients_before = DataDB.clients_created
+
+    first = DataDB()
+    second = DataDB()
+
+    assert first.client is second.client
+    mock_mongo_client.assert_called_once()
+    assert DataDB.clients_created == clients_before + 1
+    DataDB._client = None
+
+
+def test_plan_stages_flags_collscan():
+    plan = {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}}
+    assert DataDB._plan_stages(plan) == ["FETCH", "IXSCAN"]
+
+    plan = {"stage": "SUBPLAN", "inputStage": {"stage": "OR", "inputStages": [
+        {"stage": "COLLSCAN"}, {"stage": "IXSCAN"},
+    ]}}
+    assert "COLLSCAN" in DataDB._plan_stages(plan)
+
+
+@patch("data.database.AsyncMongoClient")
+def test_async_datadb_shares_single_client(mock_async_client):
+    AsyncDataDB._client = None
+
+    first = AsyncDataDB()
+    second = AsyncDataDB()
+
+    assert first.client is second.client
+    mock_async_client.assert_called_once()
+    AsyncDataDB._client = None
@@ -0,0 +1,64 @@
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+from pytz import UTC
+from data.historical import HistoricalKlineLoader
+
+
+def kline(open_time, close):
+    return [open_time, close, close, close, close, 1.0, open_time + 59999, "0", 1, "0", "0", "0"]
+
+
+def klines_since(start_ms, count):
+    start_ms = start_ms - start_ms % 60000 + 60000
+    return [kline(start_ms + i * 60000, float(i)) for i in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_load_fetches_only_the_missing_tail(tmp_path):
+    client = MagicMock()
+    client.get_historical_klines = AsyncMock(side_effect=lambda **kwargs: klines_since(kwargs["start_str"], 5))
+    loader = HistoricalKlineLoader(client=client, cache_dir=str(tmp_path))
+
+    first = await loader.load("BTCUSDT", "1m", days=1)
+    assert len(first) == 5
+    assert first["Complete"].tolist() == [True] * 4 + [False]
+
+    second = await loader.load("BTCUSDT", "1m", days=1)
+    # A segunda carga parte do último candle fechado salvo no cache
+    last_cached = int(first["Time"].iloc[3].timestamp() * 1000)
+    assert client.get_historical_klines.await_args.kwargs["start_str"] == last_cached + 1
+    assert second["Time"].is_monotonic_increasing
+    assert second["Time"].is_unique
+    assert len(second) == 9
+
+
+@pytest.mark.asyncio
+async def test_load_many_runs_symbols_concurrently():
+    client = MagicMock()
+    now_ms = int(datetime.now(UTC).timestamp() * 1000)
+    client.get_historical_klines = AsyncMock(return_value=klines_since(now_ms, 3))
+    loader = HistoricalKlineLoader(client=client, cache_dir=None, max_concurrency=2)
+
+    frames = await loader.load_many(["BTCUSDT", "ETHUSDT", "ADAUSDT"], "1m", days=1)
+
+    assert list(frames) == ["BTCUSDT", "ETHUSDT", "ADAUSDT"]
+    assert client.get_historical_klines.await_count == 3
+    assert all(len(df) == 3 for df in frames.values())
+
+
+@pytest.mark.asyncio
+async def test_empty_incremental_fetch_keeps_the_last_cached_bar(tmp_path):
+    client = MagicMock()
+    client.get_historical_klines = AsyncMock(side_effect=lambda **kwargs: klines_since(kwargs["start_str"], 5))
+    loader = HistoricalKlineLoader(client=client, cache_dir=str(tmp_path))
+    await loader.load("BTCUSDT", "1m", days=1)
+
+    client.get_historical_klines = AsyncMock(return_value=[])
+    second = await loader.load("BTCUSDT", "1m", days=1)
+    third = await loader.load("BTCUSDT", "1m", days=1)
+
+    # Os 4 candles fechados do cache continuam fechados e nenhum é descartado
+    assert len(second) == len(third) == 4
+    assert third["Complete"].tolist() == [True] * 4
+    assert len(loader._read_cache("BTCUSDT", "1m")) == 4
@@ -0,0 +1,69 @@
+import os
+import numpy as np
+import pandas as pd
+from data.kline_archive import KlineArchive, KlineArchiveWriter
+
+DAY_MS = 24 * 60 * 60 * 1000
+START = 1_700_000_000_000 - 1_700_000_000_000 % DAY_MS  # meia-noite UTC
+
+
+def fill(archive, count, step=60 * 60 * 1000):
+    for i in range(count):
+        archive.append("btcusdt", "1h", START + i * step, i, i + 1, i - 1, i + 0.5, 10.0)
+
+
+def test_append_partitions_by_day_and_reads_memory_mapped(tmp_path):
+    archive = KlineArchive(str(tmp_path))
+    fill(archive, 30)
+
+    assert len(archive.days("BTCUSDT", "1h")) == 2
+    day = archive.read_day("BTCUSDT", "1h", archive.days("BTCUSDT", "1h")[0])
+    assert isinstance(day["Close"], np.memmap)
+    assert len(day["Close"]) == 24
+
+    columns = archive.read("BTCUSDT", "1h")
+    np.testing.assert_array_equal(columns["Open"], np.arange(30, dtype=float))
+    assert np.all(np.diff(columns["Open Time"]) == 60 * 60 * 1000)
+
+    df = archive.to_dataframe("BTCUSDT", "1h", start=pd.Timestamp(START, unit="ms") + pd.Timedelta(hours=20))
+    assert len(df) == 10
+    assert df["Close"].iloc[0] == 20.5
+
+
+def test_append_skips_duplicates_and_repairs_torn_writes(tmp_path):
+    archive = KlineArchive(str(tmp_path))
+    fill(archive, 3)
+    assert not archive.append("BTCUSDT", "1h", START, 0, 0, 0, 0, 0)
+
+    # Simula uma escrita interrompida: só a primeira coluna recebeu o novo valor
+    day = archive.days("BTCUSDT", "1h")[0]
+    path = os.path.join(str(tmp_path), "BTCUSDT", "1h", day, "open_time.bin")
+    with open(path, "ab") as f:
+        f.write(np.array([START + 3 * 60 * 60 * 1000], dtype=np.int64).tobytes())
+
+    reopened = KlineArchive(str(tmp_path))
+    assert len(reopened.read("BTCUSDT", "1h")["Close"]) == 3
+    assert reopened.append("BTCUSDT", "1h", START + 3 * 60 * 60 * 1000, 3, 4, 2, 3.5, 10.0)
+    columns = reopened.read("BTCUSDT", "1h")
+    np.testing.assert_array_equal(columns["Open"], [0, 1, 2, 3])
+
+
+def test_writer_appends_in_background_and_flushes_on_stop(tmp_path):
+    archive = KlineArchive(str(tmp_path))
+    writer = KlineArchiveWriter(archive)
+    for i in range(5):
+        assert writer.append("btcusdt", "1h", START + i * 60 * 60 * 1000, i, i, i, i, 1.0)
+    writer.stop()
+
+    assert writer.thread is None
+    assert writer.stats()["written"] == 5
+    np.testing.assert_array_equal(archive.read("BTCUSDT", "1h")["Open"], np.arange(5, dtype=float))
+
+
+def test_writer_drops_when_queue_is_full(tmp_path):
+    archive = KlineArchive(str(tmp_path))
+    writer = KlineArchiveWriter(archive, max_queued=1)
+    writer.start = lambda: None  # Sem thread: a fila não é consumida
+    assert writer.append("BTCUSDT", "1h", START, 1, 1, 1, 1, 1)
+    assert not writer.append("BTCUSDT", "1h", START + 1, 1, 1, 1, 1, 1)
+    assert writer.stats()["dropped"] == 1
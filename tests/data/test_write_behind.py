@@ -0,0 +1,50 @@
+import time
+from unittest.mock import MagicMock
+from data.write_behind import WriteBehindQueue
+
+
+def make_queue(**kwargs):
+    db = MagicMock()
+    return WriteBehindQueue("candle_snapshots", db=db, **kwargs), db
+
+
+def test_flushes_in_batches_by_size():
+    writer, db = make_queue(batch_size=3, flush_interval=60)
+    for i in range(7):
+        writer.put({"trade_id": "a", "Close": i})
+
+    deadline = time.monotonic() + 2
+    while writer.written < 6 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert writer.written == 6
+
+    # O restante é gravado no encerramento
+    writer.stop()
+    assert writer.written == 7
+    sizes = [len(call.args[0]) for call in db.db["candle_snapshots"].insert_many.call_args_list]
+    assert sizes == [3, 3, 1]
+    db.create_time_series.assert_called_once_with("candle_snapshots", "Time", "trade_id")
+
+
+def test_flushes_on_interval():
+    writer, db = make_queue(batch_size=100, flush_interval=0.05)
+    writer.put({"trade_id": "a"})
+
+    deadline = time.monotonic() + 2
+    while writer.written < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert writer.written == 1
+    writer.stop()
+
+
+def test_drops_and_counts_when_full():
+    writer, db = make_queue(max_queued=2, flush_interval=60)
+    writer.start = MagicMock()  # Sem consumidor, a fila enche
+
+    assert writer.put({"n": 1}) and writer.put({"n": 2})
+    assert not writer.put({"n": 3})
+
+    stats = writer.stats()
+    assert stats["dropped"] == 1
+    assert stats["queue_depth"] == 2
+    assert stats["max_queue_depth"] == 2
@@ -0,0 +1,34 @@
+import pytest
+from unittest.mock import patch
+from operations.position_book import PositionBook
+
+# Dependências externas criadas no __init__ dos executores
+EXECUTOR_DEPENDENCIES = ("Client", "DataDB", "ConfigSystemManager", "ConfigPairSystemManager")
+
+
+@pytest.fixture
+def make_executor():
+    """
+    Cria um TradeExecutor ou PairTradeExecutor com Client, DataDB e configurações simulados,
+    os trades ativos informados no banco e um livro de posições próprio (vazio até o primeiro uso).
+    """
+    patches = []
+
+    def make(executor_cls, trades=()):
+        module = executor_cls.__module__
+        for name in EXECUTOR_DEPENDENCIES:
+            target = f"{module}.{name}"
+            try:
+                patcher = patch(target)
+                patcher.start()
+            except AttributeError:
+                continue
+            patches.append(patcher)
+        executor = executor_cls()
+        executor.db.query_all.return_value = list(trades)
+        executor.position_book = PositionBook(executor.position_book.collection)
+        return executor
+
+    yield make
+    for patcher in reversed(patches):
+        patcher.stop()
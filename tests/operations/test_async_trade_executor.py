@@ -0,0 +1,67 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from operations.async_trade_executor import AsyncTradeExecutor
+from operations.trade_executor import TradeExecutor
+
+
+@pytest.fixture
+def async_trade_executor():
+    client = AsyncMock()
+    client.futures_create_order.side_effect = [{"orderId": 1}, {"orderId": 2}, {"orderId": 3}]
+
+    trade_executor = MagicMock()
+    # Filtros e ticker vêm do cliente síncrono do TradeExecutor
+    trade_executor.client.futures_exchange_info.return_value = {"symbols": []}
+    trade_executor.client.get_symbol_ticker.return_value = {"price": "10"}
+    trade_executor.get_leverage.return_value = 5
+    trade_executor.config_system_manager.get_system_config.return_value = {"total_earnings": 1000, "percentage_of_total": 10}
+    trade_executor.calculate_stop_loss.return_value = 9.8
+    trade_executor.calculate_take_profit.return_value = 10.2
+    # Documento do trade compartilhado com o fluxo síncrono, sobre os métodos simulados acima
+    trade_executor.build_opened_trade.side_effect = lambda *args: TradeExecutor.build_opened_trade(trade_executor, *args)
+    return AsyncTradeExecutor(client, trade_executor, db=AsyncMock())
+
+
+@pytest.mark.asyncio
+async def test_execute_trade(async_trade_executor):
+    trade_params = {"symbol": "ADAUSDT", "trade_id": "trade123", "sl_percent": 0.02}
+    signal = {"SIGNAL_UP": 1, "Close": 10}
+
+    order = await async_trade_executor.execute_trade(trade_params, signal)
+
+    assert order == {"orderId": 1}
+    client = async_trade_executor.client
+    client.futures_change_leverage.assert_awaited_once_with(symbol="ADAUSDT", leverage=5)
+    client.futures_create_order.assert_awaited_once_with(
+        symbol="ADAUSDT", side="BUY", type="MARKET", quantity=10, positionSide="LONG"
+    )
+    # Ordem e trade gravados pelo AsyncDataDB; o livro de posições recebe a mesma escrita
+    async_trade_executor.db.add_one.assert_awaited_once_with("orders", {"orderId": 1})
+    collection, filter_criteria, updates = async_trade_executor.db.update_one.await_args.args
+    assert (collection, filter_criteria) == ("opened_trades", {"_id": 1})
+    async_trade_executor.trade_executor.position_book.apply.assert_called_once_with(1, updates, upsert=True)
+    assert updates["stop_loss"] == 9.8
+    assert updates["take_profit"] == 10.2
+
+
+@pytest.mark.asyncio
+async def test_execute_trade_places_sl_and_tp_concurrently(async_trade_executor):
+    async_trade_executor.place_exchange_orders = True
+    trade_params = {"symbol": "ADAUSDT", "trade_id": "trade123", "sl_percent": 0.02}
+    signal = {"SIGNAL_UP": 0, "Close": 10}
+
+    await async_trade_executor.execute_trade(trade_params, signal)
+
+    assert async_trade_executor.client.futures_create_order.await_count == 3
+    async_trade_executor.db.update_one.assert_awaited_with(
+        "opened_trades", {"_id": 1}, {"stop_loss_order_id": 2, "take_profit_order_id": 3}, upsert=False
+    )
+    assert async_trade_executor.db.add_one.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_execute_trade_returns_none_on_failure(async_trade_executor):
+    async_trade_executor.trade_executor.client.get_symbol_ticker.side_effect = Exception("timeout")
+    order = await async_trade_executor.execute_trade({"symbol": "ADAUSDT"}, {"SIGNAL_UP": 1})
+    assert order is None
+    async_trade_executor.client.futures_create_order.assert_not_awaited()
@@ -0,0 +1,90 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from operations.order_tracker import OrderTracker
+
+
+def make_executor(handles=False):
+    executor = MagicMock()
+    executor.handle_order_update.return_value = handles
+    return executor
+
+
+@pytest.mark.asyncio
+async def test_filled_order_is_dispatched_until_an_executor_handles_it():
+    first, second = make_executor(handles=True), make_executor()
+    tracker = OrderTracker([first, second])
+
+    await tracker.handle_message({"e": "ORDER_TRADE_UPDATE", "o": {"s": "BTCUSDT", "i": 10, "X": "FILLED"}})
+
+    first.handle_order_update.assert_called_once_with({"s": "BTCUSDT", "i": 10, "X": "FILLED"})
+    second.handle_order_update.assert_not_called()
+    assert tracker.stats()["fills"] == 1
+
+
+@pytest.mark.asyncio
+async def test_non_filled_updates_are_ignored():
+    executor = make_executor()
+    tracker = OrderTracker([executor])
+
+    await tracker.handle_message({"e": "ORDER_TRADE_UPDATE", "o": {"s": "BTCUSDT", "i": 10, "X": "NEW"}})
+
+    executor.handle_order_update.assert_not_called()
+    assert tracker.stats()["events"] == 1
+
+
+@pytest.mark.asyncio
+async def test_account_update_tracks_positions():
+    tracker = OrderTracker([])
+    await tracker.handle_message({
+        "e": "ACCOUNT_UPDATE",
+        "a": {"P": [{"s": "BTCUSDT", "ps": "LONG", "pa": "0.5"}, {"s": "ETHUSDT", "ps": "SHORT", "pa": "-2"}]},
+    })
+
+    assert tracker.positions == {("BTCUSDT", "LONG"): 0.5, ("ETHUSDT", "SHORT"): -2.0}
+
+
+@pytest.mark.asyncio
+async def test_expired_listen_key_forces_reconnect():
+    tracker = OrderTracker([])
+    with pytest.raises(ConnectionError):
+        await tracker.handle_message({"e": "listenKeyExpired"})
+
+
+@pytest.mark.asyncio
+async def test_reconcile_uses_a_single_rest_call_for_all_executors():
+    first, second = make_executor(), make_executor()
+    first.get_reconcile_trades.return_value = [{"_id": "a"}]
+    second.get_reconcile_trades.return_value = [{"_id": "b"}]
+    tracker = OrderTracker([first, second])
+    tracker.client = MagicMock()
+    tracker.client.futures_get_open_orders = AsyncMock(return_value=[{"orderId": 1}, {"orderId": 2}])
+
+    await tracker.reconcile()
+
+    tracker.client.futures_get_open_orders.assert_awaited_once_with()
+    first.reconcile_orders.assert_called_once_with({1, 2}, active_trades=[{"_id": "a"}])
+    second.reconcile_orders.assert_called_once_with({1, 2}, active_trades=[{"_id": "b"}])
+    assert tracker.stats()["reconciliations"] == 1
+
+
+@pytest.mark.asyncio
+async def test_account_update_refreshes_cached_balance():
+    sizing = MagicMock()
+    tracker = OrderTracker([], sizing=sizing)
+    await tracker.handle_message({"e": "ACCOUNT_UPDATE", "a": {"B": [{"a": "USDT", "wb": "950.2"}], "P": []}})
+
+    sizing.update_balance.assert_called_once_with("USDT", "950.2")
+
+
+@pytest.mark.asyncio
+async def test_reconcile_reads_trades_before_the_open_orders_snapshot():
+    calls = []
+    executor = make_executor()
+    executor.get_reconcile_trades.side_effect = lambda: calls.append("trades") or []
+    tracker = OrderTracker([executor])
+    tracker.client = MagicMock()
+    tracker.client.futures_get_open_orders = AsyncMock(side_effect=lambda: calls.append("orders") or [])
+
+    await tracker.reconcile()
+
+    assert calls == ["trades", "orders"]
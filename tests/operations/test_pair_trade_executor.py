@@ -0,0 +1,33 @@
+from operations.pair_trade_executor import PairTradeExecutor
+
+
+def test_reconcile_orders_skips_trades_without_stop_loss_order(make_executor):
+    executor = make_executor(PairTradeExecutor, [
+        {"_id": 1, "symbol": "BTCUSDT", "activate": True, "stop_loss_order_id": None},
+        {"_id": 2, "symbol": "BTCUSDT", "activate": True, "stop_loss_order_id": 20},
+        {"_id": 3, "symbol": "ETHUSDT", "activate": True, "stop_loss_order_id": 30},
+    ])
+
+    executor.reconcile_orders({30})
+
+    # Só o trade 2 (SL fora das ordens abertas) é fechado; nenhum cancelamento com id nulo
+    executor.db.update_one.assert_called_once()
+    assert executor.db.update_one.call_args.kwargs["filter_criteria"] == {"_id": 2}
+    executor.client.futures_cancel_order.assert_called_once_with(symbol="BTCUSDT", orderId=20)
+
+
+def test_reconcile_orders_uses_trades_read_before_the_snapshot(make_executor):
+    executor = make_executor(PairTradeExecutor, [{"_id": 1, "symbol": "BTCUSDT", "activate": True, "stop_loss_order_id": 10}])
+
+    # O trade 1 foi aberto depois da leitura dos trades: não está na lista e não é fechado
+    executor.reconcile_orders(set(), active_trades=[])
+
+    executor.db.query_all.assert_not_called()
+    executor.db.update_one.assert_not_called()
+
+
+def test_handle_order_update_ignores_null_order_ids(make_executor):
+    executor = make_executor(PairTradeExecutor, [{"_id": 1, "symbol": "BTCUSDT", "activate": True, "stop_loss_order_id": None}])
+
+    assert executor.handle_order_update({"X": "FILLED", "s": "BTCUSDT", "i": None}) is False
+    executor.db.update_one.assert_not_called()
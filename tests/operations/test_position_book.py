@@ -0,0 +1,41 @@
+from unittest.mock import MagicMock
+from operations.position_book import PositionBook
+
+
+def test_load_indexes_active_trades_by_symbol():
+    db = MagicMock()
+    db.query_all.return_value = [
+        {"_id": "1", "symbol": "BTCUSDT", "activate": True, "break_even": False},
+        {"_id": "2", "symbol": "ETHUSDT", "activate": True, "break_even": True},
+    ]
+    book = PositionBook()
+    book.ensure_loaded(db)
+    book.ensure_loaded(db)
+
+    db.query_all.assert_called_once_with("opened_trades", limit=0, activate=True)
+    assert [trade["_id"] for trade in book.get_active(symbol="BTCUSDT")] == ["1"]
+    assert [trade["_id"] for trade in book.get_active(break_even=True)] == ["2"]
+
+
+def test_apply_writes_through_and_removes_closed_trades():
+    book = PositionBook()
+    book.apply(10, {"symbol": "BTCUSDT", "activate": True, "break_even": False, "stop_loss": 90}, upsert=True)
+    book.apply("10", {"stop_loss": 100, "break_even": True})
+
+    trade = book.get(10)
+    assert trade["stop_loss"] == 100 and trade["break_even"] is True
+
+    # Cópias não alteram o livro
+    trade["stop_loss"] = 0
+    assert book.get(10)["stop_loss"] == 100
+
+    book.apply(10, {"activate": False, "close_type": "TP"})
+    assert book.get(10) is None
+    assert book.get_active(symbol="BTCUSDT") == []
+    assert book.symbols() == []
+
+
+def test_apply_ignores_unknown_trade_without_upsert():
+    book = PositionBook()
+    book.apply(99, {"stop_loss": 1})
+    assert len(book) == 0
@@ -0,0 +1,102 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from operations.sizing import SizingService
+
+EXCHANGE_INFO = {
+    "symbols": [
+        {
+            "symbol": "BTCUSDT",
+            "filters": [
+                {"filterType": "PRICE_FILTER", "tickSize": "0.10"},
+                {"filterType": "LOT_SIZE", "stepSize": "0.001", "minQty": "0.001"},
+                {"filterType": "MIN_NOTIONAL", "notional": "100"},
+            ],
+        },
+        {
+            "symbol": "ADAUSDT",
+            "filters": [
+                {"filterType": "PRICE_FILTER", "tickSize": "0.00010"},
+                {"filterType": "LOT_SIZE", "stepSize": "1", "minQty": "1"},
+                {"filterType": "MIN_NOTIONAL", "notional": "5"},
+            ],
+        },
+    ]
+}
+
+
+@pytest.fixture
+def sizing():
+    service = SizingService()
+    service.load_exchange_info(EXCHANGE_INFO)
+    return service
+
+
+def test_quantity_is_floored_to_step_size(sizing):
+    assert sizing.quantity("BTCUSDT", 150, 60123.4) == 0.002
+    assert sizing.quantity("ADAUSDT", 100, 0.3) == 333.0
+
+
+def test_quantity_below_exchange_minimum_raises(sizing):
+    with pytest.raises(ValueError):
+        sizing.quantity("BTCUSDT", 50, 60000)
+    with pytest.raises(ValueError):
+        sizing.quantity("ADAUSDT", 0.2, 0.3)
+
+
+def test_unknown_symbol_falls_back_to_integer_quantity(sizing):
+    assert sizing.quantity("XYZUSDT", 100, 3) == 33.0
+    assert sizing.round_price("XYZUSDT", 1.23456) == 1.23456
+
+
+def test_round_price_uses_tick_size(sizing):
+    assert sizing.round_price("BTCUSDT", 60123.46) == 60123.5
+    assert sizing.round_price("ADAUSDT", 0.312345) == 0.3123
+
+
+def test_stale_stream_price_is_ignored(sizing):
+    sizing.update_price("btcusdt", "60000.5")
+    assert sizing.price("BTCUSDT") == 60000.5
+
+    sizing.max_price_age = -1
+    assert sizing.price("BTCUSDT") is None
+
+
+def test_ensure_filters_loads_once():
+    service = SizingService()
+    client = MagicMock()
+    client.futures_exchange_info.return_value = EXCHANGE_INFO
+
+    service.ensure_filters(client)
+    service.ensure_filters(client)
+
+    client.futures_exchange_info.assert_called_once_with()
+    assert service.round_quantity("BTCUSDT", 0.0129) == 0.012
+
+
+@pytest.mark.asyncio
+async def test_refresh_loads_filters_and_balances():
+    service = SizingService()
+    client = MagicMock()
+    client.futures_exchange_info = AsyncMock(return_value=EXCHANGE_INFO)
+    client.futures_account = AsyncMock(return_value={"assets": [{"asset": "USDT", "walletBalance": "1234.5"}]})
+
+    await service.refresh(client)
+
+    assert service.balance() == 1234.5
+    assert service.stats()["symbols_with_filters"] == 2
+
+
+def test_order_quantity_prefers_stream_price_over_ticker():
+    service = SizingService()
+    client = MagicMock()
+    client.futures_exchange_info.return_value = EXCHANGE_INFO
+    client.get_symbol_ticker.return_value = {"price": "0.25"}
+
+    # Sem preço no stream: filtros carregados e ticker REST consultado
+    assert service.order_quantity(client, "ADAUSDT", 100) == 400.0
+    client.futures_exchange_info.assert_called_once_with()
+    client.get_symbol_ticker.assert_called_once_with(symbol="ADAUSDT")
+
+    service.update_price("ADAUSDT", "0.3")
+    assert service.order_quantity(client, "ADAUSDT", 100) == 333.0
+    client.get_symbol_ticker.assert_called_once()
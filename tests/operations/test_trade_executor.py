@@ -312,3 +312,41 @@ def test_log_order(trade_executor):
 
     # Verifica se `add_one` foi chamado corretamente
     trade_executor.db.add_one.assert_called_once_with("orders", order)
+
+
+# Reconciliação e user-data stream com trades ainda sem TP/SL registrados
+def test_reconcile_orders_skips_trades_without_protection_orders(make_executor):
+    executor = make_executor(TradeExecutor, [
+        {"_id": "1", "symbol": "BTCUSDT", "activate": True, "take_profit_order_id": None, "stop_loss_order_id": None},
+        {"_id": "2", "symbol": "BTCUSDT", "activate": True, "take_profit_order_id": None, "stop_loss_order_id": 20},
+        {"_id": "3", "symbol": "BTCUSDT", "activate": True, "take_profit_order_id": 30, "stop_loss_order_id": 31},
+    ])
+
+    executor.reconcile_orders({20, 31})
+
+    # Apenas o trade 3 (TP executado) é fechado; o SL restante é cancelado
+    executor.db.update_one.assert_called_once()
+    assert executor.db.update_one.call_args.kwargs["filter_criteria"] == {"_id": "3"}
+    executor.client.futures_cancel_order.assert_called_once_with(symbol="BTCUSDT", orderId=31)
+
+
+def test_handle_order_update_ignores_null_order_ids(make_executor):
+    executor = make_executor(TradeExecutor, [
+        {"_id": "1", "symbol": "BTCUSDT", "activate": True, "take_profit_order_id": None, "stop_loss_order_id": None},
+    ])
+
+    assert executor.handle_order_update({"X": "FILLED", "s": "BTCUSDT", "i": None}) is False
+    assert executor.handle_order_update({"X": "FILLED", "s": "BTCUSDT", "i": 10}) is False
+    executor.db.update_one.assert_not_called()
+    executor.client.futures_cancel_order.assert_not_called()
+
+
+def test_check_and_close_tp_sl_orders_reads_trades_before_open_orders(make_executor):
+    executor = make_executor(TradeExecutor)
+    calls = []
+    executor.db.query_all.side_effect = lambda *args, **kwargs: calls.append("trades") or []
+    executor.client.futures_get_open_orders.side_effect = lambda: calls.append("orders") or []
+
+    executor.check_and_close_tp_sl_orders()
+
+    assert calls == ["trades", "orders"]
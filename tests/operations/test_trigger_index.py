@@ -0,0 +1,37 @@
+from operations.position_book import PositionBook
+from operations.trigger_index import TriggerIndex
+
+
+def make_book():
+    book = PositionBook()
+    book.apply("long", {"symbol": "BTCUSDT", "activate": True, "position_side": "LONG",
+                        "entry_price": 100, "take_profit": 110, "stop_loss": 90, "break_even": False}, upsert=True)
+    book.apply("short", {"symbol": "BTCUSDT", "activate": True, "position_side": "SHORT",
+                         "entry_price": 100, "take_profit": 90, "stop_loss": 110, "break_even": True}, upsert=True)
+    return book
+
+
+def test_crossed_returns_only_trades_past_their_levels():
+    index = TriggerIndex(make_book())
+
+    assert index.crossed("BTCUSDT", 100, breakeven_threshold=0.05) == set()
+    # Break Even do LONG (105); o SHORT já teve parcial
+    assert index.crossed("BTCUSDT", 105, breakeven_threshold=0.05) == {"long"}
+    # TP do LONG e SL do SHORT
+    assert index.crossed("BTCUSDT", 111, breakeven_threshold=0.05) == {"long", "short"}
+    # SL do LONG e TP do SHORT
+    assert index.crossed("BTCUSDT", 89, breakeven_threshold=0.05) == {"long", "short"}
+    assert index.crossed("ETHUSDT", 89) == set()
+
+
+def test_index_is_rebuilt_after_book_writes():
+    book = make_book()
+    index = TriggerIndex(book)
+    assert index.crossed("BTCUSDT", 92) == set()
+
+    # Stop movido para a entrada após a parcial
+    book.apply("long", {"stop_loss": 100, "break_even": True})
+    assert index.crossed("BTCUSDT", 92) == {"long"}
+
+    book.apply("long", {"activate": False})
+    assert index.crossed("BTCUSDT", 92) == set()
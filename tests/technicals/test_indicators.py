@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+from technicals.indicators import PAV, PAV_multi, calculate_percent_change, calculate_ema
+
+
+def pav_loop(close_prices, window):
+    """Implementação original em loop, usada como referência."""
+    percent_change = np.zeros(len(close_prices))
+    for i in range(window, len(close_prices)):
+        window_sum = 0.0
+        for j in range(i - window + 1, i + 1):
+            change = (close_prices[j] - close_prices[j - 1]) / close_prices[j - 1] * 100
+            window_sum += change
+        percent_change[i] = window_sum
+    return percent_change
+
+
+def calculate_percent_change_loop(close_prices, window):
+    """Implementação original em loop, usada como referência."""
+    percent_change = np.zeros(len(close_prices))
+    for i in range(window, len(close_prices)):
+        window_sum = 0.0
+        for j in range(i - window + 1, i + 1):
+            percent_change[j] = (
+                (close_prices[j] - close_prices[j - 1]) / close_prices[j - 1] * 100
+            )
+            window_sum += percent_change[j]
+        percent_change[i] = window_sum
+    return percent_change
+
+
+def calculate_ema_loop(values, period):
+    """Implementação original em loop, usada como referência."""
+    ema = np.zeros(len(values))
+    multiplier = 2 / (period + 1)
+    ema[period - 1] = values[period - 1]
+    for i in range(period, len(values)):
+        ema[i] = (values[i] - ema[i - 1]) * multiplier + ema[i - 1]
+    return ema
+
+
+@pytest.fixture
+def closes():
+    rng = np.random.default_rng(7)
+    return 50 + np.cumsum(rng.normal(0, 0.2, 500))
+
+
+@pytest.mark.parametrize("window", [1, 10, 50, 150, 200])
+def test_pav_matches_loop(closes, window):
+    np.testing.assert_allclose(PAV(closes, window), pav_loop(closes, window), rtol=1e-9, atol=1e-10)
+
+
+@pytest.mark.parametrize("window", [1, 10, 200])
+def test_calculate_percent_change_matches_loop(closes, window):
+    np.testing.assert_allclose(
+        calculate_percent_change(closes, window),
+        calculate_percent_change_loop(closes, window),
+        rtol=1e-9,
+        atol=1e-10,
+    )
+
+
+@pytest.mark.parametrize("n", [0, 5, 10, 11])
+def test_pav_short_series(n):
+    closes = np.linspace(1, 2, n)
+    np.testing.assert_allclose(PAV(closes, 10), pav_loop(closes, 10))
+    np.testing.assert_allclose(calculate_percent_change(closes, 10), calculate_percent_change_loop(closes, 10))
+
+
+def test_pav_multi_matches_single_window(closes):
+    result = PAV_multi(closes)
+    assert sorted(result) == [10, 50, 150, 200]
+    for window, values in result.items():
+        np.testing.assert_allclose(values, pav_loop(closes, window), rtol=1e-9, atol=1e-10)
+
+
+@pytest.mark.parametrize("period", [1, 10, 200])
+def test_calculate_ema_matches_loop(closes, period):
+    np.testing.assert_allclose(calculate_ema(closes, period), calculate_ema_loop(closes, period), rtol=1e-12)
+
+    with_nan = closes.copy()
+    with_nan[300] = np.nan
+    np.testing.assert_array_equal(calculate_ema(with_nan, period), calculate_ema_loop(with_nan, period))
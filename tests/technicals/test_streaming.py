@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+import pytest
+from technicals.indicators import EMAShort, PAV, calculate_ema
+from technicals.streaming import (
+    EWMStream,
+    EMAStream,
+    PAVStream,
+    EMAPERStream,
+    IndicatorPipeline,
+)
+
+
+@pytest.fixture
+def closes():
+    rng = np.random.default_rng(42)
+    return 100 + np.cumsum(rng.normal(0, 0.5, 1500))
+
+
+def batch_indicators(closes, ema_s, emaper_s, emaper_l):
+    """Replica o cálculo em lote original do LongShortTrader.define_strategy."""
+    df = pd.DataFrame({"Close": closes})
+    df = EMAShort(df, ema_s)
+    for window in EMAPERStream.WINDOWS:
+        df[f"Percent_Change_{window}"] = PAV(df["EMA_short"].values, window)
+        df[f"EMA_percent_s_{window}"] = calculate_ema(df[f"Percent_Change_{window}"].values, 10)
+    df["Average_EMA_percent"] = df[[f"EMA_percent_s_{w}" for w in EMAPERStream.WINDOWS]].mean(axis=1)
+    df["Average_EMA_percent_ema_short"] = calculate_ema(df["Average_EMA_percent"].values, emaper_s)
+    df["Average_EMA_percent_ema_long"] = calculate_ema(df["Average_EMA_percent"].values, emaper_l)
+    df.reset_index(drop=True, inplace=True)
+    return df
+
+
+def test_ewm_stream_matches_pandas(closes):
+    stream = EWMStream(20, min_periods=20)
+    streamed = np.array([stream.update(c) for c in closes])
+    expected = pd.Series(closes).ewm(span=20, min_periods=20).mean().values
+    np.testing.assert_allclose(streamed, expected, rtol=1e-12, equal_nan=True)
+
+
+def test_ema_stream_matches_calculate_ema(closes):
+    stream = EMAStream(10)
+    streamed = np.array([stream.update(c) for c in closes])
+    np.testing.assert_allclose(streamed, calculate_ema(closes, 10), rtol=1e-12)
+
+
+@pytest.mark.parametrize("window", [10, 50, 200])
+def test_pav_stream_matches_pav(closes, window):
+    stream = PAVStream(window)
+    streamed = np.array([stream.update(c) for c in closes])
+    np.testing.assert_allclose(streamed, PAV(closes, window), rtol=1e-9, atol=1e-9)
+
+
+def test_indicator_pipeline_matches_batch(closes):
+    pipeline = IndicatorPipeline(ema_s=20, emaper_s=10, emaper_l=50)
+    rows = pipeline.seed(closes)
+    streamed = pd.DataFrame(rows)
+    expected = batch_indicators(closes, 20, 10, 50)
+
+    assert len(streamed) == len(expected)
+    for column in streamed.columns:
+        np.testing.assert_allclose(
+            streamed[column].values, expected[column].values, rtol=1e-9, atol=1e-9, err_msg=column
+        )
+
+
+def test_indicator_pipeline_warmup_returns_none():
+    pipeline = IndicatorPipeline(ema_s=5, emaper_s=10, emaper_l=50)
+    assert all(pipeline.update(100.0 + i) is None for i in range(4))
+    assert pipeline.update(105.0) is not None
+
+
+@pytest.mark.parametrize("regression_window", [None, 400])
+def test_pair_spread_stream_matches_batch(regression_window):
+    from core.pair_trading_strategy import apply_regression, calculate_zscore
+    from technicals.streaming import PairSpreadStream
+
+    rng = np.random.default_rng(7)
+    assets = 50000 + np.cumsum(rng.normal(0, 20, (1200, 3)), axis=0)
+    target = assets @ [0.3, 0.5, 0.2] + rng.normal(0, 15, len(assets)) + 100
+
+    stream = PairSpreadStream(3, 50, regression_window)
+    rows = [stream.update(target[i], assets[i]) for i in range(len(target))]
+
+    for last in (30, 49, 120, 700, 1199):
+        first = 0 if regression_window is None else max(0, last + 1 - regression_window)
+        df = pd.DataFrame({"Close": target[first:last + 1]})
+        for j in range(3):
+            df[f"Asset_{j}"] = assets[first:last + 1, j]
+        df = apply_regression(df, "Target")
+        df["Spread"] = df["Close"] - df["Regression_Index"]
+        df = calculate_zscore(df, spread_column="Spread", window=50)
+
+        expected = df.iloc[-1]
+        for column in ["Regression_Index", "Spread", "Spread_Mean", "Spread_Std", "Z-Score"]:
+            np.testing.assert_allclose(rows[last][column], expected[column], rtol=1e-7, atol=1e-7)
+
+
+@pytest.mark.parametrize("regression_window", [None, 400])
+def test_pair_spread_stream_seed_matches_updates(regression_window):
+    from technicals.streaming import PairSpreadStream
+
+    rng = np.random.default_rng(11)
+    assets = 50000 + np.cumsum(rng.normal(0, 20, (900, 3)), axis=0)
+    target = assets @ [0.3, 0.5, 0.2] + rng.normal(0, 15, len(assets)) + 100
+
+    incremental = PairSpreadStream(3, 50, regression_window)
+    for i in range(len(target)):
+        expected = incremental.update(target[i], assets[i])
+    seeded = PairSpreadStream(3, 50, regression_window)
+    row = seeded.seed(target, assets)
+
+    for column in ["Regression_Index", "Spread", "Spread_Mean", "Spread_Std", "Z-Score"]:
+        np.testing.assert_allclose(row[column], expected[column], rtol=1e-7, atol=1e-7)
+
+    # Após o seed, os próximos candles seguem o caminho incremental
+    next_asset = assets[-1] + 10
+    next_target = target[-1] + 5
+    np.testing.assert_allclose(
+        seeded.update(next_target, next_asset)["Z-Score"],
+        incremental.update(next_target, next_asset)["Z-Score"],
+        rtol=1e-7,
+    )